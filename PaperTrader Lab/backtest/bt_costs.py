@@ -0,0 +1,46 @@
+"""Backtrader glue for ``backtest.costs`` models.
+
+Kept apart from the models so ``backtest.vectorized`` can use them without
+importing backtrader.
+"""
+
+from __future__ import annotations
+
+import backtrader as bt
+import pandas as pd
+
+from backtest.costs import CostModel
+
+
+class CostCommInfo(bt.CommInfoBase):
+    """Backtrader commission info charging a ``CostModel`` for one feed.
+
+    The bar position is the feed length at fill time, so the precomputed
+    arrays are looked up directly. Borrow fees are charged once per bar
+    through backtrader's credit interest hook.
+    """
+
+    params = (
+        ("model", None),
+        ("prepared", None),
+        ("data", None),
+    )
+
+    def _getcommission(self, size, price, pseudoexec):
+        idx = max(len(self.p.data) - 1, 0)
+        return float(self.p.model.cost(self.p.prepared, idx, size, price))
+
+    def get_credit_interest(self, data, pos, dt):
+        if pos.datetime is not None and dt <= pos.datetime:
+            return 0.0
+        idx = max(len(data) - 1, 0)
+        return float(self.p.model.holding_cost(self.p.prepared, idx, pos.size, data.close[0]))
+
+
+def attach_costs(broker, data, df: pd.DataFrame, model: CostModel, leverage: float = 1.0) -> None:
+    """Install ``model`` (prepared on ``df``, the frame behind ``data``) on ``broker``."""
+    info = CostCommInfo(model=model, prepared=model.prepare(df), data=data, leverage=leverage)
+    broker.addcommissioninfo(info, name=data._name)
+
+
+__all__ = ["CostCommInfo", "attach_costs"]
@@ -0,0 +1,220 @@
+"""Transaction-cost models with per-bar arrays precomputed from OHLCV.
+
+Every model splits its work in two steps:
+
+* ``prepare(df)`` computes, once and vectorized over the whole frame, the
+  per-bar inputs it needs (half spread, rolling volatility and volume, borrow
+  rate...). Multi-symbol frames are handled group-wise.
+* ``cost(prep, idx, shares, price)`` and ``holding_cost(...)`` turn those
+  arrays into cash costs for fills (or held positions) at bar positions
+  ``idx``. They accept scalars or arrays, so the backtrader commission info
+  (``backtest.bt_costs``) calls them once per fill and ``backtest.vectorized``
+  once per frame.
+
+Models add up with ``+``::
+
+    costs = SpreadCost(4) + SqrtImpactCost() + PerShareCommission() + BorrowFee(0.03)
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from backtest.metrics import infer_periods_per_year
+from utils.grouped import group_first, rolling_mean, rolling_std, symbol_order
+
+Prepared = Dict[str, np.ndarray]
+
+
+def _grouped(df: pd.DataFrame, fn) -> Tuple[np.ndarray, ...]:
+    """Apply ``fn(sorted_df, first)`` on rows sorted by symbol/time, scatter back."""
+    order = symbol_order(df)
+    sdf = df.iloc[order]
+    keys = pd.factorize(sdf["symbol"])[0] if "symbol" in sdf.columns else np.zeros(len(sdf), dtype=int)
+    _, first = group_first(keys)
+    outs = []
+    for arr in fn(sdf, first):
+        back = np.empty(len(arr))
+        back[order] = arr
+        outs.append(back)
+    return tuple(outs)
+
+
+class CostModel:
+    """Base class; subclasses override what they charge."""
+
+    def prepare(self, df: pd.DataFrame) -> Prepared:
+        return {}
+
+    def cost(self, prep: Prepared, idx, shares, price) -> np.ndarray:
+        """Cash cost of trading ``shares`` at ``price`` on bars ``idx``."""
+        return np.zeros(np.broadcast(np.asarray(idx), np.asarray(shares)).shape)
+
+    def holding_cost(self, prep: Prepared, idx, shares, price) -> np.ndarray:
+        """Cash cost of holding ``shares`` through bars ``idx`` (financing, borrow)."""
+        return np.zeros(np.broadcast(np.asarray(idx), np.asarray(shares)).shape)
+
+    def __add__(self, other: "CostModel") -> "CompositeCost":
+        return CompositeCost([self, other])
+
+
+class CompositeCost(CostModel):
+    """Sum of several cost models."""
+
+    def __init__(self, models: Sequence[CostModel]):
+        self.models: List[CostModel] = []
+        for m in models:
+            self.models.extend(m.models if isinstance(m, CompositeCost) else [m])
+
+    def prepare(self, df):
+        return {str(i): m.prepare(df) for i, m in enumerate(self.models)}
+
+    def cost(self, prep, idx, shares, price):
+        return sum(m.cost(prep[str(i)], idx, shares, price) for i, m in enumerate(self.models))
+
+    def holding_cost(self, prep, idx, shares, price):
+        return sum(m.holding_cost(prep[str(i)], idx, shares, price) for i, m in enumerate(self.models))
+
+
+class FlatCommission(CostModel):
+    """Fraction of the traded notional (what ``setcommission`` does)."""
+
+    def __init__(self, rate: float = 0.0005):
+        self.rate = rate
+
+    def cost(self, prep, idx, shares, price):
+        return np.abs(shares) * np.asarray(price, dtype=float) * self.rate
+
+
+class PerShareCommission(CostModel):
+    """Per-share fee with a per-order minimum and a cap as a fraction of notional."""
+
+    def __init__(self, per_share: float = 0.005, minimum: float = 1.0, max_pct: float = 0.01):
+        self.per_share = per_share
+        self.minimum = minimum
+        self.max_pct = max_pct
+
+    def cost(self, prep, idx, shares, price):
+        qty = np.abs(np.asarray(shares, dtype=float))
+        fee = np.maximum(qty * self.per_share, self.minimum)
+        fee = np.minimum(fee, qty * np.asarray(price, dtype=float) * self.max_pct)
+        return np.where(qty > 0, fee, 0.0)
+
+
+class TieredCommission(CostModel):
+    """Marginal commission brackets on the order notional.
+
+    ``tiers`` is a sequence of ``(notional_from, rate)`` sorted by threshold:
+    the default charges 10 bps up to 50k, 8 bps up to 250k and 5 bps above.
+    """
+
+    def __init__(self, tiers: Sequence[Tuple[float, float]] = ((0, 0.0010), (50_000, 0.0008), (250_000, 0.0005)),
+                 minimum: float = 0.0):
+        bounds = np.array([t[0] for t in tiers], dtype=float)
+        self._lo = bounds
+        self._hi = np.append(bounds[1:], np.inf)
+        self._rates = np.array([t[1] for t in tiers], dtype=float)
+        self.minimum = minimum
+
+    def cost(self, prep, idx, shares, price):
+        notional = np.abs(np.asarray(shares, dtype=float)) * np.asarray(price, dtype=float)
+        filled = np.clip(notional[..., None] - self._lo, 0, self._hi - self._lo)
+        fee = filled @ self._rates
+        return np.where(notional > 0, np.maximum(fee, self.minimum), 0.0)
+
+
+class SpreadCost(CostModel):
+    """Half the bid/ask spread paid on every fill.
+
+    Uses a ``spread`` column (absolute price units, e.g. from quotes) when the
+    frame has one, else a constant ``spread_bps``.
+    """
+
+    def __init__(self, spread_bps: float = 5.0, column: str = "spread"):
+        self.spread_bps = spread_bps
+        self.column = column
+
+    def prepare(self, df):
+        if self.column in df.columns:
+            half = 0.5 * df[self.column].to_numpy(dtype=float) / df["close"].to_numpy(dtype=float)
+            half = np.where(np.isfinite(half), half, self.spread_bps / 2e4)
+        else:
+            half = np.full(len(df), self.spread_bps / 2e4)
+        return {"half": half}
+
+    def cost(self, prep, idx, shares, price):
+        return prep["half"][idx] * np.abs(shares) * np.asarray(price, dtype=float)
+
+
+class SqrtImpactCost(CostModel):
+    """Square-root market impact: ``coef * sigma * sqrt(|shares| / ADV)`` of notional.
+
+    ``sigma`` (std of bar returns) and ``ADV`` (mean bar volume) are trailing
+    ``window``-bar estimates ending on the previous bar, so the cost of a fill
+    never uses the volume of the bar it trades on. Warm-up bars cost nothing.
+    """
+
+    def __init__(self, coef: float = 1.0, window: int = 20):
+        self.coef = coef
+        self.window = window
+
+    def prepare(self, df):
+        w = self.window
+
+        def fn(sdf, first):
+            close = sdf["close"].to_numpy(dtype=float)
+            ret = np.zeros(len(close))
+            ret[1:] = close[1:] / close[:-1] - 1
+            ret[np.arange(len(close)) == first] = 0.0
+            sigma = rolling_std(ret, w, first + 1)
+            adv = rolling_mean(sdf["volume"].to_numpy(dtype=float), w, first)
+            # shift by one bar within each group: estimates known before the fill
+            sigma = np.concatenate(([np.nan], sigma[:-1]))
+            adv = np.concatenate(([np.nan], adv[:-1]))
+            sigma[first == np.arange(len(first))] = np.nan
+            return sigma, adv
+
+        sigma, adv = _grouped(df, fn)
+        ok = np.isfinite(sigma) & np.isfinite(adv) & (adv > 0)
+        return {"sigma": np.where(ok, sigma, 0.0), "adv": np.where(ok, adv, np.inf)}
+
+    def cost(self, prep, idx, shares, price):
+        qty = np.abs(np.asarray(shares, dtype=float))
+        frac = self.coef * prep["sigma"][idx] * np.sqrt(qty / prep["adv"][idx])
+        return frac * qty * np.asarray(price, dtype=float)
+
+
+class BorrowFee(CostModel):
+    """Borrow fee on short positions, accrued per bar.
+
+    ``annual_rate`` (or a ``borrow_rate`` column, annualized) is spread over
+    the bars per year implied by the index (see
+    ``backtest.metrics.infer_periods_per_year``).
+    """
+
+    def __init__(self, annual_rate: float = 0.02, column: str = "borrow_rate",
+                 periods_per_year: Optional[float] = None):
+        self.annual_rate = annual_rate
+        self.column = column
+        self.periods_per_year = periods_per_year
+
+    def prepare(self, df):
+        ppy = self.periods_per_year or infer_periods_per_year(df.index.unique().sort_values())
+        if self.column in df.columns:
+            rate = df[self.column].fillna(self.annual_rate).to_numpy(dtype=float)
+        else:
+            rate = np.full(len(df), self.annual_rate)
+        return {"rate": rate / ppy}
+
+    def holding_cost(self, prep, idx, shares, price):
+        shares = np.asarray(shares, dtype=float)
+        return np.where(shares < 0, -shares * np.asarray(price, dtype=float) * prep["rate"][idx], 0.0)
+
+
+__all__ = [
+    "CostModel", "CompositeCost", "FlatCommission", "PerShareCommission", "TieredCommission",
+    "SpreadCost", "SqrtImpactCost", "BorrowFee",
+]
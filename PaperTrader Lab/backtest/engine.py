@@ -1,76 +1,329 @@
 from __future__ import annotations
 import backtrader as bt
 import pandas as pd
-from typing import Dict, Any, Optional
-from strategies.ema_atr import EmaAtrStrategy
+from typing import Any, Callable, Dict, Optional, Union
+from strategies import get_strategy
 from backtest.metrics import equity_to_metrics
+from backtest.portfolio import DEFAULT_LOOKBACK, aggregate_portfolio, check_weighting
+from backtest.risk import RiskEngine
+from backtest.costs import CostModel
+from backtest.bt_costs import attach_costs
+from utils.profiling import PROFILER
+from utils.telemetry import METRICS
+
+_BACKTESTS = METRICS.counter("backtests_total", "Backtests run by broker mode", ("mode",))
+_BACKTEST_SECONDS = METRICS.histogram("backtest_seconds", "run_backtest wall time", ("mode",))
+_BARS = METRICS.counter("backtest_bars_total", "Bars fed to backtests")
+_ERRORS = METRICS.counter("errors_total", "Exceptions by component", ("component",))
+
+PROGRESS_STEPS = 100  # progress callbacks per run (also the cancellation granularity)
 
 class PercentRiskSizer(bt.Sizer):
+    """Risk ``risk_per_trade`` of cash between entry and the strategy's stop.
+
+    The stop comes from ``strategy.stop_price`` (set right before ordering);
+    without one the whole price is at risk. When the strategy carries a
+    ``risk`` engine, sizing is delegated to it so the portfolio caps apply.
+    """
     params = dict(risk_per_trade=0.01, min_size=1)
     def _getsizing(self, comminfo, cash, data, isbuy):
         price = data.close[0]
+        stop = getattr(self.strategy, "stop_price", None)
+        engine = getattr(getattr(self.strategy, "p", None), "risk", None)
+        if engine is not None:
+            return engine.size(data._name, self.broker.getvalue(), price, stop)
         risk_cash = cash * self.p.risk_per_trade
-        size = int(max(self.p.min_size, risk_cash // price))
-        return size
+        dist = abs(price - stop) if stop else 0.0
+        size = risk_cash // (dist or price)
+        if comminfo is not None:
+            size = min(size, comminfo.getsize(price, cash))  # affordable with leverage
+        return int(max(self.p.min_size, size))
+
+class TradeReturns(bt.Analyzer):
+    """Closed trades as a ledger: ``dict(symbol, datetime, pnl, ret, ...)``.
+
+    ``ret`` is relative to the book value; ``entry_time``, ``size`` (peak
+    position, signed), ``entry_price`` and ``exit_price`` (average fill
+    prices of the increases and of the reductions, so scale-ins and partial
+    exits count), ``commission`` and ``bars`` describe the round trip.
+    """
+    def start(self):
+        self.trades = []
+        self.strategy.set_tradehistory(True)
+    def notify_trade(self, trade):
+        if not trade.isclosed:
+            return
+        peak, filled = 0.0, {True: [0.0, 0.0], False: [0.0, 0.0]}  # increasing -> [qty, value]
+        for h in trade.history:
+            peak = max(peak, abs(h.status.size))
+            qty = abs(h.event.size)
+            side = filled[(h.event.size > 0) == trade.long]
+            side[0] += qty
+            side[1] += qty * h.event.price
+        (in_qty, in_value), (out_qty, out_value) = filled[True], filled[False]
+        value = self.strategy.broker.getvalue()
+        self.trades.append(dict(symbol=trade.data._name, datetime=trade.data.datetime.datetime(0),
+                                pnl=trade.pnlcomm, ret=trade.pnlcomm / (value - trade.pnlcomm),
+                                entry_time=bt.num2date(trade.dtopen), size=peak if trade.long else -peak,
+                                entry_price=in_value / in_qty if in_qty else trade.price,
+                                exit_price=out_value / out_qty if out_qty else float("nan"),
+                                commission=trade.commission, bars=trade.barlen))
+    def get_analysis(self):
+        return self.trades
+
+class SleeveValue(bt.Analyzer):
+    """Value of one strategy's sleeve of a shared broker, per bar.
+
+    Starts from ``cash`` and follows the strategy's own fills, commissions
+    and holding costs, marked to the close of its feed, so the sleeves of
+    all strategies add up to the broker value.
+    """
+    params = dict(cash=0.0)
+    def start(self):
+        self.feed = self.strategy.getdatabyname(self.strategy.p.symbol)
+        self.values = {}
+        self._cash = self.p.cash
+        self._filled = {}
+    def notify_order(self, order):
+        ex = order.executed
+        if not ex.size and not ex.comm:
+            return
+        # executed size, price and commission are cumulative over partial fills
+        flow = -ex.size * ex.price - ex.comm
+        self._cash += flow - self._filled.get(order.ref, 0.0)
+        self._filled[order.ref] = flow
+    def next(self):
+        pos = self.strategy.getposition(self.feed)
+        credit = self.strategy.broker.d_credit.get(self.feed, 0.0)
+        self.values[self.feed.datetime.datetime(0)] = self._cash - credit + pos.size * self.feed.close[0]
+    def get_analysis(self):
+        return self.values
+
+class ProgressTicker(bt.Analyzer):
+    """Call ``progress(label, done, total)`` every ``every`` bars of the run.
+
+    ``done`` counts bars from ``offset`` (bars of earlier runs of the same
+    backtest). With several strategies on one broker only the first one
+    reports. An exception raised by ``progress`` stops the run mid-way.
+    """
+    params = dict(progress=None, label=None, total=0, offset=0, every=1)
+    def start(self):
+        self._on = self.strategy is self.strategy.env.runningstrats[0]
+    def next(self):
+        n = len(self.strategy)
+        if self._on and n % self.p.every == 0:
+            self.p.progress(self.p.label, self.p.offset + n, self.p.total)
+
+class SignalPandasData(bt.feeds.PandasData):
+    """PandasData with an extra ``signal`` line (precomputed model output)."""
+    lines = ("signal",)
+    params = (("signal", -1),)
 
 def df_to_btfeed(df: pd.DataFrame):
-    # expects single symbol OHLCV
-    data = df[["open","high","low","close","volume"]].copy()
-    data.columns = ["open","high","low","close","volume"]
-    data_bt = bt.feeds.PandasData(dataname=data)
+    # expects single symbol OHLCV, plus an optional precomputed "signal" column
+    cols = ["open","high","low","close","volume"]
+    if "signal" in df.columns:
+        data_bt = SignalPandasData(dataname=df[cols + ["signal"]].copy())
+    else:
+        data_bt = bt.feeds.PandasData(dataname=df[cols].copy())
     return data_bt
 
+@PROFILER.span("run_backtest")
 def run_backtest(df: pd.DataFrame, cash: float, commission: float,
                  slippage_bps: float, sizer_kwargs: Dict[str, Any],
-                 strategy_params: Dict[str, Any]) -> Dict[str, Any]:
-    cerebro = bt.Cerebro(stdstats=False)
-    cerebro.broker.setcash(cash)
-    cerebro.broker.setcommission(commission=commission)  # e.g., 0.001 = 10 bps
-    if slippage_bps:
-        cerebro.broker.set_slippage_perc(perc=slippage_bps/1e4, slip_open=True, slip_limit=True, slip_match=True)
+                 strategy_params: Dict[str, Any],
+                 strategy: Union[str, type, None] = None,
+                 weighting: Any = "equal", rebalance: bool = False,
+                 lookback: Optional[int] = DEFAULT_LOOKBACK,
+                 max_portfolio_risk: Optional[float] = None, leverage: float = 1.0,
+                 costs: Optional[CostModel] = None,
+                 progress: Optional[Callable[[str, int, int], None]] = None) -> Dict[str, Any]:
+    """Backtest ``strategy`` on every symbol of ``df``.
+
+    By default each symbol trades its own slice of ``cash`` in a separate
+    broker and the equity curves are combined with ``weighting`` (estimated
+    schemes use the ``lookback`` bars before each rebalance). Passing
+    ``max_portfolio_risk`` (fraction of equity) runs all symbols on one shared
+    broker instead, with a ``RiskEngine`` enforcing the aggregate open risk
+    and ``leverage`` caps bar by bar; each symbol's sleeve of that broker
+    then stands in for its separate book.
+
+    Both modes return ``equity``, ``metrics``, ``trades`` (ledger),
+    ``per_symbol`` (``symbol``, ``sharpe``, ``maxdd`` in %, ``trades``,
+    ``pnl``), ``portfolio`` (``aggregate_portfolio`` of the per-symbol
+    curves) and ``risk`` (``RiskEngine`` snapshot, ``None`` per symbol).
+
+    ``costs`` (see ``backtest.costs``) replaces the flat ``commission`` with
+    per-bar cost arrays precomputed from each symbol's bars.
+
+    ``strategy`` is a registry name (default ``"ema_atr"``, see
+    ``strategies.STRATEGIES``), whose params are validated and signal column
+    computed, or a Backtrader strategy class used as is.
+
+    ``progress(symbol, done, total)`` reports bars processed, about every
+    ``1 / PROGRESS_STEPS`` of the run and after each symbol (``"portfolio"``
+    with a shared broker); an exception it raises aborts the run, which is
+    how ``utils.jobs`` cancels background backtests.
+    """
+    check_weighting(weighting, rebalance, lookback)
+    mode = "per_symbol" if max_portfolio_risk is None else "shared"
+    _BACKTESTS.inc(mode=mode)
+    _BARS.inc(len(df))
+    with _BACKTEST_SECONDS.time(mode=mode), _ERRORS.count_exceptions(component="backtest"):
+        return _run_backtest(df, cash, commission, slippage_bps, sizer_kwargs, strategy_params,
+                             strategy, weighting, rebalance, lookback, max_portfolio_risk, leverage, costs, progress)
+
+
+def _run_backtest(df, cash, commission, slippage_bps, sizer_kwargs, strategy_params,
+                  strategy, weighting, rebalance, lookback, max_portfolio_risk, leverage, costs, progress):
+    progress = progress or (lambda symbol, done, total: None)
+    if strategy is None or isinstance(strategy, str):
+        spec = get_strategy(strategy or "ema_atr")
+        with PROFILER.span("prepare"):
+            df, strategy_params = spec.prepare(df, strategy_params)
+            strategy = spec.load()
+    if max_portfolio_risk is not None:
+        total = df.index.nunique()
+        progress("portfolio", 0, total)
+        out = _run_shared(df, cash, commission, slippage_bps, sizer_kwargs, strategy_params,
+                          strategy, max_portfolio_risk, leverage, costs, weighting, rebalance, lookback,
+                          progress=progress)
+        progress("portfolio", total, total)
+        return out
 
     # split per symbol; run portfolio by summing broker value at the end (sequential for MVP)
     results = []
     equity_curves = []
+    trades = []
 
+    n_symbols = df["symbol"].nunique()
+    done, every = 0, _progress_every(len(df))
+    progress(None, 0, len(df))
     for sym, sdf in df.groupby("symbol"):
-        dfeed = df_to_btfeed(sdf.droplevel("symbol", axis=0) if isinstance(sdf.index, pd.MultiIndex) else sdf)
+        with PROFILER.span("feed"):
+            dfeed = df_to_btfeed(sdf.droplevel("symbol", axis=0) if isinstance(sdf.index, pd.MultiIndex) else sdf)
         cerebro_sym = bt.Cerebro(stdstats=False)
-        cerebro_sym.broker.setcash(cash/len(df["symbol"].unique()))
-        cerebro_sym.broker.setcommission(commission=commission)
-        if slippage_bps:
-            cerebro_sym.broker.set_slippage_perc(perc=slippage_bps/1e4)
+        cerebro_sym.broker.setcash(cash / n_symbols)
+        _setup_broker(cerebro_sym.broker, commission, slippage_bps, leverage)
 
         cerebro_sym.adddata(dfeed, name=sym)
+        if costs is not None:
+            attach_costs(cerebro_sym.broker, dfeed, sdf, costs, leverage)
         cerebro_sym.addsizer(PercentRiskSizer, **sizer_kwargs)
-        cerebro_sym.addstrategy(EmaAtrStrategy, **strategy_params)
+        cerebro_sym.addstrategy(strategy, **strategy_params)
 
         # Analyzers
-        cerebro_sym.addanalyzer(bt.analyzers.SharpeRatio, _name='sharpe')
-        cerebro_sym.addanalyzer(bt.analyzers.DrawDown, _name='dd')
         cerebro_sym.addanalyzer(bt.analyzers.TimeReturn, _name='ret', timeframe=bt.TimeFrame.Days)
+        cerebro_sym.addanalyzer(TradeReturns, _name='trade_returns')
+        cerebro_sym.addanalyzer(ProgressTicker, progress=progress, label=sym, total=len(df),
+                                offset=done, every=every)
         cerebro_sym.addobserver(bt.observers.Broker)
         cerebro_sym.addobserver(bt.observers.Trades)
 
-        runstrat = cerebro_sym.run(maxcpus=1)[0]
+        with PROFILER.span("cerebro_run", symbol=sym):
+            runstrat = cerebro_sym.run(maxcpus=1)[0]
+
+        with PROFILER.span("analyzers"):
+            # Build equity curve from broker value over time
+            # Backtrader doesn't expose broker series directly; approximate via returns
+            ret = pd.Series(runstrat.analyzers.ret.get_analysis())
+            equity = (1 + ret).cumprod()
+            equity.index = pd.to_datetime(equity.index)
+            equity_curves.append(equity.rename(sym))
+            closed = runstrat.analyzers.trade_returns.get_analysis()
+            results.append(_symbol_row(sym, equity, closed))
+            trades.extend(closed)
+        done += len(sdf)
+        progress(sym, done, len(df))
+
+    # combine equity curves on the union of timestamps; equal weights without
+    # rebalancing is the average notional of the per-symbol books
+    with PROFILER.span("aggregate"):
+        portfolio = aggregate_portfolio(equity_curves, weights=weighting, rebalance=rebalance, lookback=lookback)
+        equity_port = portfolio["equity"]
+        metrics = equity_to_metrics(equity_port)
+
+    return dict(equity=equity_port, per_symbol=results, metrics=metrics, portfolio=portfolio,
+                trades=_trade_frame(trades), risk=None)
+
+
+def _symbol_row(symbol, equity, trades) -> Dict[str, Any]:
+    """``per_symbol`` entry: Sharpe and max drawdown (%) of the symbol's equity, closed trades and net P&L."""
+    m = equity_to_metrics(equity)
+    return dict(symbol=symbol, sharpe=float(m["Sharpe"]) if m else None,
+                maxdd=-100 * float(m["MaxDrawdown"]) if m else None,
+                trades=len(trades), pnl=float(sum(t["pnl"] for t in trades)))
+
+
+def _progress_every(bars: int) -> int:
+    return max(1, bars // PROGRESS_STEPS)
 
-        # Build equity curve from broker value over time
-        # Backtrader doesn't expose broker series directly; approximate via returns
-        ret = pd.Series(runstrat.analyzers.ret.get_analysis())
-        equity = (1 + ret).cumprod()
-        equity.index = pd.to_datetime(equity.index)
-        equity_curves.append(equity.rename(sym))
 
-        dd = runstrat.analyzers.dd.get_analysis()
-        sh = runstrat.analyzers.sharpe.get_analysis()
-        res = dict(symbol=sym,
-                   sharpe=sh.get('sharperatio', None),
-                   maxdd=dd.get('max', {}).get('drawdown', None))
-        results.append(res)
+def _trade_frame(trades) -> pd.DataFrame:
+    cols = ["symbol", "datetime", "pnl", "ret", "entry_time", "size", "entry_price", "exit_price", "commission", "bars"]
+    return pd.DataFrame(trades, columns=cols).sort_values("datetime", kind="stable").reset_index(drop=True)
+
+
+def _setup_broker(broker, commission, slippage_bps, leverage):
+    broker.setcommission(commission=commission, leverage=leverage)  # e.g., 0.001 = 10 bps
+    if slippage_bps:
+        broker.set_slippage_perc(perc=slippage_bps/1e4, slip_open=True, slip_limit=True, slip_match=True)
+
+
+def _run_shared(df, cash, commission, slippage_bps, sizer_kwargs, strategy_params,
+                strategy, max_portfolio_risk, leverage, costs=None,
+                weighting="equal", rebalance=False, lookback=DEFAULT_LOOKBACK, progress=None):
+    # one broker, one strategy instance per symbol, all sized by the same RiskEngine
+    symbols = sorted(df["symbol"].unique())
+    risk = RiskEngine(symbols, risk_per_trade=sizer_kwargs.get("risk_per_trade", 0.01),
+                      max_portfolio_risk=max_portfolio_risk, max_leverage=leverage,
+                      min_size=sizer_kwargs.get("min_size", 1))
+    cerebro = bt.Cerebro(stdstats=False)
+    cerebro.broker.setcash(cash)
+    _setup_broker(cerebro.broker, commission, slippage_bps, leverage)
+    for sym in symbols:
+        sdf = df[df["symbol"] == sym]
+        with PROFILER.span("feed"):
+            dfeed = df_to_btfeed(sdf)
+        cerebro.adddata(dfeed, name=sym)
+        if costs is not None:
+            attach_costs(cerebro.broker, dfeed, sdf, costs, leverage)
+        cerebro.addstrategy(strategy, symbol=sym, risk=risk, **strategy_params)
+    cerebro.addsizer(PercentRiskSizer, **sizer_kwargs)
+    cerebro.addanalyzer(bt.analyzers.TimeReturn, _name='ret', timeframe=bt.TimeFrame.Days)
+    cerebro.addanalyzer(TradeReturns, _name='trade_returns')
+    cerebro.addanalyzer(SleeveValue, _name='sleeve', cash=cash / len(symbols))
+    if progress is not None:
+        total = df.index.nunique()
+        cerebro.addanalyzer(ProgressTicker, progress=progress, label="portfolio", total=total,
+                            every=_progress_every(total))
+    with PROFILER.span("cerebro_run"):
+        runstrats = cerebro.run(maxcpus=1)
+
+    with PROFILER.span("analyzers"):
+        out = _shared_result(runstrats, risk, cerebro.broker.getvalue(), cash / len(symbols))
+    # the sleeves are the per-symbol books of the shared run
+    with PROFILER.span("aggregate"):
+        out["portfolio"] = aggregate_portfolio(out.pop("curves"), weights=weighting,
+                                               rebalance=rebalance, lookback=lookback)
+    return out
 
-    # combine equity curves (simple average notional)
-    equity_df = pd.concat(equity_curves, axis=1).dropna()
-    equity_port = equity_df.mean(axis=1)
-    metrics = equity_to_metrics(equity_port)
 
-    return dict(equity=equity_port, per_symbol=results, metrics=metrics)
+def _shared_result(runstrats, risk, value, sleeve_cash):
+    ret = pd.Series(runstrats[0].analyzers.ret.get_analysis())
+    equity = (1 + ret).cumprod()
+    equity.index = pd.to_datetime(equity.index)
+    results, curves, trades = [], [], []
+    for strat in runstrats:
+        sym = strat.p.symbol
+        sleeve = pd.Series(strat.analyzers.sleeve.get_analysis(), dtype=float) / sleeve_cash
+        sleeve.index = pd.to_datetime(sleeve.index)
+        # one point per day, like the broker's TimeReturn
+        sleeve = sleeve.groupby(sleeve.index.normalize()).last().rename(sym)
+        closed = strat.analyzers.trade_returns.get_analysis()
+        results.append(_symbol_row(sym, sleeve, closed))
+        curves.append(sleeve)
+        trades.extend(closed)
+    return dict(equity=equity.rename("portfolio"), per_symbol=results,
+                metrics=equity_to_metrics(equity), trades=_trade_frame(trades),
+                risk=risk.snapshot(value), curves=curves)
@@ -1,8 +1,62 @@
 import pandas as pd
 import numpy as np
 
-def equity_to_metrics(equity: pd.Series, rf_daily: float = 0.0):
+TRADING_DAYS = 252
+CALENDAR_DAYS = 365
+_DAY_TICKS = {"s": 86_400, "ms": 86_400 * 10**3, "us": 86_400 * 10**6, "ns": 86_400 * 10**9}
+_CALENDARS = {"equity": TRADING_DAYS, "crypto": CALENDAR_DAYS}
+
+def _days_per_year(day: np.ndarray) -> int:
+    """252 for exchange calendars, 365 when bars cover (almost) every calendar day."""
+    first, last = day[0], day[-1]
+    n_days = np.count_nonzero(day[1:] != day[:-1]) + 1
+    if last - first + 1 >= 7:
+        # equities ~5/7 of days (less holidays), Sun-Fri futures 6/7, crypto 7/7
+        return CALENDAR_DAYS if n_days / (last - first + 1) > 0.9 else TRADING_DAYS
+    weekday = (np.unique(day) + 3) % 7  # 1970-01-01 was a Thursday; Monday = 0
+    return CALENDAR_DAYS if {5, 6} <= set(weekday.tolist()) else TRADING_DAYS
+
+def infer_periods_per_year(index: pd.DatetimeIndex, calendar: str | None = None) -> float:
+    """Bars per year implied by the spacing of ``index``.
+
+    Days per year come from ``calendar`` (``"equity"``: 252, ``"crypto"``:
+    365) or, by default, from the observed gaps: 365 when bars cover more
+    than 90% of the calendar days in the sample (weekends included), 252
+    otherwise. Daily data gives that many days; intraday data multiplies it
+    by the median number of bars per calendar day, so session-filtered 15m
+    equity bars (26/day) annualize with 252*26 and 24h crypto 1h bars with
+    365*24. Weekly or sparser data gives 365.25 / spacing in days.
+    """
+    if calendar is not None and calendar not in _CALENDARS:
+        raise ValueError(f"Unknown calendar: {calendar} (available: {', '.join(_CALENDARS)})")
+    if len(index) < 2:
+        return float(_CALENDARS.get(calendar, TRADING_DAYS))
+    idx = pd.DatetimeIndex(index)
+    if idx.tz is not None:
+        idx = idx.tz_localize(None)  # wall-clock days
+    ticks, day_ticks = idx.asi8, _DAY_TICKS[idx.unit]
+    step = np.median(np.diff(ticks[:100_001])) / day_ticks  # spacing is stable; a prefix is enough
+    if step >= 4:
+        return 365.25 / step
+    day = ticks // day_ticks  # sorted, so day boundaries are change points
+    days = _CALENDARS[calendar] if calendar else _days_per_year(day)
+    if step >= 0.8:
+        return float(days)
+    bounds = np.concatenate(([0], np.flatnonzero(day[1:] != day[:-1]) + 1, [len(day)]))
+    return float(days * np.median(np.diff(bounds)))
+
+def _rf_per_bar(rf_daily: float, periods_per_year: float) -> float:
+    """Per-bar rate compounding to the same year as ``rf_daily`` over ``TRADING_DAYS``."""
+    if not rf_daily:
+        return 0.0
+    return (1 + rf_daily) ** (TRADING_DAYS / periods_per_year) - 1
+
+def equity_to_metrics(equity: pd.Series, rf_daily: float = 0.0, periods_per_year: float | None = None):
     # equity: portfolio value over time (index datetime)
+    # rf_daily is the risk-free rate per trading day, converted to the bar frequency
+    ppy = periods_per_year or infer_periods_per_year(equity.index)
+    ann = np.sqrt(ppy)
+    rf = _rf_per_bar(rf_daily, ppy)
     ret = equity.pct_change().dropna()
     # CAGR
     if len(equity) < 2:
@@ -10,16 +64,17 @@ def equity_to_metrics(equity: pd.Series, rf_daily: float = 0.0):
     days = (equity.index[-1] - equity.index[0]).days or 1
     years = days / 365.25
     cagr = (equity.iloc[-1] / equity.iloc[0]) ** (1/years) - 1 if years>0 else np.nan
-    # Sharpe (daily)
-    excess = ret - rf_daily
+    # Sharpe (per bar, annualized)
+    excess = ret - rf
+    ex_mean, ex_std = excess.mean(), excess.std(ddof=1)
     sharpe = np.nan
-    if excess.std(ddof=1) > 0:
-        sharpe = (excess.mean() / excess.std(ddof=1)) * np.sqrt(252)
+    if ex_std > 0:
+        sharpe = (ex_mean / ex_std) * ann
     # Sortino
-    downside = excess[excess < 0]
+    dn_std = excess[excess < 0].std(ddof=1)
     sortino = np.nan
-    if downside.std(ddof=1) > 0:
-        sortino = (excess.mean() / downside.std(ddof=1)) * np.sqrt(252)
+    if dn_std > 0:
+        sortino = (ex_mean / dn_std) * ann
     # Max DD & Calmar
     cum = (1 + ret).cumprod()
     peak = cum.cummax()
@@ -27,7 +82,171 @@ def equity_to_metrics(equity: pd.Series, rf_daily: float = 0.0):
     maxdd = dd.min()
     calmar = np.nan if maxdd == 0 else (cagr / abs(maxdd)) if pd.notna(cagr) else np.nan
     exposure = 1.0  # placeholder; for full accuracy, compute from trades
+    vol = ret.std(ddof=1)
     return dict(
         CAGR=cagr, Sharpe=sharpe, Sortino=sortino, MaxDrawdown=maxdd, Calmar=calmar,
-        Exposure=exposure, AvgDailyRet=ret.mean(), VolDaily=ret.std(ddof=1)
+        Exposure=exposure, AvgDailyRet=ret.mean(), VolDaily=vol,
+        VolAnnual=vol * ann, PeriodsPerYear=ann ** 2
     )
+
+def underwater(equity: pd.Series) -> pd.Series:
+    """Drawdown from the running peak at every point (0 at new highs)."""
+    v = equity.to_numpy(dtype=float)
+    return pd.Series(v / np.maximum.accumulate(v) - 1, index=equity.index, name="drawdown")
+
+def drawdown_periods(equity: pd.Series) -> pd.DataFrame:
+    """One row per drawdown episode: peak, trough, recovery, depth and durations.
+
+    ``end`` is the first bar back at the previous peak (NaT if still under
+    water); ``duration_bars`` counts peak -> recovery (or last bar) and
+    ``recovery_bars`` trough -> recovery.
+    """
+    dd = underwater(equity).to_numpy()
+    under = dd < 0
+    edges = np.diff(np.concatenate(([False], under, [False])).astype(np.int8))
+    starts = np.flatnonzero(edges == 1)
+    stops = np.flatnonzero(edges == -1)  # first bar back at the peak (may be len)
+    cols = ["start", "trough", "end", "depth", "duration_bars", "recovery_bars", "duration"]
+    if not len(starts):
+        return pd.DataFrame(columns=cols)
+    # bars between runs are at 0, so segment minima are the run minima
+    mins = np.minimum.reduceat(dd, starts)
+    run = np.cumsum(edges[:-1] == 1) - 1
+    cand = np.flatnonzero(under & (dd == mins[np.maximum(run, 0)]))
+    first = np.concatenate(([True], run[cand][1:] != run[cand][:-1]))
+    trough = cand[first]
+    idx = equity.index
+    n = len(dd)
+    recovered = stops < n
+    last = np.where(recovered, stops, n - 1)
+    end = pd.Series(idx[np.minimum(stops, n - 1)]).where(recovered)
+    return pd.DataFrame({
+        "start": idx[starts - 1],
+        "trough": idx[trough],
+        "end": end.to_numpy(),
+        "depth": dd[trough],
+        "duration_bars": last - (starts - 1),
+        "recovery_bars": np.where(recovered, stops - trough, -1),
+        "duration": idx[last] - idx[starts - 1],
+    })[cols]
+
+def rolling_metrics(equity: pd.Series, window: int, rf_daily: float = 0.0,
+                    periods_per_year: float | None = None) -> pd.DataFrame:
+    """Rolling annualized volatility, Sharpe and Sortino over ``window`` bars.
+
+    Computed from cumulative sums in a single NumPy pass (no per-window
+    Python), with the same definitions as ``equity_to_metrics`` applied to
+    each window of returns (``rf_daily`` per trading day included).
+    """
+    ppy = periods_per_year or infer_periods_per_year(equity.index)
+    ann = np.sqrt(ppy)
+    rf = _rf_per_bar(rf_daily, ppy)
+    v = equity.to_numpy(dtype=float)
+    x = np.full(len(v), np.nan)
+    x[1:] = v[1:] / v[:-1] - 1 - rf
+    base = np.nanmean(x[1:]) if len(v) > 1 else 0.0  # centre to keep cumsums precise
+    xc = np.nan_to_num(x - base)
+    neg = (x < 0)
+
+    def wsum(a):
+        c = np.concatenate(([0.0], np.cumsum(a)))
+        out = np.full(len(a), np.nan)
+        out[window:] = c[window + 1:] - c[1:-window]
+        return out
+
+    n = float(window)
+    s1, s2 = wsum(xc), wsum(xc * xc)
+    mean = s1 / n + base
+    var = np.maximum(s2 - s1 * s1 / n, 0) / (n - 1)
+    vol = np.sqrt(var)
+    k = wsum(neg.astype(float))
+    d1, d2 = wsum(np.where(neg, xc, 0.0)), wsum(np.where(neg, xc * xc, 0.0))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dvar = np.maximum(d2 - d1 * d1 / k, 0) / (k - 1)
+        dstd = np.where(k > 1, np.sqrt(dvar), np.nan)
+        sharpe = np.where(vol > 0, mean / vol * ann, np.nan)
+        sortino = np.where(dstd > 0, mean / dstd * ann, np.nan)
+    return pd.DataFrame({
+        "ret_mean": mean + rf,
+        "vol": vol * ann,
+        "sharpe": sharpe,
+        "sortino": sortino,
+    }, index=equity.index)
+
+class StreamingMetrics:
+    """Online version of ``equity_to_metrics`` for live equity updates.
+
+    Each ``update`` is O(1): Welford mean/variance of excess returns for
+    Sharpe, a separate Welford accumulator over negative excess returns for
+    Sortino, and a running peak for the drawdown. ``metrics()`` returns the
+    same keys and values as ``equity_to_metrics`` on the series seen so far
+    when given the same ``periods_per_year`` (it cannot be inferred from a
+    stream, so it defaults to daily bars).
+    """
+
+    def __init__(self, rf_daily: float = 0.0, periods_per_year: float = TRADING_DAYS):
+        self.rf_daily = rf_daily
+        self.periods_per_year = periods_per_year
+        self._rf = _rf_per_bar(rf_daily, periods_per_year)
+        self.n = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._dn = 0
+        self._dmean = 0.0
+        self._dm2 = 0.0
+        self._cum = 1.0
+        self._peak = None
+        self.maxdd = np.nan
+        self.first_ts = self.last_ts = None
+        self.first_value = self.last_value = None
+
+    def update(self, ts, value: float) -> None:
+        if self.last_value is None:
+            self.first_ts, self.first_value = ts, value
+            self.last_ts, self.last_value = ts, value
+            return
+        r = value / self.last_value - 1
+        self.last_ts, self.last_value = ts, value
+        x = r - self._rf
+        self.n += 1
+        d = x - self._mean
+        self._mean += d / self.n
+        self._m2 += d * (x - self._mean)
+        if x < 0:
+            self._dn += 1
+            d = x - self._dmean
+            self._dmean += d / self._dn
+            self._dm2 += d * (x - self._dmean)
+        self._cum *= 1 + r
+        if self._peak is None or self._cum > self._peak:
+            self._peak = self._cum
+        dd = self._cum / self._peak - 1
+        if not dd >= self.maxdd:
+            self.maxdd = dd
+
+    def update_many(self, equity: pd.Series) -> None:
+        for ts, value in equity.items():
+            self.update(ts, value)
+
+    @staticmethod
+    def _std(n, m2):
+        return np.sqrt(m2 / (n - 1)) if n > 1 else np.nan
+
+    def metrics(self):
+        if self.n < 1:
+            return {}
+        days = (self.last_ts - self.first_ts).days or 1
+        years = days / 365.25
+        cagr = (self.last_value / self.first_value) ** (1/years) - 1 if years>0 else np.nan
+        ann = np.sqrt(self.periods_per_year)
+        std = self._std(self.n, self._m2)
+        sharpe = (self._mean / std) * ann if std > 0 else np.nan
+        dstd = self._std(self._dn, self._dm2)
+        sortino = (self._mean / dstd) * ann if dstd > 0 else np.nan
+        maxdd = self.maxdd
+        calmar = np.nan if maxdd == 0 else (cagr / abs(maxdd)) if pd.notna(cagr) else np.nan
+        return dict(
+            CAGR=cagr, Sharpe=sharpe, Sortino=sortino, MaxDrawdown=maxdd, Calmar=calmar,
+            Exposure=1.0, AvgDailyRet=self._mean + self._rf, VolDaily=std,
+            VolAnnual=std * ann, PeriodsPerYear=float(self.periods_per_year)
+        )
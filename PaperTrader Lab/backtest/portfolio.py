@@ -0,0 +1,223 @@
+"""Weighted aggregation of per-symbol equity curves into a portfolio.
+
+Everything works on a ``(bars x symbols)`` matrix with NumPy, so universes of
+thousands of symbols aggregate without Python loops over symbols.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Mapping, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+Weights = Union[str, Mapping[str, float], pd.Series, pd.DataFrame]
+
+# bars of history behind estimated ("inverse_vol", "risk_parity") weights
+DEFAULT_LOOKBACK = 60
+
+
+def align_equity(curves: Union[pd.DataFrame, Mapping[str, pd.Series], list]) -> pd.DataFrame:
+    """Align equity curves on the union of their timestamps.
+
+    Gaps and the tail after a curve ends are forward filled (the position is
+    flat, value unchanged); bars before a curve starts take its first value,
+    i.e. the capital is held in cash until the symbol starts trading.
+    """
+    df = curves if isinstance(curves, pd.DataFrame) else pd.concat(curves, axis=1, sort=True)
+    return df.sort_index().ffill().bfill()
+
+
+def _returns(equity: np.ndarray) -> np.ndarray:
+    r = np.zeros_like(equity, dtype=float)
+    r[1:] = equity[1:] / equity[:-1] - 1
+    return r
+
+
+def _risk_parity(cov: np.ndarray, max_iter: int = 500, tol: float = 1e-10) -> np.ndarray:
+    """Equal risk contribution weights (vectorized Jacobi form of Spinu's fixed point).
+
+    ``cov`` may be a stack ``(..., n, n)`` of covariance matrices, solved
+    together. Assets with zero variance get no risk budget (zero weight).
+    """
+    diag = np.diagonal(cov, axis1=-2, axis2=-1).copy()
+    active = diag > 0
+    k = active.sum(axis=-1, keepdims=True)
+    b = np.divide(active, k, out=np.zeros_like(diag), where=k > 0)
+    diag[~active] = 1.0
+    x = np.sqrt(b / diag)
+
+    def _scale(x):
+        var = np.sum(x * (cov @ x[..., None])[..., 0], axis=-1, keepdims=True)
+        return np.divide(x, np.sqrt(var), out=x, where=var > 0)
+
+    x = _scale(x)
+    for _ in range(max_iter):
+        c = (cov @ x[..., None])[..., 0] - diag * x
+        new = (-c + np.sqrt(c * c + 4 * diag * b)) / (2 * diag)
+        new = _scale(0.5 * (x + new))  # damping keeps the simultaneous update stable
+        done = np.max(np.abs(new - x)) < tol
+        x = new
+        if done:
+            break
+    total = x.sum(axis=-1, keepdims=True)
+    n = x.shape[-1]
+    return np.divide(x, total, out=np.full_like(x, 1.0 / n), where=total > 0)
+
+
+def _rolling_risk_parity(r: np.ndarray, lookback: int, chunk: int = 2_000_000) -> np.ndarray:
+    """Per-bar risk parity weights from the covariance of the previous ``lookback`` bars.
+
+    Windows are solved in batches of about ``chunk`` covariance entries.
+    """
+    n_bars, n = r.shape
+    w = np.full((n_bars, n), 1.0 / n)
+    # windows[j] covers bars j .. j+lookback-1 and weights bar j+lookback+1
+    windows = np.lib.stride_tricks.sliding_window_view(r[1:-1], lookback, axis=0) if n_bars > lookback + 1 else None
+    if windows is None:
+        return w
+    step = max(1, chunk // (n * n))
+    for a in range(0, len(windows), step):
+        win = windows[a:a + step]
+        dev = win - win.mean(axis=-1, keepdims=True)
+        cov = dev @ dev.swapaxes(-1, -2) / (lookback - 1)
+        w[a + lookback + 1:a + lookback + 1 + len(win)] = _risk_parity(cov)
+    return w
+
+
+def compute_weights(returns: pd.DataFrame, scheme: Weights = "equal",
+                    lookback: Optional[int] = DEFAULT_LOOKBACK) -> Union[pd.Series, pd.DataFrame]:
+    """Portfolio weights for ``returns`` (bars x symbols).
+
+    Parameters
+    ----------
+    returns : pandas.DataFrame
+        Per-bar symbol returns.
+    scheme : str, mapping, Series or DataFrame
+        ``"equal"``, ``"inverse_vol"``, ``"risk_parity"``, or explicit weights
+        (static per symbol, or a DataFrame of weights per bar).
+    lookback : int, optional
+        For ``"inverse_vol"`` and ``"risk_parity"``: weights of bar ``t``
+        are estimated from the ``lookback`` bars before it (time-varying,
+        no look-ahead; equal weights until enough history). ``None`` uses
+        the full-sample estimate, which sees the returns it is applied to:
+        for ex-post analysis only, not for backtests.
+
+    Returns
+    -------
+    pandas.Series or pandas.DataFrame
+        Static weights summing to 1, or per-bar weights.
+    """
+    cols = returns.columns
+    if isinstance(scheme, pd.DataFrame):
+        return scheme.reindex(index=returns.index, columns=cols).ffill().fillna(0.0)
+    if isinstance(scheme, (pd.Series, Mapping)):
+        w = pd.Series(scheme, dtype=float).reindex(cols).fillna(0.0)
+        return w / w.sum()
+    r = returns.to_numpy()
+    if scheme == "equal":
+        return pd.Series(1.0 / len(cols), index=cols)
+    if scheme == "inverse_vol":
+        if lookback:
+            c1 = np.cumsum(np.vstack([np.zeros(len(cols)), r]), axis=0)
+            c2 = np.cumsum(np.vstack([np.zeros(len(cols)), r * r]), axis=0)
+            n = float(lookback)
+            s1 = np.full_like(r, np.nan)
+            s2 = np.full_like(r, np.nan)
+            # window of the previous `lookback` bars, ending at t-1
+            s1[lookback + 1:] = c1[lookback + 1:-1] - c1[1:-lookback - 1]
+            s2[lookback + 1:] = c2[lookback + 1:-1] - c2[1:-lookback - 1]
+            vol = np.sqrt(np.maximum(s2 - s1 * s1 / n, 0) / (n - 1))
+            inv = np.divide(1.0, vol, out=np.zeros_like(vol), where=vol > 0)
+            total = inv.sum(axis=1, keepdims=True)
+            w = np.divide(inv, total, out=np.full_like(inv, 1.0 / len(cols)), where=total > 0)
+            return pd.DataFrame(w, index=returns.index, columns=cols)
+        vol = r[1:].std(axis=0, ddof=1)
+        inv = np.divide(1.0, vol, out=np.zeros_like(vol), where=vol > 0)
+        return pd.Series(inv / inv.sum(), index=cols)
+    if scheme == "risk_parity":
+        if lookback:
+            return pd.DataFrame(_rolling_risk_parity(r, lookback), index=returns.index, columns=cols)
+        return pd.Series(_risk_parity(np.cov(r[1:], rowvar=False).reshape(len(cols), len(cols))), index=cols)
+    raise ValueError(f"Unknown weighting scheme: {scheme}")
+
+
+def risk_contributions(weights: np.ndarray, cov: np.ndarray) -> np.ndarray:
+    """Fraction of portfolio variance contributed by each asset (sums to 1)."""
+    m = cov @ weights
+    var = weights @ m
+    return weights * m / var if var > 0 else np.full(len(weights), np.nan)
+
+
+def check_weighting(weights: Weights, rebalance: bool, lookback: Optional[int] = DEFAULT_LOOKBACK) -> None:
+    """Raise ``ValueError`` for per-bar weights without rebalancing (see :func:`aggregate_portfolio`)."""
+    per_bar = isinstance(weights, pd.DataFrame) or (
+        isinstance(weights, str) and weights in ("inverse_vol", "risk_parity") and bool(lookback))
+    if per_bar and not rebalance:
+        raise ValueError(f"per-bar weights ({weights if isinstance(weights, str) else 'DataFrame'}) need "
+                         "rebalance=True, or lookback=None for static full-sample estimates")
+
+
+def aggregate_portfolio(curves, weights: Weights = "equal", rebalance: bool = True,
+                        lookback: Optional[int] = DEFAULT_LOOKBACK) -> Dict[str, object]:
+    """Combine per-symbol equity curves into a weighted portfolio.
+
+    Parameters
+    ----------
+    curves : DataFrame, mapping or list of Series
+        Per-symbol equity curves, possibly on different timestamps.
+    weights : str, mapping, Series or DataFrame
+        See :func:`compute_weights`.
+    rebalance : bool
+        ``True`` rebalances to the target weights every bar (constant mix);
+        ``False`` invests the weights once and lets them drift (buy and hold,
+        for equal weights the plain average of the normalized curves); it
+        needs static weights, so it raises ``ValueError`` for per-bar ones
+        (a weight DataFrame, or an estimated scheme with ``lookback``).
+    lookback : int, optional
+        Passed to :func:`compute_weights`.
+
+    Returns
+    -------
+    dict
+        ``equity`` and ``returns`` (Series), ``weights``, ``correlation``
+        (DataFrame), ``risk_contribution`` (Series) and ``turnover`` (Series,
+        one-way fraction of the portfolio traded per bar).
+    """
+    eq = align_equity(curves)
+    cols = eq.columns
+    values = eq.to_numpy(dtype=float)
+    r = _returns(values)
+    rets = pd.DataFrame(r, index=eq.index, columns=cols)
+    check_weighting(weights, rebalance, lookback)
+    w = compute_weights(rets, weights, lookback=lookback)
+
+    if rebalance:
+        W = np.broadcast_to(w.to_numpy(), r.shape) if isinstance(w, pd.Series) else w.to_numpy()
+        rp = (W * r).sum(axis=1)
+        equity = np.cumprod(1 + rp)
+        drift = W * (1 + r) / (1 + rp)[:, None]
+        turnover = np.zeros(len(r))
+        turnover[1:] = 0.5 * np.abs(W[1:] - drift[:-1]).sum(axis=1)
+        w_last = W[-1]
+    else:
+        norm = values / values[0]
+        equity = norm @ w.to_numpy()
+        rp = _returns(equity)
+        turnover = np.zeros(len(r))
+        w_last = w.to_numpy()
+
+    cov = np.cov(r[1:], rowvar=False).reshape(len(cols), len(cols)) if len(r) > 2 else np.zeros((len(cols),) * 2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = np.corrcoef(r[1:], rowvar=False).reshape(len(cols), len(cols)) if len(r) > 2 else cov
+    return dict(
+        equity=pd.Series(equity, index=eq.index, name="portfolio"),
+        returns=pd.Series(rp, index=eq.index, name="portfolio"),
+        weights=w,
+        correlation=pd.DataFrame(corr, index=cols, columns=cols),
+        risk_contribution=pd.Series(risk_contributions(w_last, cov), index=cols),
+        turnover=pd.Series(turnover, index=eq.index, name="turnover"),
+    )
+
+
+__all__ = ["DEFAULT_LOOKBACK", "align_equity", "check_weighting", "compute_weights", "risk_contributions", "aggregate_portfolio"]
@@ -0,0 +1,151 @@
+"""Cross-symbol risk engine: stop-distance sizing with portfolio caps.
+
+``RiskEngine`` keeps the open positions of every symbol in flat NumPy arrays
+(shares, stop, last price) indexed by a fixed symbol slot, so sizing a new
+entry and marking a bar are O(1) updates and the aggregate checks are a single
+vectorized sum, whatever the size of the universe. The same object serves the
+shared-broker backtest (see ``backtest.engine.run_backtest``) and live runners,
+which can seed it from ``paper.alpaca.positions()``.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable, Mapping, Optional
+
+import numpy as np
+
+
+class RiskEngine:
+    """Position sizing and aggregate risk/leverage limits across symbols.
+
+    Parameters
+    ----------
+    symbols : iterable of str
+        Universe; more symbols can be added later with :meth:`slot`.
+    risk_per_trade : float
+        Fraction of equity lost if a new position hits its stop.
+    max_portfolio_risk : float
+        Cap on the summed open risk (distance to stop of every position) as a
+        fraction of equity, e.g. ``0.2``.
+    max_leverage : float
+        Cap on gross exposure / equity.
+    min_size : int
+        Entries smaller than this are skipped (size 0) instead of rounded up.
+    """
+
+    def __init__(self, symbols: Iterable[str] = (), risk_per_trade: float = 0.01,
+                 max_portfolio_risk: float = 0.2, max_leverage: float = 1.0, min_size: int = 1):
+        self.risk_per_trade = risk_per_trade
+        self.max_portfolio_risk = max_portfolio_risk
+        self.max_leverage = max_leverage
+        self.min_size = min_size
+        self._index: Dict[str, int] = {}
+        self.shares = np.zeros(0)
+        self.stop = np.zeros(0)
+        self.last = np.zeros(0)
+        self.rejected = 0
+        for sym in symbols:
+            self.slot(sym)
+
+    def slot(self, symbol: str) -> int:
+        """Array position of ``symbol`` (allocated on first use)."""
+        i = self._index.get(symbol)
+        if i is None:
+            i = self._index[symbol] = len(self._index)
+            if i >= len(self.shares):
+                grow = max(8, len(self.shares))
+                self.shares = np.concatenate([self.shares, np.zeros(grow)])
+                self.stop = np.concatenate([self.stop, np.zeros(grow)])
+                self.last = np.concatenate([self.last, np.zeros(grow)])
+        return i
+
+    # -- aggregate state -------------------------------------------------
+
+    def open_risk(self) -> np.ndarray:
+        """Cash lost per symbol if every stop is hit from the last price."""
+        return np.maximum(self.shares * (self.last - self.stop), 0.0)
+
+    def exposure(self) -> np.ndarray:
+        return np.abs(self.shares) * self.last
+
+    def total_risk(self) -> float:
+        return float(self.open_risk().sum())
+
+    def gross_exposure(self) -> float:
+        return float(self.exposure().sum())
+
+    # -- sizing ----------------------------------------------------------
+
+    def size(self, symbol: str, equity: float, price: float, stop: Optional[float] = None) -> int:
+        """Number of shares for a new entry within every limit.
+
+        The per-trade budget is ``risk_per_trade * equity`` divided by the
+        stop distance, then cut to the risk and exposure still available
+        after the other symbols' open positions. Without a stop the whole
+        price is at risk.
+        """
+        if equity <= 0 or price <= 0:
+            return 0
+        i = self.slot(symbol)
+        dist = abs(price - stop) if stop is not None else price
+        if not dist > 0:
+            dist = price
+        risk, expo = self.open_risk(), self.exposure()
+        risk_room = equity * self.max_portfolio_risk - (risk.sum() - risk[i])
+        expo_room = equity * self.max_leverage - (expo.sum() - expo[i])
+        budget = min(equity * self.risk_per_trade, risk_room)
+        shares = int(max(min(budget / dist, expo_room / price), 0.0))
+        if shares < self.min_size:
+            self.rejected += 1
+            return 0
+        return shares
+
+    # -- position updates ------------------------------------------------
+
+    def open(self, symbol: str, shares: float, price: float, stop: Optional[float] = None) -> None:
+        """Register a position (positive shares long, negative short)."""
+        i = self.slot(symbol)
+        self.shares[i] = shares
+        self.last[i] = price
+        self.stop[i] = stop if stop is not None else 0.0
+
+    def close(self, symbol: str) -> None:
+        i = self._index.get(symbol)
+        if i is not None:
+            self.shares[i] = 0.0
+
+    def update_stop(self, symbol: str, stop: float) -> None:
+        self.stop[self.slot(symbol)] = stop
+
+    def mark(self, symbol: str, price: float) -> None:
+        i = self._index.get(symbol)
+        if i is not None:
+            self.last[i] = price
+
+    def mark_many(self, prices: Mapping[str, float]) -> None:
+        """Mark several symbols at once (e.g. a snapshot of last trades)."""
+        idx = [self._index[s] for s in prices if s in self._index]
+        vals = [p for s, p in prices.items() if s in self._index]
+        self.last[idx] = vals
+
+    def load_positions(self, positions: Iterable[Mapping], stops: Optional[Mapping[str, float]] = None) -> None:
+        """Seed from broker rows with ``symbol``, ``qty`` and ``avg_entry``/``market_value``."""
+        stops = stops or {}
+        for p in positions:
+            qty = float(p["qty"])
+            price = abs(float(p["market_value"]) / qty) if qty and "market_value" in p else float(p["avg_entry"])
+            self.open(p["symbol"], qty, price, stops.get(p["symbol"]))
+
+    def snapshot(self, equity: float) -> Dict[str, float]:
+        risk, expo = self.total_risk(), self.gross_exposure()
+        return dict(
+            open_risk=risk,
+            open_risk_pct=risk / equity if equity else float("nan"),
+            gross_exposure=expo,
+            leverage=expo / equity if equity else float("nan"),
+            positions=int(np.count_nonzero(self.shares)),
+            rejected=self.rejected,
+        )
+
+
+__all__ = ["RiskEngine"]
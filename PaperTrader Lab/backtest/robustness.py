@@ -0,0 +1,196 @@
+"""Bootstrap / Monte Carlo robustness of backtest returns.
+
+``bootstrap_metrics`` resamples per-bar or per-trade returns and reports
+confidence intervals for CAGR, Sharpe and MaxDrawdown plus a probability of
+ruin, all batched in NumPy.
+
+Circular block bootstrap never materializes the ``paths x bars`` matrix.
+For each of the ``n`` possible block starts the sum of log and simple
+returns, the min/max of the log-equity inside the block and the intra-block
+drawdown are precomputed once. A path is then a sequence of block starts,
+and its drawdown follows from scanning the blocks (vectorized over paths):
+
+* ``dd = max(dd, peak - level - block_min, block_dd)``
+* ``peak = max(peak, level + block_max)``
+
+so the cost is ``O(n * block + paths * n / block)``. Trade shuffling
+(permutations, where only the path and hence the drawdown changes) is
+evaluated on chunks of permuted paths.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from backtest.metrics import TRADING_DAYS, infer_periods_per_year
+
+_CHUNK_CELLS = 1 << 22
+
+
+def _block_stats(log_r: np.ndarray, r: np.ndarray, length: int) -> Dict[str, np.ndarray]:
+    """Stats of the circular block of ``length`` returns starting at every position."""
+    n = len(log_r)
+    ext = np.concatenate((log_r, log_r[:length]))
+    c = np.concatenate(([0.0], np.cumsum(ext)))
+    windows = sliding_window_view(c[1:], length)
+    lo = np.empty(n)
+    hi = np.empty(n)
+    dd = np.empty(n)
+    step = max(1, _CHUNK_CELLS // length)
+    for a in range(0, n, step):
+        b = min(a + step, n)
+        w = windows[a:b] - c[a:b, None]
+        lo[a:b] = w.min(axis=1)
+        hi[a:b] = w.max(axis=1)
+        peak = np.maximum.accumulate(np.maximum(w, 0.0), axis=1)
+        dd[a:b] = (peak - w).max(axis=1)
+    c1 = np.concatenate(([0.0], np.cumsum(np.concatenate((r, r[:length])))))
+    c2 = np.concatenate(([0.0], np.cumsum(np.concatenate((r, r[:length])) ** 2)))
+    starts = np.arange(n)
+    return dict(
+        total=c[starts + length] - c[starts],
+        lo=lo, hi=hi, dd=dd,
+        s1=c1[starts + length] - c1[starts],
+        s2=c2[starts + length] - c2[starts],
+    )
+
+
+def _block_paths(log_r, r, n_paths, block, rng) -> Dict[str, np.ndarray]:
+    n = len(r)
+    n_blocks = -(-n // block)
+    rem = n - (n_blocks - 1) * block
+    full = _block_stats(log_r, r, block)
+    last = full if rem == block else _block_stats(log_r, r, rem)
+
+    out = {k: np.empty(n_paths) for k in ("total", "dd", "low", "s1", "s2")}
+    step = max(1, _CHUNK_CELLS // n_blocks)
+    for a in range(0, n_paths, step):
+        m = min(step, n_paths - a)
+        starts = rng.integers(0, n, size=(m, n_blocks))
+        level = np.zeros(m)
+        peak = np.zeros(m)
+        dd = np.zeros(m)
+        low = np.zeros(m)
+        s1 = np.zeros(m)
+        s2 = np.zeros(m)
+        for j in range(n_blocks):
+            st = last if j == n_blocks - 1 else full
+            s = starts[:, j]
+            blo = level + st["lo"][s]
+            np.maximum(dd, np.maximum(peak - blo, st["dd"][s]), out=dd)
+            np.maximum(peak, level + st["hi"][s], out=peak)
+            np.minimum(low, blo, out=low)
+            level += st["total"][s]
+            s1 += st["s1"][s]
+            s2 += st["s2"][s]
+        for k, v in (("total", level), ("dd", dd), ("low", low), ("s1", s1), ("s2", s2)):
+            out[k][a:a + m] = v
+    return out
+
+
+def _shuffle_paths(log_r, r, n_paths, rng) -> Dict[str, np.ndarray]:
+    n = len(r)
+    dd = np.empty(n_paths)
+    low = np.empty(n_paths)
+    step = max(1, _CHUNK_CELLS // n)
+    for a in range(0, n_paths, step):
+        m = min(step, n_paths - a)
+        level = np.cumsum(rng.permuted(np.broadcast_to(log_r, (m, n)), axis=1), axis=1)
+        peak = np.maximum.accumulate(np.maximum(level, 0.0), axis=1)
+        dd[a:a + m] = (peak - level).max(axis=1)
+        low[a:a + m] = np.minimum(level.min(axis=1), 0.0)
+    # the order does not change sums: CAGR and Sharpe are the same on every path
+    return dict(total=np.full(n_paths, log_r.sum()), dd=dd, low=low,
+                s1=np.full(n_paths, r.sum()), s2=np.full(n_paths, (r * r).sum()))
+
+
+def bootstrap_metrics(
+    returns: pd.Series,
+    n_paths: int = 10_000,
+    method: str = "block",
+    block_size: Optional[int] = None,
+    periods_per_year: Optional[float] = None,
+    ruin_threshold: float = 0.5,
+    quantiles: Sequence[float] = (0.05, 0.5, 0.95),
+    seed: Optional[int] = None,
+) -> Dict[str, object]:
+    """Confidence intervals of CAGR, Sharpe and MaxDrawdown by resampling.
+
+    Parameters
+    ----------
+    returns : pandas.Series
+        Per-bar returns (e.g. ``result["equity"].pct_change().dropna()``) or
+        per-trade returns, in time order.
+    n_paths : int
+        Number of resampled paths.
+    method : str
+        ``"block"``: circular block bootstrap, keeps autocorrelation up to
+        ``block_size`` (``block_size=1`` is the iid bootstrap).
+        ``"shuffle"``: random permutations of the returns (trade order
+        risk; CAGR and Sharpe are unchanged, only the path varies).
+    block_size : int, optional
+        Default ``n ** (1/3)``.
+    periods_per_year : float, optional
+        Returns per year, inferred from a DatetimeIndex by default (see
+        ``backtest.metrics.infer_periods_per_year``), else 252.
+    ruin_threshold : float
+        A path is ruined when equity falls below this fraction of the start.
+    quantiles : sequence of float
+        Quantiles reported for every metric.
+    seed : int, optional
+        Seed of the random generator.
+
+    Returns
+    -------
+    dict
+        ``observed`` (metrics of the original series), ``quantiles``
+        (DataFrame, metric x quantile), ``prob_ruin``, ``samples`` (DataFrame
+        of per-path metrics), ``method`` and ``block_size``.
+    """
+    r = pd.Series(returns).dropna()
+    ppy = periods_per_year or (infer_periods_per_year(r.index) if isinstance(r.index, pd.DatetimeIndex)
+                               else float(TRADING_DAYS))
+    r = r.to_numpy(dtype=float)
+    n = len(r)
+    if n < 2:
+        raise ValueError("at least 2 returns are required")
+    log_r = np.log1p(np.maximum(r, -1 + 1e-12))
+    rng = np.random.default_rng(seed)
+
+    if method == "block":
+        block_size = int(block_size or max(1, round(n ** (1 / 3))))
+        stats = _block_paths(log_r, r, n_paths, min(block_size, n), rng)
+    elif method == "shuffle":
+        block_size = None
+        stats = _shuffle_paths(log_r, r, n_paths, rng)
+    else:
+        raise ValueError(f"Unknown method: {method}")
+
+    def metrics(total, dd, s1, s2):
+        years = n / ppy
+        mean = s1 / n
+        std = np.sqrt(np.maximum(s2 - n * mean * mean, 0.0) / (n - 1))
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            cagr = np.expm1(total / years)
+            sharpe = np.where(std > 0, mean / std * np.sqrt(ppy), np.nan)
+        return dict(CAGR=cagr, Sharpe=sharpe, MaxDrawdown=np.expm1(-dd))
+
+    samples = pd.DataFrame(metrics(stats["total"], stats["dd"], stats["s1"], stats["s2"]))
+    level = np.cumsum(log_r)
+    obs_dd = (np.maximum.accumulate(np.maximum(level, 0.0)) - level).max()
+    observed = {k: float(v) for k, v in metrics(log_r.sum(), obs_dd, r.sum(), (r * r).sum()).items()}
+    return dict(
+        observed=observed,
+        quantiles=samples.quantile(list(quantiles)).T,
+        prob_ruin=float(np.mean(stats["low"] <= np.log(ruin_threshold))),
+        samples=samples,
+        method=method,
+        block_size=block_size,
+    )
+
+
+__all__ = ["bootstrap_metrics"]
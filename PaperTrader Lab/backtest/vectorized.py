@@ -0,0 +1,121 @@
+"""Vectorized backtest of target positions with the same cost models.
+
+A NumPy counterpart to the backtrader engine for signal research and large
+universes: positions are decided at each bar's close and the whole frame is
+processed at once (rows sorted by symbol/time, group-aware shifts and
+cumulative sums), so there is no per-bar or per-fill Python.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from backtest.costs import CostModel
+from backtest.metrics import equity_to_metrics
+from backtest.portfolio import DEFAULT_LOOKBACK, aggregate_portfolio, check_weighting
+from strategies import get_strategy
+from utils.grouped import symbol_order
+
+
+def run_vectorized(df: pd.DataFrame, positions: Union[str, pd.Series, np.ndarray] = "position",
+                   cash: float = 100_000, costs: Optional[CostModel] = None,
+                   weighting: Any = "equal", rebalance: bool = False,
+                   lookback: Optional[int] = DEFAULT_LOOKBACK,
+                   strategy: Optional[str] = None, strategy_params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Backtest target positions for every symbol of ``df``.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        ``load_ohlcv`` frame (``close``, ``volume`` and ``symbol`` columns).
+    positions : str, Series or array
+        Target exposure per row as a multiple of the symbol's capital
+        (``1`` long, ``-1`` short, ``0`` flat), or the name of a column of
+        ``df`` holding it. Changes trade at the close of their bar; shares
+        are then held constant until the next change.
+    cash : float
+        Starting capital, split equally across symbols.
+    costs : CostModel, optional
+        Charged on every change of shares and on held positions.
+    weighting, rebalance, lookback
+        Passed to :func:`backtest.portfolio.aggregate_portfolio`.
+    strategy, strategy_params : optional
+        Registry strategy (see ``strategies.STRATEGIES``) supporting the
+        ``"vectorized"`` engine; its signal column becomes ``positions``.
+
+    Returns
+    -------
+    dict
+        Same layout as ``run_backtest``: ``equity``, ``per_symbol``,
+        ``metrics``, ``portfolio``, plus total ``costs``.
+    """
+    check_weighting(weighting, rebalance, lookback)
+    if strategy is not None:
+        spec = get_strategy(strategy)
+        if "vectorized" not in spec.engines:
+            raise ValueError(f"{strategy} does not support the vectorized engine")
+        df, _ = spec.prepare(df, strategy_params)
+        positions = "signal"
+    if isinstance(positions, str):
+        positions = df[positions]
+    target = np.nan_to_num(np.asarray(positions, dtype=float))
+    if "symbol" not in df.columns:
+        df = df.assign(symbol="")
+
+    order = symbol_order(df)
+    sdf = df.iloc[order]
+    target = target[order]
+    close = sdf["close"].to_numpy(dtype=float)
+    keys, symbols = pd.factorize(sdf["symbol"])
+    n = len(sdf)
+    rows = np.arange(n)
+    starts = np.concatenate(([0], np.flatnonzero(keys[1:] != keys[:-1]) + 1))
+    is_first = np.zeros(n, dtype=bool)
+    is_first[starts] = True
+    capital = cash / len(symbols)
+
+    def prev(x):
+        out = np.concatenate(([0.0], x[:-1]))
+        out[is_first] = 0.0
+        return out
+
+    # shares fixed when the target changes, forward filled within the symbol
+    change = (target != prev(target)) | is_first
+    last_change = np.maximum.accumulate(np.where(change, rows, 0))
+    shares = (target * capital / close)[last_change]
+    held = prev(shares)
+    trades = shares - held
+
+    pnl = held * (close - prev(close))
+    fill_cost = np.zeros(n)
+    hold_cost = np.zeros(n)
+    if costs is not None:
+        prep = costs.prepare(sdf)
+        traded = np.flatnonzero(trades)
+        fill_cost[traded] = costs.cost(prep, traded, trades[traded], close[traded])
+        hold_cost = np.asarray(costs.holding_cost(prep, rows, held, close), dtype=float)
+    net = pnl - fill_cost - hold_cost
+
+    cum = np.cumsum(net)
+    base = np.repeat(cum[starts] - net[starts], np.diff(np.append(starts, n)))
+    equity = capital + cum - base
+
+    curves, per_symbol = [], []
+    bounds = np.append(starts, n)
+    idx = sdf.index
+    for g, sym in enumerate(symbols):
+        a, b = bounds[g], bounds[g + 1]
+        curves.append(pd.Series(equity[a:b] / capital, index=idx[a:b], name=sym))
+        per_symbol.append(dict(symbol=sym, trades=int(np.count_nonzero(trades[a:b])),
+                               pnl=float(net[a:b].sum()), costs=float(fill_cost[a:b].sum() + hold_cost[a:b].sum())))
+
+    portfolio = aggregate_portfolio(curves, weights=weighting, rebalance=rebalance, lookback=lookback)
+    return dict(equity=portfolio["equity"], per_symbol=per_symbol,
+                metrics=equity_to_metrics(portfolio["equity"]), portfolio=portfolio,
+                costs=dict(fills=float(fill_cost.sum()), holding=float(hold_cost.sum())))
+
+
+__all__ = ["run_vectorized"]
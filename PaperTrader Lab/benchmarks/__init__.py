@@ -0,0 +1,6 @@
+"""Offline benchmarks of the loader, engine, metrics and ML hot paths.
+
+``python -m benchmarks.run`` times every case on seeded synthetic data and
+writes a JSON file; ``python -m benchmarks.compare old.json new.json``
+reports the ratios between two runs (e.g. two commits).
+"""
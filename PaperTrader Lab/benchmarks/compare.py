@@ -0,0 +1,50 @@
+"""Compare two ``benchmarks.run`` reports.
+
+Usage::
+
+    python -m benchmarks.compare .cache/benchmarks/abc123.json .cache/benchmarks/def456.json
+
+Prints the median time of every shared case and the ratio new/old; exits
+with status 1 when a case is slower than ``--threshold`` (default +10%).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+
+def compare_reports(old: Dict[str, Any], new: Dict[str, Any], threshold: float = 0.10) -> List[Dict[str, Any]]:
+    """Rows ``{case, old, new, ratio, regression}`` for the cases present in both reports."""
+    rows = []
+    for case, n in new["results"].items():
+        o = old["results"].get(case)
+        if o is None:
+            continue
+        ratio = n["median"] / o["median"] if o["median"] > 0 else float("inf")
+        rows.append(dict(case=case, old=o["median"], new=n["median"], ratio=ratio,
+                         regression=ratio > 1 + threshold))
+    return rows
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("old", type=Path)
+    ap.add_argument("new", type=Path)
+    ap.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown (0.10 = +10%%)")
+    args = ap.parse_args(argv)
+
+    old, new = (json.loads(p.read_text()) for p in (args.old, args.new))
+    print(f"old: {old.get('commit')}  new: {new.get('commit')}")
+    rows = compare_reports(old, new, args.threshold)
+    for r in rows:
+        flag = "  REGRESSION" if r["regression"] else ""
+        print(f"{r['case']:<40} {r['old'] * 1e3:10.1f} ms {r['new'] * 1e3:10.1f} ms  x{r['ratio']:.2f}{flag}")
+    return 1 if any(r["regression"] for r in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
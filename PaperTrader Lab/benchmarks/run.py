@@ -0,0 +1,174 @@
+"""Time the hot paths on synthetic data and store the results as JSON.
+
+Usage::
+
+    python -m benchmarks.run                       # "small" suite
+    python -m benchmarks.run --suite large --only backtest metrics
+    python -m benchmarks.run --out .cache/benchmarks/before.json
+
+Every case generates its frame once (seeded) and times each benchmark
+``--repeat`` times; min, median and rows/s are written with the git commit and
+library versions, so two files can be compared with ``benchmarks.compare``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import synthetic_ohlcv
+
+ROOT = Path(__file__).resolve().parents[1]
+TZ = "America/New_York"
+
+# (n_symbols, timeframe, business days) per suite
+SUITES: Dict[str, List[Tuple[int, str, int]]] = {
+    "smoke": [(1, "D", 60), (2, "15m", 5)],
+    "small": [(1, "D", 504), (1, "15m", 60), (1, "1m", 20)],
+    "medium": [(10, "D", 1260), (10, "15m", 252), (10, "1m", 60)],
+    "large": [(100, "D", 2520), (100, "15m", 252), (100, "1m", 60)],
+}
+DEFAULT_SUITES = ("small",)
+
+
+def _prepared(raw: pd.DataFrame, intraday: bool) -> pd.DataFrame:
+    from data.loader import _postprocess
+    return _postprocess(raw, TZ, session_filter_on=intraday)
+
+
+def _bench_loader(raw, df, intraday):
+    from data.loader import _postprocess
+    return lambda: _postprocess(raw, TZ, session_filter_on=intraday), len(raw)
+
+
+def _bench_backtest(raw, df, intraday):
+    from backtest.engine import run_backtest
+    return (lambda: run_backtest(df, cash=100_000, commission=0.0005, slippage_bps=1.0,
+                                 sizer_kwargs={}, strategy_params={}, strategy="ema_atr"), len(df))
+
+
+def _bench_metrics(raw, df, intraday):
+    from backtest.metrics import equity_to_metrics
+    close = df["close"].to_numpy()
+    first = df["symbol"].to_numpy() == df["symbol"].iloc[0]
+    equity = pd.Series(close[first] / close[first][0] * 100_000, index=df.index[first])
+    return lambda: equity_to_metrics(equity), len(equity)
+
+
+def _bench_ml_train(raw, df, intraday):
+    from ml.direction import train_direction_model
+    return lambda: train_direction_model(df), len(df)
+
+
+def _bench_ml_predict(raw, df, intraday):
+    from ml.direction import predict_direction, train_direction_model
+    model = train_direction_model(df)
+    return lambda: predict_direction(model, df), len(df)
+
+
+# name -> factory(raw UTC frame, post-processed frame, intraday) -> (callable, rows);
+# the session filter only applies to intraday bars, as in the UI
+BENCHMARKS: Dict[str, Callable[[pd.DataFrame, pd.DataFrame, bool], Tuple[Callable[[], Any], int]]] = {
+    "loader_postprocess": _bench_loader,
+    "backtest": _bench_backtest,
+    "metrics": _bench_metrics,
+    "ml_train": _bench_ml_train,
+    "ml_predict": _bench_ml_predict,
+}
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                             capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def _versions() -> Dict[str, str]:
+    versions = {"python": platform.python_version(), "numpy": np.__version__, "pandas": pd.__version__}
+    for name in ("sklearn", "backtrader"):
+        try:
+            versions[name] = __import__(name).__version__
+        except Exception:
+            pass
+    return versions
+
+
+def time_call(fn: Callable[[], Any], repeat: int) -> List[float]:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return times
+
+
+def run_suites(suites: Sequence[str] = DEFAULT_SUITES, only: Optional[Sequence[str]] = None,
+               repeat: int = 3, seed: int = 0, log: Callable[[str], None] = lambda s: None) -> Dict[str, Any]:
+    """Run the benchmarks of ``suites`` and return the JSON-ready report.
+
+    Results are keyed ``"<benchmark>/<symbols>x<timeframe>x<days>d"`` so the
+    same case can be matched across runs.
+    """
+    names = list(only or BENCHMARKS)
+    unknown = set(names) - set(BENCHMARKS)
+    if unknown:
+        raise ValueError(f"Unknown benchmarks: {sorted(unknown)} (available: {', '.join(BENCHMARKS)})")
+    results: Dict[str, Dict[str, Any]] = {}
+    for suite in suites:
+        for n_symbols, timeframe, days in SUITES[suite]:
+            case = f"{n_symbols}x{timeframe}x{days}d"
+            raw = synthetic_ohlcv(n_symbols, timeframe, days, seed=seed)
+            intraday = timeframe != "D"
+            df = _prepared(raw, intraday)
+            for name in names:
+                fn, rows = BENCHMARKS[name](raw, df, intraday)
+                times = time_call(fn, repeat)
+                med = float(np.median(times))
+                results[f"{name}/{case}"] = dict(
+                    benchmark=name, suite=suite, symbols=n_symbols, timeframe=timeframe, days=days,
+                    rows=int(rows), repeat=repeat, min=min(times), median=med,
+                    rows_per_s=rows / med if med > 0 else None,
+                )
+                log(f"{name:<20} {case:<16} {rows:>10} rows  {med * 1e3:10.1f} ms")
+    return dict(
+        commit=_git_commit(),
+        timestamp=datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        platform=platform.platform(),
+        versions=_versions(),
+        seed=seed,
+        results=results,
+    )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--suite", nargs="+", default=list(DEFAULT_SUITES), choices=list(SUITES))
+    ap.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="subset of benchmarks")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", type=Path, help="default .cache/benchmarks/<commit>.json")
+    args = ap.parse_args(argv)
+
+    report = run_suites(args.suite, args.only, args.repeat, args.seed, log=print)
+    out = args.out or ROOT / ".cache" / "benchmarks" / f"{report['commit'] or 'nogit'}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2))
+    print(f"written {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
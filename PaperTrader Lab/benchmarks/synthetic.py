@@ -0,0 +1,66 @@
+"""Seeded synthetic OHLCV frames shaped like the provider output.
+
+Frames have a UTC index (before ``_postprocess``), interleaved symbols sorted
+by time, the ``open/high/low/close/volume/symbol`` columns, and intraday bars
+covering the extended session 04:00-20:00 New York so that the session
+filter has something to cut.
+"""
+
+from __future__ import annotations
+
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+# bar length, and for intraday frames the UTC hours of the extended session (EST)
+TIMEFRAMES: Dict[str, str] = {"D": "1D", "1h": "1h", "15m": "15min", "5m": "5min", "1m": "1min"}
+_EXT_START, _EXT_END = 9, 25  # 04:00 and 20:00 New York (EST) in UTC hours
+
+
+def synthetic_index(timeframe: str, days: int, start: str = "2022-01-03") -> pd.DatetimeIndex:
+    """UTC timestamps of ``days`` business days of ``timeframe`` bars."""
+    sessions = pd.bdate_range(start, periods=days, tz="UTC")
+    if timeframe == "D":
+        return sessions + pd.Timedelta(hours=5)
+    step = pd.Timedelta(TIMEFRAMES[timeframe])
+    n = int(pd.Timedelta(hours=_EXT_END - _EXT_START) / step)
+    offsets = pd.to_timedelta(np.arange(n) * step + pd.Timedelta(hours=_EXT_START))
+    return pd.DatetimeIndex((sessions.values[:, None] + offsets.values[None, :]).ravel(), tz="UTC")
+
+
+def synthetic_ohlcv(n_symbols: int = 1, timeframe: str = "15m", days: int = 60, seed: int = 0) -> pd.DataFrame:
+    """Geometric random walks for ``n_symbols`` symbols with consistent OHLC.
+
+    Parameters
+    ----------
+    n_symbols : int
+        Symbols ``S000``, ``S001``... sharing the same timestamps.
+    timeframe : str
+        A key of :data:`TIMEFRAMES`.
+    days : int
+        Business days covered.
+    seed : int
+        Same seed, same frame.
+    """
+    rng = np.random.default_rng(seed)
+    idx = synthetic_index(timeframe, days)
+    n = len(idx)
+    bars_per_day = n / days
+    vol = rng.uniform(0.15, 0.6, n_symbols) / np.sqrt(252 * bars_per_day)
+    ret = rng.standard_normal((n, n_symbols)) * vol + rng.normal(0, vol / 20, n_symbols)
+    close = rng.uniform(20, 300, n_symbols) * np.exp(np.cumsum(ret, axis=0))
+    open_ = np.vstack([close[:1], close[:-1]]) * np.exp(rng.standard_normal((n, n_symbols)) * vol / 4)
+    wick = np.abs(rng.standard_normal((2, n, n_symbols))) * vol * close / 2
+    high = np.maximum(open_, close) + wick[0]
+    low = np.minimum(open_, close) - wick[1]
+    volume = np.round(rng.lognormal(10, 1, (n, n_symbols)))
+    symbols = np.array([f"S{i:03d}" for i in range(n_symbols)])
+    return pd.DataFrame(
+        {"open": open_.ravel(), "high": high.ravel(), "low": low.ravel(), "close": close.ravel(),
+         "volume": volume.ravel(), "symbol": np.tile(symbols, n)},
+        index=pd.DatetimeIndex(np.repeat(idx.values, n_symbols), tz="UTC", name="timestamp"),
+    )
+
+
+__all__ = ["TIMEFRAMES", "synthetic_index", "synthetic_ohlcv"]
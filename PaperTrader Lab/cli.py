@@ -0,0 +1,221 @@
+"""Headless batch entry point: data sync and backtest sweeps without the UI.
+
+Usage::
+
+    python cli.py sync --symbols AAPL MSFT --timeframe 15m --start 2024-01-01
+    python cli.py backtest nightly.toml --out results/nightly --workers 4
+
+A backtest spec (TOML, or YAML with PyYAML installed) looks like::
+
+    [data]                      # DataStore.read / load_ohlcv arguments
+    provider = "alpaca"
+    timeframe = "15m"
+    start = "2024-01-01"
+    session_filter = true
+    source = "store"            # or "provider" to fetch directly
+
+    [run]                       # run_backtest defaults for every job
+    strategy = "ema_atr"
+    cash = 100000
+    commission = 0.0005
+    risk_per_trade = 0.01
+
+    [[jobs]]
+    name = "tech"
+    symbols = ["AAPL", "MSFT"]
+    params = { ema_slow = 30 }  # strategy params
+    grid = { ema_fast = [8, 12, 16] }   # optional sweep
+
+Every job x grid point is one configuration, run across a process pool.
+``metrics.parquet`` (one row per configuration), ``equity.parquet`` and
+``ledger.parquet`` (long format, ``config`` column) are written to ``--out``.
+Streamlit and Plotly are never imported.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import pandas as pd
+
+from utils.logging_json import flush_logging, get_logger
+
+log = get_logger("cli")
+
+_SIZER_KEYS = ("risk_per_trade", "min_size")
+_RUN_KEYS = ("cash", "commission", "slippage_bps", "strategy", "weighting", "rebalance",
+             "lookback", "max_portfolio_risk", "leverage")
+_RUN_DEFAULTS = dict(cash=100_000, commission=0.0005, slippage_bps=0.0, strategy="ema_atr")
+
+
+def load_spec(path: os.PathLike) -> Dict[str, Any]:
+    path = Path(path)
+    if path.suffix in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError as e:
+            raise ImportError("YAML specs require `pip install pyyaml` (or use TOML)") from e
+        return yaml.safe_load(path.read_text()) or {}
+    import tomllib
+    with open(path, "rb") as fh:
+        return tomllib.load(fh)
+
+
+def expand_configs(spec: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """One dict per job x grid point: ``config``, ``job``, ``symbols``, ``data``, ``run``, ``params``."""
+    from strategies import get_strategy
+
+    data = dict(spec.get("data") or {})
+    base_run = {**_RUN_DEFAULTS, **(spec.get("run") or {})}
+    configs = []
+    for j, job in enumerate(spec.get("jobs") or []):
+        if not job.get("symbols"):
+            raise ValueError(f"job {j}: 'symbols' is required")
+        run = {**base_run, **{k: v for k, v in job.items() if k in _RUN_KEYS + _SIZER_KEYS}}
+        strategy = get_strategy(run["strategy"])
+        params = dict(job.get("params") or {})
+        grid = job.get("grid") or {}
+        points = strategy.grid(params, **grid) if grid else [strategy.validate(params)]
+        name = job.get("name") or f"job{j}"
+        for i, p in enumerate(points):
+            configs.append(dict(config=f"{name}-{i}" if grid else name, job=name,
+                                symbols=list(job["symbols"]), data={**data, **(job.get("data") or {})},
+                                run=run, params=p))
+    if not configs:
+        raise ValueError("spec has no [[jobs]]")
+    return configs
+
+
+def _load(data: Dict[str, Any], symbols: Sequence[str], store_root: Optional[str]) -> pd.DataFrame:
+    kw = dict(timeframe=data.get("timeframe", "15m"), tz=data.get("tz", "America/New_York"),
+              session_filter_on=data.get("session_filter", False),
+              session_start=data.get("session_start", "09:30"), session_end=data.get("session_end", "16:00"))
+    provider = data.get("provider", "alpaca")
+    if data.get("source", "store") == "store":
+        from data.store import DataStore
+        return DataStore(store_root).read(symbols, provider, start=data.get("start"), end=data.get("end"), **kw)
+    from data.loader import load_ohlcv
+    return load_ohlcv(list(symbols), provider=provider, start_date=data.get("start", "2024-01-01"),
+                      end_date=data.get("end"), adjusted=data.get("adjusted", True), **kw)
+
+
+def run_config(cfg: Dict[str, Any], store_root: Optional[str] = None) -> Dict[str, Any]:
+    """Load the data of one configuration and backtest it (runs in a worker process)."""
+    from backtest.engine import run_backtest
+
+    t0 = time.perf_counter()
+    run = cfg["run"]
+    df = _load(cfg["data"], cfg["symbols"], store_root)
+    res = run_backtest(
+        df,
+        sizer_kwargs={k: run[k] for k in _SIZER_KEYS if k in run},
+        strategy_params=cfg["params"],
+        **{k: run[k] for k in _RUN_KEYS if k in run},
+    )
+    return dict(config=cfg["config"], metrics=res["metrics"], equity=res["equity"],
+                trades=res["trades"], bars=len(df), seconds=time.perf_counter() - t0)
+
+
+def _write(out: Path, configs: List[Dict[str, Any]], results: Dict[str, Dict[str, Any]],
+           errors: Dict[str, str]) -> None:
+    out.mkdir(parents=True, exist_ok=True)
+    rows, equity, ledger = [], [], []
+    for cfg in configs:
+        name = cfg["config"]
+        res = results.get(name, {})
+        rows.append(dict(config=name, job=cfg["job"], symbols=",".join(cfg["symbols"]),
+                         strategy=cfg["run"]["strategy"], params=json.dumps(cfg["params"], sort_keys=True),
+                         bars=res.get("bars"), seconds=res.get("seconds"), error=errors.get(name),
+                         **{f"param_{k}": v for k, v in cfg["params"].items()},
+                         **(res.get("metrics") or {})))
+        if name in results:
+            eq = res["equity"]
+            equity.append(pd.DataFrame({"config": name, "datetime": eq.index, "equity": eq.to_numpy()}))
+            ledger.append(res["trades"].assign(config=name))
+    pd.DataFrame(rows).to_parquet(out / "metrics.parquet", index=False)
+    if equity:
+        pd.concat(equity, ignore_index=True).to_parquet(out / "equity.parquet", index=False)
+    if ledger:
+        pd.concat(ledger, ignore_index=True).to_parquet(out / "ledger.parquet", index=False)
+
+
+def cmd_backtest(args) -> int:
+    spec = load_spec(args.spec)
+    configs = expand_configs(spec)
+    store_root = args.store or (spec.get("data") or {}).get("store")
+    results: Dict[str, Dict[str, Any]] = {}
+    errors: Dict[str, str] = {}
+
+    def done(name, res=None, exc=None):
+        if exc is not None:
+            errors[name] = f"{type(exc).__name__}: {exc}"
+            log.error("config_failed", extra={"config": name, "error": errors[name]})
+        else:
+            results[name] = res
+            log.info("config_done", extra={"config": name, "seconds": round(res["seconds"], 3),
+                                           "sharpe": res["metrics"].get("Sharpe")})
+
+    if args.workers == 1:
+        for cfg in configs:
+            try:
+                done(cfg["config"], run_config(cfg, store_root))
+            except Exception as e:
+                done(cfg["config"], exc=e)
+    else:
+        with ProcessPoolExecutor(args.workers) as pool:
+            futures = {pool.submit(run_config, cfg, store_root): cfg["config"] for cfg in configs}
+            for f in as_completed(futures):
+                exc = f.exception()
+                done(futures[f], None if exc else f.result(), exc)
+
+    _write(Path(args.out), configs, results, errors)
+    print(f"{len(results)}/{len(configs)} configurations -> {args.out}")
+    return 1 if errors else 0
+
+
+def cmd_sync(args) -> int:
+    from data.store import DataStore
+    added = DataStore(args.store).sync(args.symbols, args.provider, args.timeframe, args.start,
+                                       args.end, adjusted=not args.raw)
+    for sym, n in added.items():
+        print(f"{sym}: +{n} bars")
+    return 0
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="cli.py", description="PaperTrader Lab headless batch runner")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    s = sub.add_parser("sync", help="fetch bars into the local Parquet store")
+    s.add_argument("--symbols", nargs="+", required=True)
+    s.add_argument("--provider", default="alpaca", choices=["alpaca", "alphavantage"])
+    s.add_argument("--timeframe", default="15m", choices=["1m", "5m", "15m", "1h", "D"])
+    s.add_argument("--start", default="2024-01-01")
+    s.add_argument("--end")
+    s.add_argument("--raw", action="store_true", help="unadjusted prices")
+    s.add_argument("--store", help="store root (default $DATA_STORE_DIR or .cache/store)")
+    s.set_defaults(func=cmd_sync)
+
+    b = sub.add_parser("backtest", help="run the configurations of a TOML/YAML spec")
+    b.add_argument("spec")
+    b.add_argument("--out", default="results")
+    b.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    b.add_argument("--store", help="store root (default: spec [data].store, $DATA_STORE_DIR or .cache/store)")
+    b.set_defaults(func=cmd_backtest)
+
+    args = ap.parse_args(argv)
+    try:
+        return args.func(args)
+    finally:
+        flush_logging()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,479 @@
+"""Live bar ingestion: streaming trades/bars into per-symbol ring buffers.
+
+``LiveIngestor`` consumes a message source, aggregates trades (and
+provider bars) into bars of ``timeframe`` and appends every completed bar to
+the symbol's ``RingBuffer``. Sources are async iterables yielding batches of
+Alpaca-format messages::
+
+    {"T": "t", "S": "AAPL", "p": 189.2, "s": 100, "t": "2024-01-02T14:30:00.123Z"}
+    {"T": "b", "S": "AAPL", "o": ..., "h": ..., "l": ..., "c": ..., "v": ..., "t": ...}
+
+``AlpacaStream`` reads the Alpaca market data websocket (needs
+``websockets``); ``LineStream`` reads newline-delimited JSON batches over TCP,
+as written by ``replay_server`` (a local stand-in for tests and demos).
+
+A ``RingBuffer`` is one preallocated structured array (``time`` in UTC
+nanoseconds, ``open`` .. ``volume``) of twice the capacity: each bar is
+written at ``k`` and ``k + capacity``, so the last ``n`` bars are always a
+contiguous slice and ``last(n)`` returns a view, never a copy. A view stays
+valid until ``capacity`` more bars have been appended; copy it (or use
+``frame``) to keep it longer. The ingestor writes from its own thread; bars
+are complete before the count that exposes them is bumped.
+
+The bar in progress is not in the buffer (see ``LiveIngestor.current``). It
+is closed by the first message of a later bucket or, for quiet symbols, by
+the periodic ``flush`` once the bucket has ended plus ``grace`` seconds.
+That time is the stream's own (latest event time, advanced by the wall time
+since it arrived), so replays of historical data and sources whose clock
+drifts close bars like a live feed would. Trades for an already closed
+bucket are dropped and counted as late.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from utils.logging_json import get_logger
+from utils.telemetry import METRICS
+
+try:  # optional fast JSON parser
+    import orjson
+
+    _loads = orjson.loads
+except ImportError:  # pragma: no cover - exercised only without orjson
+    _loads = json.loads
+
+log = get_logger("live")
+
+_MESSAGES = METRICS.counter("live_messages_total", "Streaming messages by type", ("kind",))
+_BARS = METRICS.counter("live_bars_total", "Bars completed by the live ingestor")
+_BATCH_SECONDS = METRICS.histogram("live_batch_seconds", "Time to ingest one message batch",
+                                   buckets=(1e-5, 5e-5, 1e-4, 5e-4, 0.001, 0.005, 0.01, 0.05, 0.1))
+_ERRORS = METRICS.counter("errors_total", "Exceptions by component", ("component",))
+
+BAR_DTYPE = np.dtype([("time", "i8"), ("open", "f8"), ("high", "f8"), ("low", "f8"),
+                      ("close", "f8"), ("volume", "f8")])
+
+TIMEFRAMES = {"1m": 60, "5m": 300, "15m": 900, "1h": 3600}
+
+
+def _step_ns(timeframe: str) -> int:
+    if timeframe not in TIMEFRAMES:
+        raise ValueError(f"Unsupported live timeframe: {timeframe} (use one of {list(TIMEFRAMES)})")
+    return TIMEFRAMES[timeframe] * 1_000_000_000
+
+
+class RingBuffer:
+    """Last ``capacity`` bars of one symbol in a preallocated array.
+
+    Parameters
+    ----------
+    capacity : int
+        Bars kept; older ones are overwritten.
+    """
+
+    def __init__(self, capacity: int = 1000):
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        self.capacity = capacity
+        self._data = np.zeros(2 * capacity, dtype=BAR_DTYPE)
+        self._count = 0
+
+    def __len__(self) -> int:
+        return min(self._count, self.capacity)
+
+    @property
+    def count(self) -> int:
+        """Bars appended since creation (including overwritten ones)."""
+        return self._count
+
+    def append(self, t: int, o: float, h: float, l: float, c: float, v: float) -> None:
+        i = self._count % self.capacity
+        row = (t, o, h, l, c, v)
+        self._data[i] = row
+        self._data[i + self.capacity] = row
+        self._count += 1
+
+    def last(self, n: Optional[int] = None) -> np.ndarray:
+        """View of the last ``n`` bars (all kept bars by default), oldest first."""
+        count = self._count
+        m = min(count, self.capacity) if n is None else max(0, min(n, count, self.capacity))
+        start = (count - m) % self.capacity
+        return self._data[start:start + m]
+
+    @property
+    def latest(self) -> Optional[np.void]:
+        if not self._count:
+            return None
+        return self._data[(self._count - 1) % self.capacity]
+
+    def frame(self, n: Optional[int] = None, symbol: Optional[str] = None,
+              tz: str = "America/New_York") -> pd.DataFrame:
+        """Copy of the last ``n`` bars shaped like ``load_ohlcv`` output."""
+        bars = self.last(n)
+        index = pd.DatetimeIndex(bars["time"].astype("datetime64[ns]"), tz="UTC", name="datetime").tz_convert(tz)
+        df = pd.DataFrame({k: bars[k] for k in ("open", "high", "low", "close", "volume")}, index=index)
+        if symbol is not None:
+            df["symbol"] = symbol
+        return df
+
+
+_MINUTE_NS: Dict[str, int] = {}
+
+
+def parse_time(t: Any) -> int:
+    """UTC nanoseconds of an RFC 3339 timestamp (or an int already in ns).
+
+    ``...Z`` strings take a fast path: the minute prefix is cached and only the
+    seconds are parsed per message.
+    """
+    if isinstance(t, int):
+        return t
+    if t.endswith("Z") and len(t) > 17 and t[16] == ":":
+        head = t[:16]
+        base = _MINUTE_NS.get(head)
+        if base is None:
+            if len(_MINUTE_NS) > 10_000:
+                _MINUTE_NS.clear()
+            base = _MINUTE_NS[head] = int(np.datetime64(head, "ns").view("i8"))
+        sec = t[17:-1]
+        whole, _, frac = sec.partition(".")
+        return base + int(whole) * 1_000_000_000 + (int(frac[:9].ljust(9, "0")) if frac else 0)
+    return pd.Timestamp(t).value  # UTC ns (naive times are taken as UTC)
+
+
+class LiveIngestor:
+    """Aggregate a stream of trades/bars into per-symbol ``RingBuffer`` s.
+
+    Parameters
+    ----------
+    source : async iterable, optional
+        Yields lists of message dicts (``AlpacaStream``, ``LineStream``);
+        only needed by ``run``/``start``; ``handle`` can be fed directly.
+    timeframe : str
+        Bar size: ``1m``, ``5m``, ``15m`` or ``1h``. Provider bars of a
+        smaller size are merged into it.
+    capacity : int
+        Bars kept per symbol.
+    symbols : sequence of str
+        Buffers preallocated up front; other symbols get one on first message.
+    grace : float
+        Seconds after the end of a bucket before ``flush`` closes it.
+    flush_interval : float
+        Seconds between periodic flushes in ``run``.
+    clock : callable, optional
+        Current time in UTC nanoseconds for ``flush`` (e.g. ``time.time_ns``
+        to follow the wall clock). By default the latest event time seen,
+        plus the wall time elapsed since it arrived.
+    """
+
+    def __init__(self, source: Optional[AsyncIterator[List[Dict[str, Any]]]] = None,
+                 timeframe: str = "1m", capacity: int = 1000, symbols: Sequence[str] = (),
+                 grace: float = 2.0, flush_interval: float = 1.0,
+                 clock: Optional[Callable[[], int]] = None):
+        self.source = source
+        self.timeframe = timeframe
+        self.step = _step_ns(timeframe)
+        self.capacity = capacity
+        self.grace_ns = int(grace * 1e9)
+        self.flush_interval = flush_interval
+        self.clock = clock
+        # latest event time and when it arrived (monotonic), for the default clock
+        self._event_ns = 0
+        self._event_at = 0
+        self.buffers: Dict[str, RingBuffer] = {s: RingBuffer(capacity) for s in symbols}
+        # symbol -> [bucket start, open, high, low, close, volume] of the bar in progress
+        self._open: Dict[str, list] = {}
+        self._callbacks: List[Callable[[str, RingBuffer], None]] = []
+        self.stats = dict(messages=0, trades=0, bars=0, late=0, errors=0)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop: Optional[asyncio.Event] = None
+        self._thread: Optional[threading.Thread] = None
+        self._running = threading.Event()
+
+    # -- reading -----------------------------------------------------------
+
+    def buffer(self, symbol: str) -> RingBuffer:
+        buf = self.buffers.get(symbol)
+        if buf is None:
+            buf = self.buffers[symbol] = RingBuffer(self.capacity)
+        return buf
+
+    def bars(self, symbol: str, n: Optional[int] = None) -> np.ndarray:
+        """View of the last ``n`` completed bars of ``symbol`` (see ``RingBuffer.last``)."""
+        buf = self.buffers.get(symbol)
+        return buf.last(n) if buf is not None else np.zeros(0, dtype=BAR_DTYPE)
+
+    def current(self, symbol: str) -> Optional[Dict[str, float]]:
+        """The bar in progress of ``symbol``, if any."""
+        st = self._open.get(symbol)
+        if st is None:
+            return None
+        return dict(zip(BAR_DTYPE.names, st))
+
+    def on_bar(self, callback: Callable[[str, RingBuffer], None]) -> None:
+        """Call ``callback(symbol, buffer)`` after every completed bar (in the ingest thread)."""
+        self._callbacks.append(callback)
+
+    # -- ingestion ---------------------------------------------------------
+
+    def _close(self, sym: str, st: list) -> None:
+        self.buffer(sym).append(*st)
+        self.stats["bars"] += 1
+        _BARS.inc()
+        if self._callbacks:
+            buf = self.buffers[sym]
+            for cb in self._callbacks:
+                try:
+                    cb(sym, buf)
+                except Exception:
+                    self.stats["errors"] += 1
+                    log.exception("live_callback_failed", extra={"symbol": sym})
+
+    def _update(self, sym: str, t: int, o: float, h: float, l: float, c: float, v: float) -> None:
+        if t > self._event_ns:
+            self._event_ns = t
+        bucket = t - t % self.step
+        st = self._open.get(sym)
+        if st is not None and bucket == st[0]:
+            if h > st[2]:
+                st[2] = h
+            if l < st[3]:
+                st[3] = l
+            st[4] = c
+            st[5] += v
+            return
+        if st is not None and bucket < st[0]:
+            self.stats["late"] += 1
+            return
+        buf = self.buffers.get(sym)
+        if st is None and buf is not None and buf.count and bucket <= buf.latest["time"]:
+            self.stats["late"] += 1
+            return
+        if st is not None:
+            self._close(sym, st)
+        self._open[sym] = [bucket, o, h, l, c, v]
+
+    def handle(self, messages: Iterable[Dict[str, Any]]) -> None:
+        """Ingest one batch of messages (trades ``t``, bars ``b``; others are ignored)."""
+        t0 = time.perf_counter()
+        latest = self._event_ns
+        n = trades = bars = 0
+        for m in messages:
+            n += 1
+            kind = m.get("T")
+            try:
+                if kind == "t":
+                    p = m["p"]
+                    self._update(m["S"], parse_time(m["t"]), p, p, p, p, m.get("s", 0))
+                    trades += 1
+                elif kind == "b":
+                    self._update(m["S"], parse_time(m["t"]), m["o"], m["h"], m["l"], m["c"], m.get("v", 0))
+                    bars += 1
+            except (KeyError, TypeError, ValueError):
+                self.stats["errors"] += 1
+                _ERRORS.inc(component="live")
+        if self._event_ns != latest:
+            self._event_at = time.monotonic_ns()
+        self.stats["messages"] += n
+        self.stats["trades"] += trades
+        if trades:
+            _MESSAGES.inc(trades, kind="trade")
+        if bars:
+            _MESSAGES.inc(bars, kind="bar")
+        if n - trades - bars:
+            _MESSAGES.inc(n - trades - bars, kind="other")
+        _BATCH_SECONDS.observe(time.perf_counter() - t0)
+
+    def now_ns(self) -> int:
+        """Stream time used by ``flush`` (see ``clock``); 0 before the first event."""
+        if self.clock is not None:
+            return self.clock()
+        if not self._event_ns:
+            return 0
+        return self._event_ns + time.monotonic_ns() - self._event_at
+
+    def flush(self, now_ns: Optional[int] = None) -> int:
+        """Close bars whose bucket ended more than ``grace`` before ``now_ns``
+        (default ``now_ns()``); returns how many."""
+        if now_ns is None:
+            now_ns = self.now_ns()
+        limit = now_ns - self.step - self.grace_ns
+        done = [sym for sym, st in self._open.items() if st[0] <= limit]
+        for sym in done:
+            self._close(sym, self._open.pop(sym))
+        return len(done)
+
+    # -- running -----------------------------------------------------------
+
+    async def _flusher(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            self.flush()
+
+    async def _consume(self) -> None:
+        async for batch in self.source:
+            self.handle(batch)
+
+    async def run(self) -> None:
+        """Consume ``source`` until it ends or ``stop`` is called."""
+        if self.source is None:
+            raise ValueError("LiveIngestor.run needs a source")
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        self._running.set()
+        tasks = [asyncio.create_task(self._consume()), asyncio.create_task(self._flusher()),
+                 asyncio.create_task(self._stop.wait())]
+        log.info("live_started", extra={"timeframe": self.timeframe, "symbols": len(self.buffers)})
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for t in done:
+                if not t.cancelled() and t.exception() is not None:
+                    _ERRORS.inc(component="live")
+                    raise t.exception()
+        finally:
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self._running.clear()
+            log.info("live_stopped", extra=dict(self.stats))
+
+    def start(self) -> threading.Thread:
+        """Run in a daemon thread with its own event loop (for sync callers like the UI)."""
+        self._thread = threading.Thread(target=asyncio.run, args=(self.run(),), name="live-ingest", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        if self._thread is not None:
+            self._running.wait(timeout)
+        if self._running.is_set():
+            self._loop.call_soon_threadsafe(self._stop.set)
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+# ---------------------------------------------------------------------------
+# Sources
+# ---------------------------------------------------------------------------
+
+
+class AlpacaStream:
+    """Alpaca market data websocket (``v2/<feed>``): authenticates, subscribes and yields message batches.
+
+    Reconnects with exponential backoff (up to ``max_backoff`` seconds) when
+    the connection drops, fails to open or is closed by the server, until
+    ``stop`` is called. Credentials default to ``load_credentials("alpaca")``.
+    """
+
+    def __init__(self, symbols: Sequence[str], trades: bool = True, bars: bool = False,
+                 feed: str = "iex", url: Optional[str] = None, key: Optional[str] = None,
+                 secret: Optional[str] = None, max_backoff: float = 30.0):
+        self.symbols = list(symbols)
+        self.trades = trades
+        self.bars = bars
+        self.url = url or f"wss://stream.data.alpaca.markets/v2/{feed}"
+        self.key = key
+        self.secret = secret
+        self.max_backoff = max_backoff
+        self._stopped = False
+
+    def stop(self) -> None:
+        """End the iteration after the current batch instead of reconnecting."""
+        self._stopped = True
+
+    async def _session(self, ws) -> AsyncIterator[List[Dict[str, Any]]]:
+        await ws.recv()  # [{"T": "success", "msg": "connected"}]
+        await ws.send(json.dumps({"action": "auth", "key": self.key, "secret": self.secret}))
+        reply = _loads(await ws.recv())
+        if not any(m.get("msg") == "authenticated" for m in reply):
+            raise PermissionError(f"Alpaca stream auth failed: {reply}")
+        sub = {"action": "subscribe"}
+        if self.trades:
+            sub["trades"] = self.symbols
+        if self.bars:
+            sub["bars"] = self.symbols
+        await ws.send(json.dumps(sub))
+        async for raw in ws:
+            yield _loads(raw)
+
+    async def __aiter__(self) -> AsyncIterator[List[Dict[str, Any]]]:
+        try:
+            import websockets
+        except ImportError as e:
+            raise ImportError("AlpacaStream requires `pip install websockets`") from e
+        if self.key is None or self.secret is None:
+            from utils.config import load_credentials
+            creds = load_credentials("alpaca")
+            self.key, self.secret = creds["key"], creds["secret"]
+        self._stopped = False
+        backoff = first = min(1.0, self.max_backoff)
+        while True:
+            try:
+                async with websockets.connect(self.url, max_size=None) as ws:
+                    log.info("live_connected", extra={"url": self.url, "symbols": len(self.symbols)})
+                    async for batch in self._session(ws):
+                        backoff = first
+                        yield batch
+                        if self._stopped:
+                            return
+                reason = "closed by server"
+            except PermissionError:
+                raise
+            except (OSError, websockets.ConnectionClosed, websockets.InvalidHandshake) as e:
+                _ERRORS.inc(component="live")
+                reason = str(e)
+            if self._stopped:
+                return
+            log.warning("live_reconnect", extra={"error": reason, "in_s": backoff})
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
+
+
+class LineStream:
+    """Newline-delimited JSON batches (one list of messages per line) read over TCP."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765):
+        self.host = host
+        self.port = port
+
+    async def __aiter__(self) -> AsyncIterator[List[Dict[str, Any]]]:
+        reader, writer = await asyncio.open_connection(self.host, self.port, limit=2**24)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    return
+                yield _loads(line)
+        finally:
+            writer.close()
+
+
+async def replay_server(batches: Iterable[List[Dict[str, Any]]], host: str = "127.0.0.1", port: int = 0,
+                        delay: float = 0.0) -> asyncio.AbstractServer:
+    """Serve ``batches`` to every ``LineStream`` that connects, then close the connection.
+
+    ``port=0`` picks a free port (``server.sockets[0].getsockname()[1]``).
+    """
+    lines = [json.dumps(b, separators=(",", ":")).encode() + b"\n" for b in batches]
+
+    async def handle(reader, writer):
+        for line in lines:
+            writer.write(line)
+            await writer.drain()
+            if delay:
+                await asyncio.sleep(delay)
+        writer.close()
+
+    return await asyncio.start_server(handle, host, port)
+
+
+__all__ = ["AlpacaStream", "BAR_DTYPE", "LineStream", "LiveIngestor", "RingBuffer", "TIMEFRAMES",
+           "parse_time", "replay_server"]
@@ -4,9 +4,16 @@ from tenacity import retry, wait_exponential, stop_after_attempt
 from utils.config import SETTINGS
 from utils.tz import ensure_tz_index, filter_session
 from utils.errors import ProviderError
+from utils.profiling import PROFILER
+from utils.telemetry import METRICS
 from typing import List, Literal, Optional
 import datetime as dt
 
+_REQUESTS = METRICS.counter("data_requests_total", "Historical data loads by provider", ("provider",))
+_REQUEST_SECONDS = METRICS.histogram("data_request_seconds", "Provider fetch latency", ("provider",))
+_ROWS = METRICS.counter("data_rows_total", "Bars returned by load_ohlcv", ("provider",))
+_ERRORS = METRICS.counter("errors_total", "Exceptions by component", ("component",))
+
 # -------- Alpaca ----------
 def _alpaca_timeframe(tf: str):
     from alpaca.data.timeframe import TimeFrame, TimeFrameUnit
@@ -91,6 +98,7 @@ def _fetch_alpha_vantage(symbols: List[str], tf: str, start: str, end: str, adju
         time.sleep(1)  # be nice to rate limit 25/day
     return pd.concat(frames).sort_index()
 
+@PROFILER.span("load_ohlcv")
 def load_ohlcv(
     symbols: List[str],
     provider: Literal["alpaca","alphavantage"]="alpaca",
@@ -105,14 +113,27 @@ def load_ohlcv(
 ) -> pd.DataFrame:
     """Return index tz-aware, columns: open,high,low,close,volume,symbol"""
     end_date = end_date or pd.Timestamp.utcnow().strftime("%Y-%m-%d")
-    if provider == "alpaca":
-        df = _fetch_alpaca(symbols, timeframe, start_date, end_date, adjusted=adjusted)
-    elif provider == "alphavantage":
-        df = _fetch_alpha_vantage(symbols, timeframe, start_date, end_date, adjusted=adjusted)
-    else:
-        raise ProviderError(f"Unknown provider: {provider}")
-    df = ensure_tz_index(df, tz)
+    _REQUESTS.inc(provider=provider)
+    with PROFILER.span("fetch", provider=provider), _ERRORS.count_exceptions(component="loader"), \
+            _REQUEST_SECONDS.time(provider=provider):
+        if provider == "alpaca":
+            df = _fetch_alpaca(symbols, timeframe, start_date, end_date, adjusted=adjusted)
+        elif provider == "alphavantage":
+            df = _fetch_alpha_vantage(symbols, timeframe, start_date, end_date, adjusted=adjusted)
+        else:
+            raise ProviderError(f"Unknown provider: {provider}")
+    df = _postprocess(df, tz, session_filter_on, session_start, session_end)
+    _ROWS.inc(len(df), provider=provider)
+    return df
+
+def _postprocess(df: pd.DataFrame, tz: str, session_filter_on: bool=False,
+                 session_start: str="09:30", session_end: str="16:00") -> pd.DataFrame:
+    """Provider-independent part of ``load_ohlcv``: tz conversion, session filter, column order."""
+    with PROFILER.span("tz_convert"):
+        df = ensure_tz_index(df, tz)
     if session_filter_on:
-        df = df.groupby("symbol", group_keys=False).apply(lambda d: filter_session(d, session_start, session_end))
+        # the mask only depends on the timestamp: no need to split by symbol
+        with PROFILER.span("session_filter"):
+            df = filter_session(df, session_start, session_end)
     # sort columns order
     return df[["open","high","low","close","volume","symbol"]]
@@ -0,0 +1,120 @@
+"""Local Parquet store of OHLCV bars for headless runs.
+
+Layout::
+
+    <root>/<provider>/<timeframe>/<symbol>.parquet   (``BTC/USD`` -> ``BTC%2FUSD``)
+
+Each file holds one symbol's UTC bars (``load_ohlcv`` columns). ``sync``
+fetches only what is missing after the last stored bar (re-reading the last
+day to pick up late corrections) and merges it; ``read`` returns the usual
+multi-symbol frame in the requested time zone, so backtests can run from the
+store without credentials or network.
+"""
+
+from __future__ import annotations
+
+import os
+from datetime import date, datetime
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+import pandas as pd
+
+from utils.paths import filename_symbol, symbol_filename
+from utils.tz import ensure_tz_index, filter_session
+
+_COLUMNS = ["open", "high", "low", "close", "volume", "symbol"]
+
+
+def _whole_day(value) -> bool:
+    """``"2024-03-31"`` or a ``date``: an end bound covering that entire day."""
+    if isinstance(value, str):
+        return len(value.strip()) <= 10
+    return isinstance(value, date) and not isinstance(value, datetime)
+
+
+class DataStore:
+    """Per-symbol Parquet files under ``root`` (default ``$DATA_STORE_DIR`` or ``<project>/.cache/store``)."""
+
+    def __init__(self, root: Optional[os.PathLike] = None):
+        if root is None:
+            root = os.getenv("DATA_STORE_DIR") or Path(__file__).resolve().parents[1] / ".cache" / "store"
+        self.root = Path(root)
+
+    def path(self, provider: str, timeframe: str, symbol: str) -> Path:
+        return self.root / provider / timeframe / f"{symbol_filename(symbol)}.parquet"
+
+    def symbols(self, provider: str, timeframe: str) -> List[str]:
+        return sorted(filename_symbol(p.stem) for p in (self.root / provider / timeframe).glob("*.parquet"))
+
+    def _read_one(self, provider: str, timeframe: str, symbol: str) -> Optional[pd.DataFrame]:
+        path = self.path(provider, timeframe, symbol)
+        if not path.exists():
+            return None
+        return pd.read_parquet(path)
+
+    def last_timestamp(self, provider: str, timeframe: str, symbol: str) -> Optional[pd.Timestamp]:
+        df = self._read_one(provider, timeframe, symbol)
+        return None if df is None or df.empty else df.index.max()
+
+    def write(self, df: pd.DataFrame, provider: str, timeframe: str) -> int:
+        """Merge ``df`` (any tz, ``symbol`` column) into the store; returns the number of new bars."""
+        df = ensure_tz_index(df[_COLUMNS], "UTC")
+        added = 0
+        for sym, sdf in df.groupby("symbol"):
+            old = self._read_one(provider, timeframe, sym)
+            n_old = 0 if old is None else len(old)
+            merged = sdf if old is None else pd.concat([old, sdf])
+            # newer rows win: corrections of already stored bars replace them
+            merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+            path = self.path(provider, timeframe, sym)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            merged.to_parquet(tmp)
+            os.replace(tmp, path)
+            added += len(merged) - n_old
+        return added
+
+    def read(self, symbols: Sequence[str], provider: str, timeframe: str,
+             start: Optional[str] = None, end: Optional[str] = None, tz: str = "America/New_York",
+             session_filter_on: bool = False, session_start: str = "09:30",
+             session_end: str = "16:00") -> pd.DataFrame:
+        """Stored bars of ``symbols`` shaped like ``load_ohlcv`` output.
+
+        ``start`` and ``end`` are inclusive; a date-only ``end`` includes that
+        whole (UTC) day.
+        """
+        lo = pd.Timestamp(start, tz="UTC") if start else None
+        hi = pd.Timestamp(end, tz="UTC") if end else None
+        whole_day = hi is not None and _whole_day(end)
+        frames = []
+        for sym in symbols:
+            df = self._read_one(provider, timeframe, sym)
+            if df is None:
+                raise FileNotFoundError(f"{sym}: not in store ({self.path(provider, timeframe, sym)})")
+            df = df.loc[lo:]
+            if whole_day:
+                df = df[df.index < hi.normalize() + pd.Timedelta(days=1)]
+            elif hi is not None:
+                df = df.loc[:hi]
+            frames.append(df)
+        df = ensure_tz_index(pd.concat(frames).sort_index(kind="stable"), tz)
+        if session_filter_on:
+            df = filter_session(df, session_start, session_end)
+        return df[_COLUMNS]
+
+    def sync(self, symbols: Sequence[str], provider: str, timeframe: str, start: str,
+             end: Optional[str] = None, adjusted: bool = True) -> dict:
+        """Fetch bars after the last stored one (from ``start`` for new symbols); returns new bars per symbol."""
+        from data.loader import load_ohlcv
+        added = {}
+        for sym in symbols:
+            last = self.last_timestamp(provider, timeframe, sym)
+            since = start if last is None else max(pd.Timestamp(start, tz="UTC"), last - pd.Timedelta(days=1)).strftime("%Y-%m-%d")
+            df = load_ohlcv([sym], provider=provider, timeframe=timeframe, start_date=since,
+                            end_date=end, tz="UTC", adjusted=adjusted)
+            added[sym] = self.write(df, provider, timeframe)
+        return added
+
+
+__all__ = ["DataStore"]
@@ -1,5 +1,25 @@
 """Machine learning utilities for PaperTrader Lab."""
 
-from .direction import train_direction_model, predict_direction
+from .direction import train_direction_model, predict_direction, evaluate_direction_model
+from .labeling import triple_barrier_labels, meta_labels
+from .cv import PurgedKFold, CombinatorialPurgedKFold, cross_validate_parallel
+from .features import FeatureStore, compute_features
+from .online import OnlineDirectionModel, train_online_direction_model
+from .registry import ModelRegistry, build_metadata
 
-__all__ = ["train_direction_model", "predict_direction"]
+__all__ = [
+    "train_direction_model",
+    "predict_direction",
+    "evaluate_direction_model",
+    "triple_barrier_labels",
+    "meta_labels",
+    "PurgedKFold",
+    "CombinatorialPurgedKFold",
+    "cross_validate_parallel",
+    "FeatureStore",
+    "compute_features",
+    "OnlineDirectionModel",
+    "train_online_direction_model",
+    "ModelRegistry",
+    "build_metadata",
+]
@@ -0,0 +1,287 @@
+"""Leakage-free cross-validation: Purged K-Fold and CPCV (AFML ch. 7 and 12).
+
+Both splitters follow the scikit-learn ``split``/``get_n_splits`` protocol and
+precompute their train/test index arrays once, from the event start times
+(index of ``t1``) and label end times (values of ``t1``). Training samples
+whose label horizon overlaps a test block are purged, and an embargo of
+``embargo_pct * n_samples`` bars after each test block is dropped as well.
+
+``cross_validate_parallel`` fits the folds on a process pool. The feature
+matrix is written once to a memory-mapped file that every worker maps
+read-only, so only index arrays travel to the workers.
+"""
+
+from __future__ import annotations
+
+import os
+from abc import ABC, abstractmethod
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.metrics import accuracy_score
+
+
+def _as_ns(values) -> np.ndarray:
+    return pd.DatetimeIndex(values).as_unit("ns").asi8
+
+
+class _PurgedSplitter(ABC):
+    """Shared purging/embargo logic over contiguous position blocks."""
+
+    def __init__(self, n_blocks: int, t1: Optional[pd.Series], embargo_pct: float):
+        if n_blocks < 2:
+            raise ValueError("at least 2 blocks are required")
+        self.n_blocks = n_blocks
+        self.t1 = t1
+        self.embargo_pct = embargo_pct
+        self._splits: Optional[List[Tuple[np.ndarray, np.ndarray]]] = None
+        self._n: Optional[int] = None
+        if t1 is not None:
+            self._prepare(len(t1))
+
+    def _prepare(self, n: int) -> None:
+        if self.t1 is not None:
+            t0 = _as_ns(self.t1.index)
+            t1 = _as_ns(self.t1.values)
+            if np.any(np.diff(t0) < 0):
+                raise ValueError("t1 must be sorted by event start time")
+        else:
+            t0 = t1 = np.arange(n, dtype=np.int64)
+        bounds = np.linspace(0, n, self.n_blocks + 1).astype(int)
+        self._blocks = list(zip(bounds[:-1], bounds[1:]))
+        self._t0, self._t1 = t0, t1
+        self._embargo = int(np.ceil(n * self.embargo_pct))
+        self._n = n
+        self._splits = [
+            (self._train_indices(test), np.concatenate([np.arange(*self._blocks[g]) for g in test]))
+            for test in self._test_groups()
+        ]
+
+    @abstractmethod
+    def _test_groups(self) -> List[Tuple[int, ...]]:
+        """Block indices forming the test set of each split."""
+
+    def _train_indices(self, test_groups: Sequence[int]) -> np.ndarray:
+        t0, t1 = self._t0, self._t1
+        keep = np.ones(len(t0), dtype=bool)
+        for g in test_groups:
+            a, b = self._blocks[g]
+            keep[a:b] = False
+            # purge: training labels overlapping [start of test, end of last test label]
+            keep &= ~((t0 <= t1[a:b].max()) & (t1 >= t0[a]))
+            keep[b:b + self._embargo] = False
+        return np.flatnonzero(keep)
+
+    def get_n_splits(self, X=None, y=None, groups=None) -> int:
+        return len(self._test_groups())
+
+    def split(self, X, y=None, groups=None) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        n = len(X)
+        if self._n != n:
+            if self.t1 is not None:
+                raise ValueError(f"X has {n} rows but t1 has {self._n}")
+            self._prepare(n)
+        yield from self._splits
+
+
+class PurgedKFold(_PurgedSplitter):
+    """K-Fold over contiguous time blocks with purging and embargo.
+
+    Parameters
+    ----------
+    n_splits : int
+        Number of folds.
+    t1 : pandas.Series, optional
+        Label end time per sample, indexed by sample start time and aligned
+        row by row with ``X`` (e.g. the ``t1`` column of
+        ``ml.labeling.triple_barrier_labels``). Without it each label is
+        assumed to end on its own bar.
+    embargo_pct : float
+        Fraction of samples dropped after each test block.
+    """
+
+    def __init__(self, n_splits: int = 5, t1: Optional[pd.Series] = None, embargo_pct: float = 0.0):
+        self.n_splits = n_splits
+        super().__init__(n_splits, t1, embargo_pct)
+
+    def _test_groups(self):
+        return [(g,) for g in range(self.n_splits)]
+
+
+class CombinatorialPurgedKFold(_PurgedSplitter):
+    """Combinatorial Purged CV: every choice of ``n_test_groups`` out of ``n_groups``.
+
+    Yields ``C(n_groups, n_test_groups)`` splits whose out-of-sample
+    predictions can be stitched into ``C(n_groups - 1, n_test_groups - 1)``
+    complete backtest paths with :meth:`backtest_paths`.
+    """
+
+    def __init__(self, n_groups: int = 6, n_test_groups: int = 2,
+                 t1: Optional[pd.Series] = None, embargo_pct: float = 0.0):
+        if not 0 < n_test_groups < n_groups:
+            raise ValueError("n_test_groups must be in [1, n_groups)")
+        self.n_groups = n_groups
+        self.n_test_groups = n_test_groups
+        self._combos = list(combinations(range(n_groups), n_test_groups))
+        super().__init__(n_groups, t1, embargo_pct)
+
+    def _test_groups(self):
+        return self._combos
+
+    @property
+    def n_paths(self) -> int:
+        return len(self._combos) * self.n_test_groups // self.n_groups
+
+    def path_assignment(self) -> np.ndarray:
+        """``(n_groups, n_paths)`` array: split feeding each group of each path."""
+        out = np.empty((self.n_groups, self.n_paths), dtype=int)
+        for g in range(self.n_groups):
+            out[g] = [i for i, c in enumerate(self._combos) if g in c]
+        return out
+
+    def backtest_paths(self, predictions: Sequence[np.ndarray]) -> np.ndarray:
+        """Stitch per-split test predictions into ``(n_samples, n_paths)`` paths.
+
+        ``predictions[i]`` must be aligned with the test indices of split ``i``.
+        """
+        if self._splits is None:
+            raise ValueError("call split() first or pass t1")
+        paths = np.full((self._n, self.n_paths), np.nan)
+        for g, splits in enumerate(self.path_assignment()):
+            a, b = self._blocks[g]
+            for p, i in enumerate(splits):
+                test = self._splits[i][1]
+                sel = (test >= a) & (test < b)
+                paths[test[sel], p] = np.asarray(predictions[i], dtype=float)[sel]
+        return paths
+
+
+def purged_train_test_split(
+    df: pd.DataFrame,
+    test_size: float = 0.3,
+    horizon: int = 1,
+    embargo_pct: float = 0.0,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Chronological train/test split with a purge gap before the test period.
+
+    The last ``horizon`` bars before the test start are dropped from the
+    training set (their labels would be resolved inside the test period),
+    plus ``embargo_pct`` of the bars as an extra safety gap. Multi-symbol
+    frames are cut on the union of timestamps, so all symbols share the same
+    boundary.
+    """
+    if not 0 < test_size < 1:
+        raise ValueError("test_size must be in (0, 1)")
+    times = df.index.unique().sort_values()
+    cut = int(len(times) * (1 - test_size))
+    gap = horizon + int(np.ceil(len(times) * embargo_pct))
+    train_end = times[max(cut - gap, 0)]
+    return df[df.index < train_end], df[df.index >= times[cut]]
+
+
+# ---------------------------------------------------------------------------
+# Parallel fold fitting
+# ---------------------------------------------------------------------------
+
+_WORKER: Dict[str, object] = {}
+
+
+def _init_worker(x_path, x_shape, x_dtype, y, estimator, scoring) -> None:
+    _WORKER["X"] = np.memmap(x_path, mode="r", dtype=x_dtype, shape=x_shape)
+    _WORKER["y"] = y
+    _WORKER["estimator"] = estimator
+    _WORKER["scoring"] = scoring
+
+
+def _fit_fold(fold: int, train: np.ndarray, test: np.ndarray):
+    X, y = _WORKER["X"], _WORKER["y"]
+    model = clone(_WORKER["estimator"])
+    model.fit(X[train], y[train])
+    pred = model.predict(X[test])
+    return fold, pred, _WORKER["scoring"](y[test], pred)
+
+
+def cross_validate_parallel(
+    estimator,
+    X,
+    y,
+    cv,
+    n_jobs: Optional[int] = None,
+    scoring: Callable = accuracy_score,
+) -> Dict[str, object]:
+    """Fit ``estimator`` on every split of ``cv`` across a process pool.
+
+    Parameters
+    ----------
+    estimator : sklearn estimator
+        Cloned for every fold.
+    X, y : array-like
+        Features and target, aligned row by row.
+    cv : splitter
+        Any scikit-learn compatible splitter, typically :class:`PurgedKFold`
+        or :class:`CombinatorialPurgedKFold`.
+    n_jobs : int, optional
+        Worker processes (default ``os.cpu_count()``). ``1`` runs in-process.
+    scoring : callable
+        ``scoring(y_true, y_pred)`` evaluated on every test split.
+
+    Returns
+    -------
+    dict
+        ``scores`` (per split), ``splits`` (train/test index arrays),
+        ``predictions`` (per split, aligned with the test indices) and, for
+        CPCV, ``paths`` (``n_samples x n_paths``) and ``path_scores``.
+    """
+    X = np.ascontiguousarray(X, dtype=float)
+    y = np.asarray(y)
+    splits = list(cv.split(X, y))
+    n_jobs = n_jobs or os.cpu_count() or 1
+    results: List[Tuple[int, np.ndarray, float]] = []
+
+    if n_jobs == 1 or len(splits) == 1:
+        for i, (train, test) in enumerate(splits):
+            model = clone(estimator).fit(X[train], y[train])
+            pred = model.predict(X[test])
+            results.append((i, pred, scoring(y[test], pred)))
+    else:
+        tmpdir = tempfile.mkdtemp(prefix="ptl_cv_")
+        try:
+            x_path = os.path.join(tmpdir, "X.dat")
+            mm = np.memmap(x_path, mode="w+", dtype=X.dtype, shape=X.shape)
+            mm[:] = X
+            mm.flush()
+            del mm
+            with ProcessPoolExecutor(
+                max_workers=min(n_jobs, len(splits)),
+                initializer=_init_worker,
+                initargs=(x_path, X.shape, X.dtype, y, estimator, scoring),
+            ) as pool:
+                futures = [pool.submit(_fit_fold, i, tr, te) for i, (tr, te) in enumerate(splits)]
+                results = [f.result() for f in futures]
+        finally:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+
+    results.sort(key=lambda r: r[0])
+    out: Dict[str, object] = dict(
+        scores=np.array([r[2] for r in results]),
+        splits=splits,
+        predictions=[r[1] for r in results],
+    )
+    if isinstance(cv, CombinatorialPurgedKFold):
+        paths = cv.backtest_paths(out["predictions"])
+        path_scores = []
+        for p in range(paths.shape[1]):
+            ok = ~np.isnan(paths[:, p])
+            path_scores.append(scoring(y[ok], paths[ok, p].astype(y.dtype)))
+        out["paths"] = paths
+        out["path_scores"] = np.array(path_scores)
+    return out
+
+
+__all__ = ["PurgedKFold", "CombinatorialPurgedKFold", "cross_validate_parallel", "purged_train_test_split"]
@@ -1,3 +1,6 @@
+from typing import Any, Dict, Optional
+
+import numpy as np
 import pandas as pd
 from sklearn.linear_model import LogisticRegression
 from sklearn.preprocessing import StandardScaler
@@ -17,13 +20,26 @@ def _build_features(df: pd.DataFrame) -> pd.DataFrame:
     pandas.DataFrame
         DataFrame of engineered features with NaN rows dropped.
     """
+    return _feature_frame(df).dropna()
+
+
+def _feature_frame(df: pd.DataFrame, feature_store=None) -> pd.DataFrame:
+    """Features aligned row by row with ``df`` (NaN during warm-up).
+
+    Basic returns are computed per symbol when ``df`` has a ``symbol``
+    column; with a ``feature_store`` the cached richer set is used.
+    """
+    if feature_store is not None:
+        return feature_store.get(df)
+    close = df["close"]
+    g = close.groupby(df["symbol"].to_numpy()) if "symbol" in df.columns else close
     feats = pd.DataFrame(index=df.index)
-    feats["return_1"] = df["close"].pct_change()
-    feats["return_5"] = df["close"].pct_change(5)
-    return feats.dropna()
+    feats["return_1"] = g.pct_change()
+    feats["return_5"] = g.pct_change(5)
+    return feats
 
 
-def train_direction_model(df: pd.DataFrame) -> Pipeline:
+def train_direction_model(df: pd.DataFrame, feature_store=None) -> Pipeline:
     """Train a simple logistic regression to predict price direction.
 
     The model predicts whether the next ``close`` price will be higher than
@@ -33,25 +49,92 @@ def train_direction_model(df: pd.DataFrame) -> Pipeline:
     ----------
     df : pandas.DataFrame
         Price data with a ``close`` column.
+    feature_store : ml.features.FeatureStore, optional
+        Use the cached multi-symbol feature set instead of the basic
+        ``return_1``/``return_5`` features. ``df`` may then hold several
+        symbols (``symbol`` column).
 
     Returns
     -------
     sklearn.pipeline.Pipeline
         Trained scikit-learn pipeline with scaling and logistic regression.
     """
-    X = _build_features(df)
-    # Target: 1 if next close is higher, else 0
-    y = (df["close"].shift(-1) > df["close"]).astype(int).loc[X.index]
-    model = Pipeline([
+    X, y, _ = _build_dataset(df, feature_store)
+    model = _make_pipeline()
+    model.fit(X, y)
+    return model
+
+
+def _make_pipeline() -> Pipeline:
+    return Pipeline([
         ("scaler", StandardScaler()),
         ("lr", LogisticRegression(solver="liblinear")),
     ])
-    model.fit(X, y)
-    return model
 
 
-def predict_direction(model: Pipeline, df: pd.DataFrame) -> pd.Series:
+def _build_dataset(df: pd.DataFrame, feature_store=None):
+    """Features, next-bar direction target and label end times.
+
+    The target is 1 if the next close of the same symbol is higher. Each
+    label ends on the next bar of its symbol (the last one on itself).
+    """
+    keys = df["symbol"].to_numpy() if "symbol" in df.columns else None
+    feats = _feature_frame(df, feature_store)
+    mask = feats.notna().all(axis=1).to_numpy()
+    X = feats[mask]
+    close = df["close"]
+    nxt = close.shift(-1) if keys is None else close.groupby(keys).shift(-1)
+    y = (nxt > close).astype(int)[mask]
+    ts = df.index.to_series()
+    end = ts.shift(-1) if keys is None else ts.groupby(keys).shift(-1)
+    t1 = pd.Series(end.fillna(ts).to_numpy(), index=df.index)[mask]
+    return X, y, t1
+
+
+def evaluate_direction_model(
+    df: pd.DataFrame,
+    n_splits: int = 5,
+    embargo_pct: float = 0.01,
+    cv=None,
+    n_jobs: Optional[int] = None,
+    feature_store=None,
+) -> Dict[str, Any]:
+    """Cross-validate the direction pipeline without look-ahead leakage.
+
+    Each label spans from its bar to the next one, so training bars adjacent
+    to a test block are purged and an embargo follows every test block.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Price data with a ``close`` column.
+    n_splits : int
+        Folds of the default :class:`ml.cv.PurgedKFold`.
+    embargo_pct : float
+        Fraction of bars embargoed after each test block.
+    cv : splitter, optional
+        Overrides the default splitter, e.g. ``ml.cv.CombinatorialPurgedKFold``.
+    n_jobs : int, optional
+        Worker processes for the fold fits.
+    feature_store : ml.features.FeatureStore, optional
+        See :func:`train_direction_model`.
+
+    Returns
+    -------
+    dict
+        Output of :func:`ml.cv.cross_validate_parallel`.
+    """
+    from .cv import PurgedKFold, cross_validate_parallel
+
+    X, y, t1 = _build_dataset(df, feature_store)
+    if cv is None:
+        cv = PurgedKFold(n_splits=n_splits, t1=t1, embargo_pct=embargo_pct)
+    return cross_validate_parallel(_make_pipeline(), X, y, cv, n_jobs=n_jobs)
+
+
+def predict_direction(model: Pipeline, df: pd.DataFrame, feature_store=None) -> pd.Series:
     """Predict upward (1) or downward (0) movement using a trained model."""
-    X = _build_features(df)
-    preds = model.predict(X)
+    X = _feature_frame(df, feature_store)[list(model.feature_names_in_)].dropna()
+    # np.asarray: models loaded memory-mapped from ml.registry return memmaps
+    preds = np.asarray(model.predict(X))
     return pd.Series(preds, index=X.index, name="direction")
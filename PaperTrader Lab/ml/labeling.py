@@ -0,0 +1,180 @@
+"""Triple-Barrier labeling and meta-labeling (López de Prado, AFML ch. 3).
+
+First-touch times are found on strided windows of the close series, so the
+labeling cost is a handful of NumPy operations per chunk of events instead of
+a Python loop per event. Multi-symbol frames (``symbol`` column, as returned
+by ``data.loader.load_ohlcv``) are labeled in a single pass: windows never
+cross a symbol boundary.
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from utils.grouped import symbol_order
+
+# Barrier codes in the ``barrier`` column.
+BARRIER_SL = -1
+BARRIER_VERTICAL = 0
+BARRIER_PT = 1
+
+# Max number of window cells materialized at once (events x max_holding).
+_CHUNK_CELLS = 1 << 22
+
+
+def _group_bounds(keys: np.ndarray):
+    """Start and (inclusive) end position of each row's group in sorted ``keys``."""
+    n = len(keys)
+    change = np.flatnonzero(keys[1:] != keys[:-1]) + 1
+    starts = np.concatenate(([0], change))
+    ends = np.concatenate((change, [n])) - 1
+    sizes = ends - starts + 1
+    return np.repeat(starts, sizes), np.repeat(ends, sizes)
+
+
+def ewm_vol(close: np.ndarray, group_start: np.ndarray, span: int) -> np.ndarray:
+    """EWM standard deviation of simple returns, restarted at each group."""
+    ret = np.full(len(close), np.nan)
+    ret[1:] = close[1:] / close[:-1] - 1
+    ret[group_start == np.arange(len(close))] = np.nan
+    return (
+        pd.Series(ret)
+        .groupby(group_start)
+        .transform(lambda r: r.ewm(span=span).std())
+        .to_numpy()
+    )
+
+
+def ema_crossover_side(df: pd.DataFrame, fast: int = 12, slow: int = 26) -> pd.Series:
+    """Primary signal for meta-labeling: +1/-1 on EMA crossovers, 0 elsewhere.
+
+    Mirrors the entry rule of ``strategies.ema_atr.EmaAtrStrategy`` (long on
+    fast crossing above slow) and adds the symmetric short side.
+    """
+    groups = df["symbol"].to_numpy() if "symbol" in df.columns else np.zeros(len(df))
+    g = df["close"].groupby(groups)
+    ema_f = g.transform(lambda s: s.ewm(span=fast, adjust=False).mean())
+    ema_s = g.transform(lambda s: s.ewm(span=slow, adjust=False).mean())
+    above = np.sign(ema_f - ema_s)
+    prev = above.groupby(groups).shift(1)
+    side = np.where((above > 0) & (prev <= 0), 1, np.where((above < 0) & (prev >= 0), -1, 0))
+    return pd.Series(side, index=df.index, name="side")
+
+
+def triple_barrier_labels(
+    df: pd.DataFrame,
+    pt: float = 1.0,
+    sl: float = 1.0,
+    max_holding: int = 20,
+    vol_span: int = 100,
+    side: Optional[pd.Series] = None,
+) -> pd.DataFrame:
+    """Label every bar with the first barrier touched by the forward path.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Price data with a ``close`` column, optionally a ``symbol`` column.
+    pt, sl : float
+        Profit-taking / stop-loss barrier widths as multiples of the EWM
+        volatility at the event. ``0`` disables the barrier.
+    max_holding : int
+        Vertical barrier, in bars.
+    vol_span : int
+        Span of the EWM volatility estimate.
+    side : pandas.Series, optional
+        Primary model side (+1 long, -1 short, 0 no trade) aligned row by
+        row with ``df``. When given, only bars with a non-zero side are
+        labeled, returns are signed by the side and ``label`` becomes the
+        meta-label (1 if the primary bet paid off, else 0).
+
+    Returns
+    -------
+    pandas.DataFrame
+        Indexed like the labeled events with columns ``symbol`` (if present),
+        ``t1`` (touch time), ``holding`` (bars), ``ret`` (return at touch),
+        ``barrier`` (1 PT, -1 SL, 0 vertical), ``label`` and ``side``.
+    """
+    if max_holding < 1:
+        raise ValueError("max_holding must be >= 1")
+    order = symbol_order(df)
+    close = df["close"].to_numpy(dtype=float)[order]
+    n = len(close)
+    if "symbol" in df.columns:
+        keys = pd.factorize(df["symbol"].to_numpy()[order])[0]
+    else:
+        keys = np.zeros(n, dtype=np.int64)
+    gstart, gend = _group_bounds(keys) if n else (np.array([], int), np.array([], int))
+    vol = ewm_vol(close, gstart, vol_span)
+    sgn = np.ones(n) if side is None else np.asarray(side, dtype=float)[order]
+    pos = np.arange(n)
+    events = pos[np.isfinite(vol) & (vol > 0) & (gend > pos) & (sgn != 0)]
+
+    padded = np.concatenate((close, np.full(max_holding, np.nan)))
+    windows = sliding_window_view(padded, max_holding + 1)
+    h = np.arange(1, max_holding + 1)
+
+    touch = np.empty(len(events), dtype=np.int64)
+    ret_at = np.empty(len(events))
+    barrier = np.empty(len(events), dtype=np.int64)
+    chunk = max(1, _CHUNK_CELLS // max_holding)
+    for a in range(0, len(events), chunk):
+        ev = events[a:a + chunk]
+        w = windows[ev]
+        path = (w[:, 1:] / w[:, :1] - 1) * sgn[ev, None]
+        horizon = np.minimum(gend[ev] - ev, max_holding)
+        path[h[None, :] > horizon[:, None]] = np.nan
+        upper = pt * vol[ev] if pt else np.full(len(ev), np.inf)
+        lower = -sl * vol[ev] if sl else np.full(len(ev), -np.inf)
+        up = path >= upper[:, None]
+        dn = path <= lower[:, None]
+        first_up = np.where(up.any(1), up.argmax(1) + 1, max_holding + 1)
+        first_dn = np.where(dn.any(1), dn.argmax(1) + 1, max_holding + 1)
+        hit = np.minimum(np.minimum(first_up, first_dn), horizon)
+        touch[a:a + chunk] = hit
+        ret_at[a:a + chunk] = path[np.arange(len(ev)), hit - 1]
+        barrier[a:a + chunk] = np.where(
+            first_dn == hit, BARRIER_SL, np.where(first_up == hit, BARRIER_PT, BARRIER_VERTICAL)
+        )
+
+    rows = order[events]
+    times = df.index[order]
+    out = pd.DataFrame(
+        {
+            "t1": times[events + touch],
+            "holding": touch,
+            "ret": ret_at,
+            "barrier": barrier,
+            "side": sgn[events].astype(int),
+        },
+        index=df.index[rows],
+    )
+    if side is None:
+        out["label"] = np.where(barrier == BARRIER_VERTICAL, 0, barrier)
+    else:
+        out["label"] = (ret_at > 0).astype(int)
+    if "symbol" in df.columns:
+        out.insert(0, "symbol", df["symbol"].to_numpy()[rows])
+    return out
+
+
+def meta_labels(
+    df: pd.DataFrame,
+    pt: float = 1.0,
+    sl: float = 1.0,
+    max_holding: int = 20,
+    vol_span: int = 100,
+    fast: int = 12,
+    slow: int = 26,
+) -> pd.DataFrame:
+    """Triple-Barrier meta-labels on top of the EMA crossover primary signal."""
+    side = ema_crossover_side(df, fast=fast, slow=slow)
+    return triple_barrier_labels(df, pt=pt, sl=sl, max_holding=max_holding,
+                                 vol_span=vol_span, side=side)
+
+
+__all__ = ["triple_barrier_labels", "meta_labels", "ema_crossover_side", "ewm_vol"]
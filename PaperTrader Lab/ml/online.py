@@ -0,0 +1,191 @@
+"""Online direction model: streaming scaler + SGD logistic regression.
+
+The batch pipeline in ``ml.direction`` must be refit on the whole history.
+``OnlineDirectionModel`` instead keeps per-symbol streaming feature state
+(the last closes needed for ``return_1``/``return_5``), a Welford running
+scaler and an ``SGDClassifier`` updated with ``partial_fit`` per bar or per
+batch. Scoring a new bar is O(1) and done in plain Python on cached
+coefficients, so it costs microseconds instead of a sklearn ``predict`` call.
+"""
+
+from __future__ import annotations
+
+import math
+from collections import deque
+from typing import Deque, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from sklearn.exceptions import NotFittedError
+from sklearn.linear_model import SGDClassifier
+
+from .direction import _feature_frame
+
+FEATURES = ["return_1", "return_5"]
+_LOOKBACK = 5
+
+
+class StreamingScaler:
+    """Running mean/variance (Welford) standardization."""
+
+    def __init__(self, n_features: int):
+        self.n = 0
+        self.mean = [0.0] * n_features
+        self._m2 = [0.0] * n_features
+
+    def update(self, x: Sequence[float]) -> None:
+        self.n += 1
+        for i, v in enumerate(x):
+            d = v - self.mean[i]
+            self.mean[i] += d / self.n
+            self._m2[i] += d * (v - self.mean[i])
+
+    def update_batch(self, X: np.ndarray) -> None:
+        """Merge a batch (Chan et al. parallel variance update)."""
+        nb = len(X)
+        if not nb:
+            return
+        mb = X.mean(axis=0)
+        m2b = ((X - mb) ** 2).sum(axis=0)
+        n = self.n + nb
+        for i in range(len(self.mean)):
+            d = mb[i] - self.mean[i]
+            self._m2[i] += m2b[i] + d * d * self.n * nb / n
+            self.mean[i] += d * nb / n
+        self.n = n
+
+    @property
+    def scale(self) -> List[float]:
+        if self.n < 2:
+            return [1.0] * len(self.mean)
+        return [math.sqrt(m / self.n) or 1.0 for m in self._m2]
+
+    def transform(self, X: np.ndarray) -> np.ndarray:
+        return (X - np.asarray(self.mean)) / np.asarray(self.scale)
+
+
+class OnlineDirectionModel:
+    """Direction model updated incrementally and scored bar by bar.
+
+    Parameters
+    ----------
+    batch_size : int
+        Labeled bars buffered before each ``partial_fit``; ``1`` updates on
+        every bar.
+    alpha : float
+        L2 regularization of the ``SGDClassifier``.
+    """
+
+    feature_names_in_ = np.array(FEATURES, dtype=object)
+
+    def __init__(self, batch_size: int = 32, alpha: float = 1e-4, random_state: Optional[int] = 0):
+        self.batch_size = batch_size
+        self.clf = SGDClassifier(loss="log_loss", alpha=alpha, random_state=random_state)
+        self.scaler = StreamingScaler(len(FEATURES))
+        self._closes: Dict[str, Deque[float]] = {}
+        self._pending: Dict[str, List[float]] = {}
+        self._buf_X: List[List[float]] = []
+        self._buf_y: List[int] = []
+        self._w: Optional[List[float]] = None
+        self._b = 0.0
+
+    # -- training --------------------------------------------------------
+
+    def _learn(self, X: np.ndarray, y: np.ndarray) -> None:
+        if hasattr(self.clf, "coef_") and not self.clf.coef_.flags.writeable:
+            # loaded memory-mapped from ml.registry: partial_fit writes in place
+            self.clf.coef_ = np.array(self.clf.coef_)
+            self.clf.intercept_ = np.array(self.clf.intercept_)
+        self.clf.partial_fit(self.scaler.transform(X), y, classes=np.array([0, 1]))
+        self._w = self.clf.coef_.ravel().tolist()
+        self._b = float(self.clf.intercept_[0])
+
+    def fit(self, df: pd.DataFrame) -> "OnlineDirectionModel":
+        """Warm start on historical bars, batch by batch.
+
+        ``df`` may hold several symbols (``symbol`` column): features and the
+        next-close target are taken per symbol, and each symbol's last bar,
+        whose next close is unknown, is left out.
+        """
+        close = df["close"]
+        nxt = close.groupby(df["symbol"].to_numpy()).shift(-1) if "symbol" in df.columns else close.shift(-1)
+        feats = _feature_frame(df)[FEATURES]
+        mask = (feats.notna().all(axis=1) & nxt.notna()).to_numpy()
+        X = feats.to_numpy()[mask]
+        y = (nxt > close).to_numpy()[mask].astype(int)
+        step = max(self.batch_size, 256)
+        for a in range(0, len(X), step):
+            self.scaler.update_batch(X[a:a + step])
+            self._learn(X[a:a + step], y[a:a + step])
+        return self
+
+    # -- streaming -------------------------------------------------------
+
+    def _features(self, symbol: str, close: float) -> Optional[List[float]]:
+        closes = self._closes.get(symbol)
+        if closes is None:
+            closes = self._closes[symbol] = deque(maxlen=_LOOKBACK + 1)
+        closes.append(close)
+        if len(closes) <= _LOOKBACK:
+            return None
+        return [close / closes[-2] - 1, close / closes[0] - 1]
+
+    def update(self, symbol: str, close: float) -> Optional[int]:
+        """Ingest a closed bar and return the direction forecast for the next one.
+
+        The previous bar's features of ``symbol`` are labeled with the realized
+        direction and queued for ``partial_fit``. Returns ``None`` during the
+        feature warm-up or before the first fit.
+        """
+        prev = self._pending.pop(symbol, None)
+        if prev is not None:
+            self._buf_X.append(prev[:-1])
+            self._buf_y.append(int(close > prev[-1]))
+            if len(self._buf_y) >= self.batch_size:
+                self._learn(np.asarray(self._buf_X), np.asarray(self._buf_y))
+                self._buf_X.clear()
+                self._buf_y.clear()
+        x = self._features(symbol, close)
+        if x is None:
+            return None
+        self.scaler.update(x)
+        self._pending[symbol] = x + [close]
+        p = self.predict_proba_one(x)
+        return None if p is None else int(p > 0.5)
+
+    def predict_proba_one(self, x: Sequence[float]) -> Optional[float]:
+        """Probability of an up move for one feature vector (no numpy)."""
+        if self._w is None:
+            return None
+        z = self._b
+        for w, v, m, s in zip(self._w, x, self.scaler.mean, self.scaler.scale):
+            z += w * (v - m) / s
+        if z < -35:
+            return 0.0
+        return 1.0 / (1.0 + math.exp(-z))
+
+    # -- batch (sklearn-compatible) ---------------------------------------
+
+    def predict_proba(self, X) -> np.ndarray:
+        if self._w is None:
+            raise NotFittedError("OnlineDirectionModel has not learned a batch yet (see update)")
+        X = np.asarray(X, dtype=float)
+        z = self.scaler.transform(X) @ np.asarray(self._w) + self._b
+        p = 1.0 / (1.0 + np.exp(-z))
+        return np.column_stack([1 - p, p])
+
+    def predict(self, X) -> np.ndarray:
+        return (self.predict_proba(X)[:, 1] > 0.5).astype(int)
+
+
+def train_online_direction_model(df: pd.DataFrame, batch_size: int = 32,
+                                 alpha: float = 1e-4) -> OnlineDirectionModel:
+    """Warm-start an :class:`OnlineDirectionModel` on historical bars.
+
+    The returned model is accepted by :func:`ml.direction.predict_direction`
+    and keeps learning through :meth:`OnlineDirectionModel.update`.
+    """
+    return OnlineDirectionModel(batch_size=batch_size, alpha=alpha).fit(df)
+
+
+__all__ = ["OnlineDirectionModel", "StreamingScaler", "train_online_direction_model"]
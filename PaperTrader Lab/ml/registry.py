@@ -0,0 +1,161 @@
+"""On-disk model registry with metadata and a per-process LRU of loaded models.
+
+Layout::
+
+    <root>/<symbol>/<timeframe>/<version>/model.joblib
+    <root>/<symbol>/<timeframe>/<version>/meta.json
+
+with ``symbol`` and ``timeframe`` percent-encoded (``utils.paths``).
+
+Models are dumped uncompressed with joblib so that loading memory-maps their
+NumPy arrays instead of copying them. Loading is lazy and cached per process,
+keyed by path and file mtime, so repeated predictions for a known
+``(symbol, timeframe, version)`` neither retrain nor unpickle again.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import joblib
+import pandas as pd
+
+from utils.paths import symbol_filename
+from utils.telemetry import METRICS
+
+from .features import FEATURE_VERSION, data_fingerprint
+
+MODEL_FILE = "model.joblib"
+META_FILE = "meta.json"
+
+_CACHE = METRICS.counter("cache_requests_total", "Cache lookups by cache and result", ("cache", "result"))
+
+
+@lru_cache(maxsize=int(os.getenv("MODEL_CACHE_SIZE", "16")))
+def _load_model(path: str, mtime_ns: int):
+    return joblib.load(path, mmap_mode="r")
+
+
+def build_metadata(
+    df: pd.DataFrame,
+    model=None,
+    feature_set: Optional[List[str]] = None,
+    cv_scores=None,
+    **extra: Any,
+) -> Dict[str, Any]:
+    """Describe a training run: data hash, training window, features, CV scores."""
+    if feature_set is None and model is not None and hasattr(model, "feature_names_in_"):
+        feature_set = [str(c) for c in model.feature_names_in_]
+    meta: Dict[str, Any] = dict(
+        data_hash=data_fingerprint(df),
+        train_start=str(df.index.min()) if len(df) else None,
+        train_end=str(df.index.max()) if len(df) else None,
+        n_rows=len(df),
+        feature_set=feature_set,
+        feature_version=FEATURE_VERSION,
+        model_class=type(model).__name__ if model is not None else None,
+    )
+    if cv_scores is not None:
+        meta["cv_scores"] = [float(s) for s in cv_scores]
+    meta.update(extra)
+    return meta
+
+
+class ModelRegistry:
+    """Versioned storage of trained direction models.
+
+    Parameters
+    ----------
+    root : str or Path, optional
+        Registry directory (default ``$MODEL_REGISTRY_DIR`` or
+        ``<project>/.cache/models``).
+    """
+
+    def __init__(self, root: Optional[os.PathLike] = None):
+        if root is None:
+            root = os.getenv("MODEL_REGISTRY_DIR") or Path(__file__).resolve().parents[1] / ".cache" / "models"
+        self.root = Path(root)
+
+    def _dir(self, symbol: str, timeframe: str, version: Optional[str] = None) -> Path:
+        base = self.root / symbol_filename(symbol) / symbol_filename(timeframe)
+        return base if version is None else base / version
+
+    def versions(self, symbol: str, timeframe: str) -> List[str]:
+        base = self._dir(symbol, timeframe)
+        if not base.exists():
+            return []
+        found = [p.name for p in base.iterdir() if (p / MODEL_FILE).exists()]
+        return sorted(found, key=lambda v: int(v[1:]) if v[1:].isdigit() else -1)
+
+    def latest(self, symbol: str, timeframe: str) -> Optional[str]:
+        versions = self.versions(symbol, timeframe)
+        return versions[-1] if versions else None
+
+    def save(self, model, symbol: str, timeframe: str, metadata: Optional[Dict[str, Any]] = None,
+             version: Optional[str] = None) -> str:
+        """Persist ``model`` with its metadata and return the version (``v1``, ``v2``...)."""
+        if version is None:
+            latest = self.latest(symbol, timeframe)
+            version = f"v{int(latest[1:]) + 1 if latest and latest[1:].isdigit() else 1}"
+        target = self._dir(symbol, timeframe, version)
+        tmp = target.with_name(f".{version}.tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        joblib.dump(model, tmp / MODEL_FILE)
+        meta = dict(metadata or {}, symbol=symbol, timeframe=timeframe, version=version,
+                    created_at=pd.Timestamp.now(tz="UTC").isoformat())
+        (tmp / META_FILE).write_text(json.dumps(meta, indent=2, default=str), encoding="utf-8")
+        shutil.rmtree(target, ignore_errors=True)
+        os.replace(tmp, target)
+        return version
+
+    def metadata(self, symbol: str, timeframe: str, version: Optional[str] = None) -> Dict[str, Any]:
+        version = version or self.latest(symbol, timeframe)
+        if version is None:
+            raise KeyError(f"no model for {symbol}/{timeframe}")
+        return json.loads((self._dir(symbol, timeframe, version) / META_FILE).read_text(encoding="utf-8"))
+
+    def load(self, symbol: str, timeframe: str, version: Optional[str] = None, writable: bool = False):
+        """Return the model (latest version by default) from the per-process LRU.
+
+        Cached models are shared and their arrays are read-only memory maps;
+        pass ``writable=True`` to get a private in-memory copy to update, e.g.
+        an ``OnlineDirectionModel``.
+        """
+        version = version or self.latest(symbol, timeframe)
+        if version is None:
+            raise KeyError(f"no model for {symbol}/{timeframe}")
+        path = self._dir(symbol, timeframe, version) / MODEL_FILE
+        if not path.exists():
+            raise KeyError(f"no model for {symbol}/{timeframe}/{version}")
+        if writable:
+            return joblib.load(path)
+        hits = _load_model.cache_info().hits
+        model = _load_model(str(path), path.stat().st_mtime_ns)
+        _CACHE.inc(cache="model", result="hit" if _load_model.cache_info().hits > hits else "miss")
+        return model
+
+    def get_or_train(self, symbol: str, timeframe: str, df: pd.DataFrame,
+                     train: Callable[[pd.DataFrame], Any], version: Optional[str] = None, **meta: Any):
+        """Load the registered model, training and saving it only if missing."""
+        try:
+            return self.load(symbol, timeframe, version)
+        except KeyError:
+            model = train(df)
+            saved = self.save(model, symbol, timeframe, build_metadata(df, model, **meta), version=version)
+            return self.load(symbol, timeframe, saved)
+
+    def delete(self, symbol: str, timeframe: str, version: str) -> None:
+        shutil.rmtree(self._dir(symbol, timeframe, version), ignore_errors=True)
+
+
+def clear_model_cache() -> None:
+    _load_model.cache_clear()
+
+
+__all__ = ["ModelRegistry", "build_metadata", "clear_model_cache"]
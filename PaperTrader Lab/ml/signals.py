@@ -0,0 +1,77 @@
+"""Precomputed model signals for backtesting ``predict_direction`` output.
+
+Predictions are made in one vectorized batch over the whole test frame and
+attached as a ``signal`` column, which ``backtest.engine.df_to_btfeed`` turns
+into an extra feed line. Strategies read the line bar by bar, so the backtest
+never calls ``model.predict`` inside ``next()``.
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .cv import purged_train_test_split
+from .direction import _feature_frame, train_direction_model
+
+
+def prediction_signals(model, df: pd.DataFrame, feature_store=None) -> pd.Series:
+    """Probability of an up move for every row of ``df`` (NaN during warm-up).
+
+    Models without ``predict_proba`` yield their 0/1 predictions instead.
+    """
+    X = _feature_frame(df, feature_store)[list(model.feature_names_in_)]
+    mask = X.notna().all(axis=1).to_numpy()
+    out = np.full(len(df), np.nan)
+    if mask.any():
+        if hasattr(model, "predict_proba"):
+            out[mask] = np.asarray(model.predict_proba(X[mask]))[:, 1]
+        else:
+            out[mask] = np.asarray(model.predict(X[mask]))
+    return pd.Series(out, index=df.index, name="signal")
+
+
+def ml_signal_frame(
+    df: pd.DataFrame,
+    test_size: float = 0.3,
+    horizon: int = 1,
+    embargo_pct: float = 0.01,
+    feature_store=None,
+    train: Optional[Callable] = None,
+) -> Tuple[pd.DataFrame, object]:
+    """Train on the purged in-sample part and attach signals to the test part.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        OHLCV frame as returned by ``data.loader.load_ohlcv``.
+    test_size, horizon, embargo_pct
+        See :func:`ml.cv.purged_train_test_split`.
+    feature_store : ml.features.FeatureStore, optional
+        Feature set used for training and prediction.
+    train : callable, optional
+        ``train(df)`` returning a fitted model; defaults to
+        :func:`ml.direction.train_direction_model`.
+
+    Returns
+    -------
+    (pandas.DataFrame, model)
+        Out-of-sample bars with a ``signal`` column, ready for
+        ``backtest.engine.run_backtest``, and the fitted model.
+    """
+    train_df, test_df = purged_train_test_split(df, test_size=test_size, horizon=horizon,
+                                                embargo_pct=embargo_pct)
+    if train is None:
+        model = train_direction_model(train_df, feature_store=feature_store)
+    else:
+        model = train(train_df)
+    # predict on the full frame: test features need the preceding warm-up bars
+    sig = prediction_signals(model, df, feature_store=feature_store)
+    out = test_df.copy()
+    out["signal"] = sig[df.index >= test_df.index.min()].fillna(0.0).to_numpy()
+    return out, model
+
+
+__all__ = ["prediction_signals", "ml_signal_frame"]
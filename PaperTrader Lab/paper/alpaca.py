@@ -2,6 +2,18 @@ from __future__ import annotations
 from typing import Dict, Any
 from utils.config import SETTINGS
 from utils.errors import ProviderError
+from utils.latency import LATENCY
+from utils.telemetry import METRICS
+
+_REQUESTS = METRICS.counter("provider_requests_total", "Broker API calls", ("provider", "endpoint"))
+_REQUEST_SECONDS = METRICS.histogram("provider_request_seconds", "Broker API latency", ("provider", "endpoint"))
+_ORDERS = METRICS.counter("orders_submitted_total", "Orders sent to the paper broker", ("side", "type"))
+_ERRORS = METRICS.counter("errors_total", "Exceptions by component", ("component",))
+
+def _call(endpoint: str, fn, *args, **kwargs):
+    _REQUESTS.inc(provider="alpaca", endpoint=endpoint)
+    with _ERRORS.count_exceptions(component="alpaca"), _REQUEST_SECONDS.time(provider="alpaca", endpoint=endpoint):
+        return fn(*args, **kwargs)
 
 def _trading_client():
     from alpaca.trading.client import TradingClient
@@ -16,12 +28,14 @@ def _trading_client():
 
 def account():
     tc = _trading_client()
-    acc = tc.get_account()
+    with LATENCY.stage("get_account"):
+        acc = _call("get_account", tc.get_account)
     return {"id": acc.id, "status": acc.status, "cash": float(acc.cash), "portfolio_value": float(acc.portfolio_value)}
 
 def positions():
     tc = _trading_client()
-    pos = tc.get_all_positions()
+    with LATENCY.stage("get_positions"):
+        pos = _call("get_all_positions", tc.get_all_positions)
     rows = []
     for p in pos:
         rows.append(dict(symbol=p.symbol, qty=float(p.qty), avg_entry=float(p.avg_entry_price),
@@ -31,17 +45,24 @@ def positions():
 def place_order(symbol: str, qty: int, side: str, type_: str="market", limit_price: float|None=None):
     from alpaca.trading.requests import MarketOrderRequest, LimitOrderRequest
     from alpaca.trading.enums import OrderSide, TimeInForce
-    tc = _trading_client()
-    if type_ == "market":
-        req = MarketOrderRequest(symbol=symbol, qty=qty, side=OrderSide(side), time_in_force=TimeInForce.DAY)
-    else:
-        if limit_price is None:
-            raise ProviderError("limit_price required for limit order")
-        req = LimitOrderRequest(symbol=symbol, qty=qty, side=OrderSide(side), limit_price=limit_price, time_in_force=TimeInForce.DAY)
-    order = tc.submit_order(req)
+    with LATENCY.stage("order_build"):
+        tc = _trading_client()
+        if type_ == "market":
+            req = MarketOrderRequest(symbol=symbol, qty=qty, side=OrderSide(side), time_in_force=TimeInForce.DAY)
+        else:
+            if limit_price is None:
+                raise ProviderError("limit_price required for limit order")
+            req = LimitOrderRequest(symbol=symbol, qty=qty, side=OrderSide(side), limit_price=limit_price, time_in_force=TimeInForce.DAY)
+    # submit -> ack is the broker round trip; signal -> submit is recorded
+    # when a runner stamped the symbol with LATENCY.signal_ready()
+    LATENCY.order_submitted(symbol)
+    order = _call("submit_order", tc.submit_order, req)
+    _ORDERS.inc(side=side, type=type_)
+    LATENCY.order_acked(symbol)
     return {"id": order.id, "status": order.status, "symbol": order.symbol}
 
 def cancel_all():
     tc = _trading_client()
-    tc.cancel_orders()
+    with LATENCY.stage("cancel_orders"):
+        _call("cancel_orders", tc.cancel_orders)
     return True
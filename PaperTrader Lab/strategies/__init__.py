@@ -0,0 +1,73 @@
+"""Strategy registry.
+
+Entries only describe the strategies; their modules (and backtrader) are
+imported on first ``StrategySpec.load()``.
+"""
+
+from .base import Param, StrategySpec
+
+_EXITS = (
+    Param("atr_period", "int", 14, 5, 100, label="ATR window"),
+    Param("stop_mode", "choice", "atr", choices=("atr", "percent"), label="Stop/TP mode"),
+    Param("atr_mult_sl", "float", 2.0, 0.5, 10.0, 0.1, label="ATR SL x"),
+    Param("atr_mult_tp", "float", 3.0, 0.5, 10.0, 0.1, label="ATR TP x"),
+    Param("sl_pct", "float", 0.01, 0.001, 0.5, 0.001, label="SL % (se percent)", scale=100),
+    Param("tp_pct", "float", 0.02, 0.001, 0.5, 0.001, label="TP % (se percent)", scale=100),
+    Param("time_in_market_max", "int", 0, 0, 10_000, label="Max bars in trade (0=illimitato)"),
+)
+_EMA = (
+    Param("ema_fast", "int", 12, 5, 200, label="ema_fast"),
+    Param("ema_slow", "int", 26, 10, 400, label="ema_slow"),
+)
+
+STRATEGIES = {
+    "ema_atr": StrategySpec(
+        name="ema_atr",
+        label="EMA crossover + ATR stop",
+        module="strategies.ema_atr",
+        cls="EmaAtrStrategy",
+        params=_EMA + _EXITS,
+        warmup=lambda p: max(p["ema_slow"], p["atr_period"]) + 1,
+    ),
+    "breakout": StrategySpec(
+        name="breakout",
+        label="Breakout + filtro vol",
+        module="strategies.breakout",
+        cls="BreakoutStrategy",
+        params=(
+            Param("channel", "int", 20, 5, 500, label="Canale breakout (barre)"),
+            Param("exit_channel", "int", 10, 2, 500, label="Canale uscita (barre)"),
+            Param("vol_window", "int", 20, 5, 200, label="Finestra vol breve"),
+            Param("vol_lookback", "int", 100, 20, 1000, label="Finestra vol lunga"),
+            Param("vol_min", "float", 0.0, 0.0, 10.0, 0.1, label="Vol ratio min"),
+            Param("vol_max", "float", 1.5, 0.1, 10.0, 0.1, label="Vol ratio max"),
+        ) + _EXITS,
+        engines=("backtrader", "vectorized"),
+        warmup=lambda p: max(p["channel"], p["vol_lookback"], p["atr_period"]) + 1,
+        signal="strategies.breakout_kernel:breakout_frame",
+        signal_params=("channel", "exit_channel", "vol_window", "vol_lookback", "vol_min", "vol_max"),
+    ),
+    "ml_signal": StrategySpec(
+        name="ml_signal",
+        label="Segnale ML (precalcolato)",
+        module="strategies.ml_signal",
+        cls="MLSignalStrategy",
+        params=(
+            Param("threshold", "float", 0.5, 0.0, 1.0, 0.01, label="Soglia probabilità"),
+            Param("use_ema_gate", "bool", False, label="Meta-label su EMA crossover"),
+        ) + _EMA + _EXITS,
+        warmup=lambda p: max(p["ema_slow"], p["atr_period"]) + 1,
+        inputs=("signal",),
+        description="Richiede la colonna 'signal' (vedi ml.signals.ml_signal_frame).",
+    ),
+}
+
+
+def get_strategy(name: str) -> StrategySpec:
+    try:
+        return STRATEGIES[name]
+    except KeyError:
+        raise ValueError(f"Unknown strategy: {name} (available: {', '.join(STRATEGIES)})") from None
+
+
+__all__ = ["Param", "StrategySpec", "STRATEGIES", "get_strategy"]
@@ -0,0 +1,130 @@
+"""Declarative strategy specs for the strategy registry."""
+
+from __future__ import annotations
+
+import importlib
+import itertools
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+
+Number = Union[int, float]
+
+
+@dataclass(frozen=True)
+class Param:
+    """One strategy parameter: type, default, bounds and UI hints.
+
+    ``kind`` is ``"int"``, ``"float"``, ``"bool"`` or ``"choice"``. ``scale``
+    is the factor applied for display (e.g. ``100`` shows a fraction as %).
+    """
+
+    name: str
+    kind: str
+    default: Any
+    min: Optional[Number] = None
+    max: Optional[Number] = None
+    step: Optional[Number] = None
+    choices: Tuple[Any, ...] = ()
+    label: str = ""
+    scale: float = 1.0
+
+    def cast(self, value: Any) -> Any:
+        if self.kind == "int":
+            value = int(value)
+        elif self.kind == "float":
+            value = float(value)
+        elif self.kind == "bool":
+            value = bool(value)
+        if self.kind == "choice" and value not in self.choices:
+            raise ValueError(f"{self.name}: {value!r} not in {self.choices}")
+        if self.min is not None and value < self.min:
+            raise ValueError(f"{self.name}: {value} < {self.min}")
+        if self.max is not None and value > self.max:
+            raise ValueError(f"{self.name}: {value} > {self.max}")
+        return value
+
+
+@dataclass(frozen=True)
+class StrategySpec:
+    """Registry entry: where the strategy lives and what it accepts.
+
+    The strategy class (``module:cls``) and the optional signal function
+    (``signal``, ``"module:function"`` returning ``df`` with a ``signal``
+    column) are imported on first use only. Parameters listed in
+    ``signal_params`` go to the signal function, the others to the class.
+    ``inputs`` are extra columns the frame must already carry.
+    """
+
+    name: str
+    label: str
+    module: str
+    cls: str
+    params: Tuple[Param, ...] = ()
+    engines: Tuple[str, ...] = ("backtrader",)
+    warmup: Callable[[Dict[str, Any]], int] = lambda p: 0
+    signal: Optional[str] = None
+    signal_params: Tuple[str, ...] = ()
+    inputs: Tuple[str, ...] = ()
+    description: str = ""
+    _cache: Dict[str, Any] = field(default_factory=dict, compare=False, repr=False)
+
+    @property
+    def param_names(self) -> List[str]:
+        return [p.name for p in self.params]
+
+    def defaults(self) -> Dict[str, Any]:
+        return {p.name: p.default for p in self.params}
+
+    def validate(self, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Defaults overridden by ``params``, cast and bound-checked (unknown names raise)."""
+        params = dict(params or {})
+        unknown = set(params) - set(self.param_names)
+        if unknown:
+            raise ValueError(f"{self.name}: unknown params {sorted(unknown)}")
+        return {p.name: p.cast(params.get(p.name, p.default)) for p in self.params}
+
+    def warmup_bars(self, params: Optional[Dict[str, Any]] = None) -> int:
+        return int(self.warmup(self.validate(params)))
+
+    def load(self) -> type:
+        """Import and return the strategy class."""
+        if "cls" not in self._cache:
+            self._cache["cls"] = getattr(importlib.import_module(self.module), self.cls)
+        return self._cache["cls"]
+
+    def signal_fn(self) -> Optional[Callable[..., pd.DataFrame]]:
+        if self.signal is None:
+            return None
+        if "signal" not in self._cache:
+            module, fn = self.signal.split(":")
+            self._cache["signal"] = getattr(importlib.import_module(module), fn)
+        return self._cache["signal"]
+
+    def prepare(self, df: pd.DataFrame, params: Optional[Dict[str, Any]] = None) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """Validate ``params``, add the signal column if needed; return ``(df, class params)``.
+
+        Names outside the schema (e.g. ``latency``) pass through unchecked.
+        """
+        params = dict(params or {})
+        extra = {k: params.pop(k) for k in list(params) if k not in self.param_names}
+        missing = [c for c in self.inputs if c not in df.columns]
+        if missing:
+            raise ValueError(f"{self.name}: missing columns {missing}")
+        params = self.validate(params)
+        sig = {k: params.pop(k) for k in self.signal_params}
+        fn = self.signal_fn()
+        if fn is not None:
+            df = fn(df, **sig)
+        return df, {**params, **extra}
+
+    def grid(self, base: Optional[Dict[str, Any]] = None, **ranges: Sequence[Any]) -> List[Dict[str, Any]]:
+        """Validated parameter sets for a sweep over the cartesian product of ``ranges``."""
+        base = dict(base or {})
+        names = list(ranges)
+        return [self.validate({**base, **dict(zip(names, combo))})
+                for combo in itertools.product(*(ranges[n] for n in names))]
+
+
+__all__ = ["Param", "StrategySpec"]
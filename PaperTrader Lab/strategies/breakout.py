@@ -0,0 +1,26 @@
+"""Channel breakout with a volatility regime filter (Backtrader strategy).
+
+The signal comes from ``strategies.breakout_kernel``; ``BreakoutStrategy`` is
+a thin wrapper that trades the precomputed ``signal`` column, so the same
+signal can run in ``backtest.vectorized`` or, with stops and sizing, in
+``backtest.engine``.
+"""
+
+from __future__ import annotations
+
+from strategies.ema_atr import EmaAtrStrategy
+
+
+class BreakoutStrategy(EmaAtrStrategy):
+    """Trade the precomputed breakout ``signal`` line (long side).
+
+    Entries and channel exits come from
+    :func:`strategies.breakout_kernel.breakout_frame`; stops, targets, sizing
+    and the time stop are inherited from ``EmaAtrStrategy``.
+    """
+
+    def _entry_signal(self) -> bool:
+        return self.data.signal[0] > 0
+
+    def _exit_signal(self) -> bool:
+        return not self.data.signal[0] > 0
@@ -0,0 +1,106 @@
+"""Channel breakout signal with a volatility regime filter.
+
+``breakout_signals`` computes positions in one NumPy pass over a
+multi-symbol ``load_ohlcv`` frame: rows are sorted by symbol/time, rolling
+channels and volatilities are taken over the whole array and windows that
+cross a symbol boundary are masked. No backtrader here, so
+``backtest.vectorized`` runs it without loading the Backtrader engine (see
+``strategies.breakout`` for the strategy class).
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from utils.grouped import group_first, rolling_std, symbol_order
+
+
+def _prior_extreme(x: np.ndarray, window: int, first: np.ndarray, how) -> np.ndarray:
+    """``how`` over the ``window`` bars before each bar, NaN across symbol starts."""
+    out = np.full(len(x), np.nan)
+    if len(x) > window:
+        out[window:] = how(sliding_window_view(x, window)[:-1], axis=1)
+    out[np.arange(len(x)) - first < window] = np.nan
+    return out
+
+
+def _hold(enter: np.ndarray, leave: np.ndarray, is_first: np.ndarray) -> np.ndarray:
+    """1 from an entry until the next exit, per symbol (forward fill of events)."""
+    rows = np.arange(len(enter))
+    event = enter | leave | is_first
+    last = np.maximum.accumulate(np.where(event, rows, 0))
+    return (enter & ~leave)[last].astype(float)
+
+
+def breakout_signals(df: pd.DataFrame, channel: int = 20, exit_channel: int = 10,
+                     vol_window: int = 20, vol_lookback: int = 100,
+                     vol_min: float = 0.0, vol_max: float = 1.5,
+                     allow_short: bool = False) -> pd.DataFrame:
+    """Breakout positions for every symbol of ``df``.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        OHLCV bars (``high``/``low`` fall back to ``close``), optionally with
+        a ``symbol`` column.
+    channel : int
+        Enter long when the close breaks above the highest high of the
+        previous ``channel`` bars (short below the lowest low).
+    exit_channel : int
+        Exit when the close breaks the opposite ``exit_channel`` extreme.
+    vol_window, vol_lookback : int
+        Short and long windows of the return volatility; their ratio is the
+        regime filter.
+    vol_min, vol_max : float
+        Entries are taken only when ``vol_min <= vol_ratio <= vol_max``.
+    allow_short : bool
+        Also take downside breakouts.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Aligned row by row with ``df``: ``upper``, ``lower``, ``vol_ratio``
+        and ``signal`` (target position, 1/0/-1, decided at the bar close).
+    """
+    order = symbol_order(df)
+    sdf = df.iloc[order]
+    close = sdf["close"].to_numpy(dtype=float)
+    high = sdf["high"].to_numpy(dtype=float) if "high" in sdf.columns else close
+    low = sdf["low"].to_numpy(dtype=float) if "low" in sdf.columns else close
+    keys = pd.factorize(sdf["symbol"])[0] if "symbol" in sdf.columns else np.zeros(len(sdf), dtype=int)
+    n = len(close)
+    starts, first = group_first(keys)
+    is_first = np.zeros(n, dtype=bool)
+    is_first[starts] = True
+
+    upper = _prior_extreme(high, channel, first, np.max)
+    lower = _prior_extreme(low, channel, first, np.min)
+    exit_upper = _prior_extreme(high, exit_channel, first, np.max)
+    exit_lower = _prior_extreme(low, exit_channel, first, np.min)
+
+    ret = np.full(n, np.nan)
+    ret[1:] = close[1:] / close[:-1] - 1
+    ret[is_first] = np.nan
+    with np.errstate(divide="ignore", invalid="ignore"):
+        vol_ratio = rolling_std(ret, vol_window, first + 1) / rolling_std(ret, vol_lookback, first + 1)
+    regime = (vol_ratio >= vol_min) & (vol_ratio <= vol_max)
+
+    go_long = (close > upper) & regime
+    go_short = (close < lower) & regime & allow_short
+    signal = _hold(go_long, (close < exit_lower) | go_short, is_first)
+    if allow_short:
+        signal -= _hold(go_short, (close > exit_upper) | go_long, is_first)
+
+    out = np.empty((n, 4))
+    out[order] = np.column_stack([upper, lower, vol_ratio, signal])
+    return pd.DataFrame(out, index=df.index, columns=["upper", "lower", "vol_ratio", "signal"])
+
+
+def breakout_frame(df: pd.DataFrame, **params) -> pd.DataFrame:
+    """``df`` with the ``signal`` column of :func:`breakout_signals` (for ``run_backtest``)."""
+    return df.assign(signal=breakout_signals(df, **params)["signal"].to_numpy())
+
+
+__all__ = ["breakout_signals", "breakout_frame"]
@@ -11,29 +11,50 @@ class EmaAtrStrategy(bt.Strategy):
         sl_pct=0.01,       # used if stop_mode="percent"
         tp_pct=0.02,
         time_in_market_max=None,  # bars
+        latency=None,      # optional utils.latency.LatencyRecorder (live runners)
+        symbol=None,       # feed name to trade when several feeds share one broker
+        risk=None,         # optional backtest.risk.RiskEngine shared across symbols
     )
 
     def __init__(self):
+        if self.p.symbol is not None:
+            self.data = self.getdatabyname(self.p.symbol)
         self.ema_fast = bt.ind.EMA(self.data.close, period=self.p.ema_fast)
         self.ema_slow = bt.ind.EMA(self.data.close, period=self.p.ema_slow)
         self.crossover = bt.ind.CrossOver(self.ema_fast, self.ema_slow)
         self.atr = bt.ind.ATR(self.data, period=self.p.atr_period)
         self.order = None
         self.bars_in_trade = 0
+        self.stop_price = None
+        self._bracket = []
+        self._seen = 0
 
     def next(self):
+        if self.p.symbol is not None:
+            # with a shared broker next() runs on every bar of any feed
+            if len(self.data) == self._seen:
+                return
+            self._seen = len(self.data)
+        if self.p.latency is not None:
+            self.p.latency.bar_received(self.data._name)
         if self.order:
             return
 
-        if self.position:
+        if self.getposition(self.data):
+            if self.p.risk is not None:
+                self.p.risk.mark(self.data._name, self.data.close[0])
             self.bars_in_trade += 1
-            # time stop
-            if self.p.time_in_market_max and self.bars_in_trade >= self.p.time_in_market_max:
-                self.close()
+            # time stop or strategy exit: drop the pending stop/take first
+            timed_out = self.p.time_in_market_max and self.bars_in_trade >= self.p.time_in_market_max
+            if timed_out or self._exit_signal():
+                for child in self._bracket[1:]:
+                    if child is not None and child.alive():
+                        self.cancel(child)
+                self.close(data=self.data)
             return
 
         # Entry: fast crosses above slow -> long (flat->long only)
-        if self.crossover > 0:
+        if self._entry_signal():
             # Determine SL/TP
             price = self.data.close[0]
             if self.p.stop_mode == "atr":
@@ -43,10 +64,33 @@ class EmaAtrStrategy(bt.Strategy):
                 sl = price * (1 - self.p.sl_pct)
                 tp = price * (1 + self.p.tp_pct)
 
+            # size from the stop distance (and the portfolio limits, if any)
+            self.stop_price = sl
+            size = self.getsizing(self.data, isbuy=True)
+            if not size:
+                return
+            if self.p.latency is not None:
+                self.p.latency.signal_ready(self.data._name)
             # Bracket order: market entry + OCO stop/take
-            self.order = self.buy_bracket(limitprice=tp, stopprice=sl)
+            self.order = self._bracket = self.buy_bracket(data=self.data, size=size, limitprice=tp, stopprice=sl)
             self.bars_in_trade = 0
+            if self.p.risk is not None:
+                # reserve the risk now so same-bar entries on other symbols see it
+                self.p.risk.open(self.data._name, size, price, sl)
+
+    def _entry_signal(self) -> bool:
+        return self.crossover > 0
+
+    def _exit_signal(self) -> bool:
+        return False
 
     def notify_order(self, order):
-        if order.status in [order.Completed, order.Canceled, order.Rejected]:
+        if order.status in [order.Completed, order.Canceled, order.Margin, order.Rejected]:
             self.order = None
+            if (self.p.risk is not None and order.parent is None and order.isbuy()
+                    and order.status != order.Completed):
+                self.p.risk.close(self.data._name)  # entry never filled
+
+    def notify_trade(self, trade):
+        if trade.isclosed and self.p.risk is not None:
+            self.p.risk.close(self.data._name)
@@ -0,0 +1,19 @@
+from strategies.ema_atr import EmaAtrStrategy
+
+class MLSignalStrategy(EmaAtrStrategy):
+    """Trade precomputed model signals, optionally gated by the EMA crossover.
+
+    Reads the ``signal`` feed line (probability of an up move, see
+    ``ml.signals.ml_signal_frame``). With ``use_ema_gate`` the model acts as a
+    meta-label: only EMA crossovers confirmed by the model are taken. Stops,
+    targets and the time stop are inherited from ``EmaAtrStrategy``.
+    """
+    params = dict(
+        threshold=0.5,
+        use_ema_gate=False,
+    )
+
+    def _entry_signal(self) -> bool:
+        if not self.data.signal[0] > self.p.threshold:
+            return False
+        return self.crossover > 0 if self.p.use_ema_gate else True
@@ -1,4 +1,30 @@
 import sys
 import pathlib
 
+import numpy as np
+import pandas as pd
+import pytest
+
 sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+
+def make_ohlcv(n=300, symbols=("AAA", "BBB"), seed=0, freq="D", start="2023-01-02", tz=None,
+               drift=5e-4, vol=1.5e-2):
+    """Seeded GBM bars per symbol on a shared index (``load_ohlcv`` columns)."""
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range(start, periods=n, freq=freq, tz=tz)
+    frames = []
+    for s in symbols:
+        close = 100 * np.exp(np.cumsum(rng.normal(drift, vol, n)))
+        wick = rng.uniform(0, 0.01, (2, n))
+        frames.append(pd.DataFrame({
+            "open": close, "high": close * (1 + wick[0]), "low": close * (1 - wick[1]), "close": close,
+            "volume": rng.uniform(5e3, 2e4, n), "symbol": s,
+        }, index=idx))
+    return pd.concat(frames).sort_index()
+
+
+@pytest.fixture
+def ohlcv():
+    """Factory of synthetic multi-symbol bars, see ``make_ohlcv``."""
+    return make_ohlcv
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+
+from benchmarks.compare import compare_reports
+from benchmarks.run import run_suites
+from benchmarks.synthetic import synthetic_ohlcv
+from data.loader import _postprocess
+from utils.tz import ensure_tz_index
+
+
+def test_synthetic_frames_are_seeded_and_consistent():
+    a = synthetic_ohlcv(3, "15m", 4, seed=7)
+    pd.testing.assert_frame_equal(a, synthetic_ohlcv(3, "15m", 4, seed=7))
+    assert len(a) == 3 * 4 * 64 and str(a.index.tz) == "UTC"
+    assert (a["high"] >= a[["open", "close"]].max(axis=1)).all()
+    assert (a["low"] <= a[["open", "close"]].min(axis=1)).all()
+    assert a.index.is_monotonic_increasing
+
+
+def test_postprocess_session_filter_matches_per_symbol_filter():
+    raw = synthetic_ohlcv(3, "15m", 3, seed=1)
+    out = _postprocess(raw, "America/New_York", session_filter_on=True)
+    local = ensure_tz_index(raw, "America/New_York")
+    minutes = local.index.hour * 60 + local.index.minute
+    expected = local[(minutes >= 570) & (minutes <= 960)]
+    pd.testing.assert_frame_equal(out, expected[out.columns])
+    assert out.groupby("symbol").size().eq(27 * 3).all()
+
+
+def test_run_and_compare_reports():
+    report = run_suites(["smoke"], only=["loader_postprocess", "metrics"], repeat=1)
+    assert set(report["versions"]) >= {"python", "numpy", "pandas"}
+    assert len(report["results"]) == 4
+    slower = {"results": {k: {**v, "median": v["median"] * 2} for k, v in report["results"].items()}}
+    rows = compare_reports(report, slower)
+    assert all(r["regression"] and np.isclose(r["ratio"], 2) for r in rows)
+    assert not any(r["regression"] for r in compare_reports(report, report))
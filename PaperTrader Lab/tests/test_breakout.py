@@ -0,0 +1,51 @@
+import numpy as np
+
+from backtest.engine import run_backtest
+from backtest.vectorized import run_vectorized
+from strategies.breakout import BreakoutStrategy
+from strategies.breakout_kernel import breakout_frame, breakout_signals
+
+
+def _reference(g, channel, exit_channel, vol_window, vol_lookback, vol_max):
+    upper = g["high"].rolling(channel).max().shift(1)
+    lower = g["low"].rolling(channel).min().shift(1)
+    exit_lower = g["low"].rolling(exit_channel).min().shift(1)
+    ret = g["close"].pct_change()
+    ratio = ret.rolling(vol_window).std() / ret.rolling(vol_lookback).std()
+    pos, out = 0.0, []
+    for c, u, xl, r in zip(g["close"], upper, exit_lower, ratio):
+        if pos and c < xl:
+            pos = 0.0
+        elif not pos and c > u and r <= vol_max:
+            pos = 1.0
+        out.append(pos)
+    return upper.to_numpy(), lower.to_numpy(), np.array(out)
+
+
+def test_kernel_matches_per_symbol_loop(ohlcv):
+    df = ohlcv(n=400, seed=7)
+    params = dict(channel=20, exit_channel=10, vol_window=10, vol_lookback=50, vol_max=1.2)
+    sig = breakout_signals(df, **params)
+    assert sig.index.equals(df.index)
+    for sym, g in df.groupby("symbol"):
+        rows = (df["symbol"] == sym).to_numpy()
+        upper, lower, pos = _reference(g, **params)
+        np.testing.assert_allclose(sig["upper"].to_numpy()[rows], upper)
+        np.testing.assert_allclose(sig["lower"].to_numpy()[rows], lower)
+        np.testing.assert_array_equal(sig["signal"].to_numpy()[rows], pos)
+    assert sig["signal"].sum() > 0
+
+
+def test_short_side_and_engines(ohlcv):
+    df = ohlcv(n=400, seed=7)
+    sig = breakout_signals(df, allow_short=True, vol_max=np.inf)
+    assert set(np.unique(sig["signal"])) == {-1.0, 0.0, 1.0}
+
+    frame = breakout_frame(df, vol_max=np.inf)
+    vec = run_vectorized(frame, positions="signal")
+    assert sum(r["trades"] for r in vec["per_symbol"]) > 0
+    bt_res = run_backtest(frame, cash=100_000, commission=0.0, slippage_bps=0,
+                          sizer_kwargs=dict(risk_per_trade=0.01, min_size=1),
+                          strategy_params=dict(stop_mode="percent", sl_pct=0.2, tp_pct=1.0),
+                          strategy=BreakoutStrategy)
+    assert bt_res["equity"].iloc[-1] != 1.0
@@ -0,0 +1,106 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+import cli
+from benchmarks.synthetic import synthetic_ohlcv
+from data.store import DataStore
+
+ROOT = Path(__file__).resolve().parents[1]
+
+SPEC = """
+[data]
+provider = "alpaca"
+timeframe = "D"
+start = "2022-01-01"
+
+[run]
+cash = 20000
+commission = 0.001
+risk_per_trade = 0.02
+
+[[jobs]]
+name = "pair"
+symbols = ["S000", "S001"]
+params = { ema_slow = 30 }
+grid = { ema_fast = [5, 10] }
+
+[[jobs]]
+name = "single"
+symbols = ["S002"]
+"""
+
+
+@pytest.fixture
+def store(tmp_path):
+    st = DataStore(tmp_path / "store")
+    df = synthetic_ohlcv(3, "D", 300, seed=4)
+    assert st.write(df.iloc[:600], "alpaca", "D") == 600
+    # overlapping append: only the new bars count, corrections replace old ones
+    assert st.write(df.iloc[300:], "alpaca", "D") == 300
+    return st
+
+
+def test_store_roundtrip(store):
+    df = store.read(["S000", "S001"], "alpaca", "D", start="2022-03-01", end="2022-03-31")
+    assert set(df["symbol"]) == {"S000", "S001"} and str(df.index.tz) == "America/New_York"
+    assert df.index.min() >= pd.Timestamp("2022-03-01", tz="UTC")
+    assert store.symbols("alpaca", "D") == ["S000", "S001", "S002"]
+    with pytest.raises(FileNotFoundError):
+        store.read(["NOPE"], "alpaca", "D")
+
+
+def test_store_read_end_bound(tmp_path):
+    st = DataStore(tmp_path)
+    st.write(synthetic_ohlcv(1, "1h", 72, seed=2), "alpaca", "1h")
+    daily = synthetic_ohlcv(1, "D", 30, seed=2)
+    st.write(daily.set_axis(daily.index.normalize()), "alpaca", "D")
+    hourly = st.read(["S000"], "alpaca", "1h", end="2022-01-03 12:00", tz="UTC")
+    assert hourly.index.max() == pd.Timestamp("2022-01-03 12:00", tz="UTC")
+    day = st.read(["S000"], "alpaca", "1h", start="2022-01-03", end="2022-01-03", tz="UTC")
+    assert len(day) > 0 and (day.index.normalize() == pd.Timestamp("2022-01-03", tz="UTC")).all()
+    # daily bars are stamped at midnight: the next day's bar is not part of end
+    daily = st.read(["S000"], "alpaca", "D", end="2022-01-05", tz="UTC")
+    assert daily.index.max() == pd.Timestamp("2022-01-05", tz="UTC")
+
+
+def test_store_symbols_with_separators(tmp_path):
+    st = DataStore(tmp_path)
+    df = synthetic_ohlcv(1, "D", 30, seed=1).assign(symbol="BTC/USD")
+    st.write(df, "alpaca", "D")
+    assert st.path("alpaca", "D", "BTC/USD").name == "BTC%2FUSD.parquet"
+    assert st.symbols("alpaca", "D") == ["BTC/USD"]
+    assert len(st.read(["BTC/USD"], "alpaca", "D")) == len(df)
+
+
+def test_backtest_spec_writes_parquet(store, tmp_path):
+    spec = tmp_path / "spec.toml"
+    spec.write_text(SPEC)
+    out = tmp_path / "out"
+    assert cli.main(["backtest", str(spec), "--out", str(out), "--workers", "1", "--store", str(store.root)]) == 0
+    metrics = pd.read_parquet(out / "metrics.parquet")
+    assert list(metrics["config"]) == ["pair-0", "pair-1", "single"]
+    assert list(metrics["param_ema_fast"]) == [5, 10, 12]
+    assert metrics["error"].isna().all() and "Sharpe" in metrics
+    equity = pd.read_parquet(out / "equity.parquet")
+    assert set(equity["config"]) == {"pair-0", "pair-1", "single"}
+    ledger = pd.read_parquet(out / "ledger.parquet")
+    assert {"config", "symbol", "entry_time", "entry_price", "exit_price", "size", "pnl"} <= set(ledger.columns)
+
+
+def test_pool_run_without_ui_imports(store, tmp_path):
+    spec = tmp_path / "spec.toml"
+    spec.write_text(SPEC)
+    code = (
+        "import sys, cli\n"
+        f"rc = cli.main(['backtest', {str(spec)!r}, '--out', {str(tmp_path / 'out')!r}, "
+        f"'--workers', '2', '--store', {str(store.root)!r}])\n"
+        "print(rc, 'streamlit' in sys.modules, 'plotly' in sys.modules)\n"
+    )
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, timeout=300)
+    assert out.stdout.strip().splitlines()[-1] == "0 False False", out.stderr
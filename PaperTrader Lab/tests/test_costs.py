@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+from backtest.costs import (BorrowFee, FlatCommission, PerShareCommission, SpreadCost,
+                            SqrtImpactCost, TieredCommission)
+from backtest.engine import run_backtest
+from backtest.vectorized import run_vectorized
+
+
+def test_commission_schedules():
+    tiered = TieredCommission(tiers=((0, 0.001), (10_000, 0.0005)))
+    fee = tiered.cost({}, 0, np.array([50, 300]), 100.0)
+    np.testing.assert_allclose(fee, [5.0, 10.0 + 10.0])
+    per_share = PerShareCommission(per_share=0.01, minimum=1.0, max_pct=0.001)
+    np.testing.assert_allclose(per_share.cost({}, 0, np.array([0, 10, 1000, 100_000]), 5.0),
+                               [0.0, 0.05, 5.0, 500.0])
+
+
+def test_sqrt_impact_uses_only_past_bars_per_symbol(ohlcv):
+    df = ohlcv(n=60, seed=3)
+    model = SqrtImpactCost(coef=0.5, window=10)
+    prep = model.prepare(df)
+    for sym, g in df.groupby("symbol"):
+        rows = np.flatnonzero(df["symbol"].to_numpy() == sym)
+        sigma = g["close"].pct_change().rolling(10).std().shift(1).fillna(0).to_numpy()
+        adv = g["volume"].rolling(10).mean().shift(1).to_numpy()
+        np.testing.assert_allclose(prep["sigma"][rows], sigma, atol=1e-12)
+        expected = np.where(np.isnan(adv), 0.0, 0.5 * sigma * np.sqrt(100 / np.nan_to_num(adv, nan=1)) * 100 * 50)
+        np.testing.assert_allclose(model.cost(prep, rows, 100, 50.0), expected)
+    # changing the current bar's volume does not change its cost
+    bumped = df.copy()
+    bumped.iloc[40, bumped.columns.get_loc("volume")] *= 100
+    assert model.prepare(bumped)["adv"][40] == prep["adv"][40]
+
+
+def test_spread_and_borrow(ohlcv):
+    df = ohlcv(n=10, symbols=("AAA",), seed=3).assign(spread=0.2)
+    half = SpreadCost(spread_bps=5).prepare(df)["half"]
+    np.testing.assert_allclose(half, 0.1 / df["close"].to_numpy())
+    fee = BorrowFee(annual_rate=0.252, periods_per_year=252)
+    prep = fee.prepare(df)
+    np.testing.assert_allclose(fee.holding_cost(prep, np.arange(2), np.array([-10, 10]), 100.0), [1.0, 0.0])
+
+
+def test_backtrader_cost_model_matches_flat_commission(ohlcv):
+    df = ohlcv(seed=3)
+    kwargs = dict(cash=100_000, slippage_bps=0, sizer_kwargs=dict(risk_per_trade=0.01, min_size=1),
+                  strategy_params=dict(ema_fast=5, ema_slow=20, stop_mode="percent", sl_pct=0.03, tp_pct=0.06))
+    flat = run_backtest(df, commission=0.001, **kwargs)
+    model = run_backtest(df, commission=0.0, costs=FlatCommission(0.001), **kwargs)
+    free = run_backtest(df, commission=0.0, **kwargs)
+    pd.testing.assert_series_equal(flat["equity"], model["equity"])
+    assert model["equity"].iloc[-1] < free["equity"].iloc[-1]
+
+
+def test_vectorized_engine(ohlcv):
+    df = ohlcv(n=50, symbols=("AAA",), seed=3)
+    close = df["close"]
+    res = run_vectorized(df.assign(position=1.0), cash=10_000)
+    np.testing.assert_allclose(res["equity"].to_numpy(), (close / close.iloc[0]).to_numpy())
+    costly = run_vectorized(df.assign(position=1.0), cash=10_000, costs=FlatCommission(0.01))
+    assert np.isclose(costly["costs"]["fills"], 100.0)
+    short = run_vectorized(df.assign(position=-1.0), cash=10_000, costs=BorrowFee(0.1))
+    assert short["costs"]["holding"] > 0 and short["per_symbol"][0]["trades"] == 1
@@ -47,3 +47,62 @@ def test_test_credentials(monkeypatch):
     ok, err = config.test_credentials("alpaca", "k", "s", "https://paper-api.alpaca.markets")
     assert ok and err == ""
 
+
+
+def test_lazy_cached_resolution(tmp_path, monkeypatch):
+    monkeypatch.setenv("APP_ROOT", str(tmp_path))
+    monkeypatch.delenv("APCA_API_KEY_ID", raising=False)
+    monkeypatch.delenv("APCA_API_SECRET_KEY", raising=False)
+    secure_store = importlib.reload(importlib.import_module("utils.secure_store"))
+    calls = []
+    monkeypatch.setattr(secure_store.keyring, "get_password", lambda s, u: calls.append(s))
+    config = importlib.reload(importlib.import_module("utils.config"))
+    assert calls == []  # nothing resolved at import
+
+    (tmp_path / ".env").write_text("APCA_API_KEY_ID=K1\nAPCA_API_SECRET_KEY=S1\n")
+    assert config.SETTINGS.alpaca_api_key == "K1"
+    assert calls == ["alpaca"]
+    loads = []
+    monkeypatch.setattr(secure_store, "load", lambda p: loads.append(p) or {"key": "X"})
+    assert config.load_credentials("alpaca")["key"] == "K1"
+    assert config.SETTINGS.alpaca_secret_key == "S1"
+    assert loads == []  # served from cache
+
+    monkeypatch.setenv("APCA_API_KEY_ID", "K2")
+    config.load_credentials("alpaca")
+    assert loads == ["alpaca"]  # env change invalidates
+    secure_store.invalidate()
+    config.load_credentials("alpaca")
+    assert loads == ["alpaca", "alpaca"]
+
+
+def test_env_setting_reads_env_then_dotenv(tmp_path, monkeypatch):
+    monkeypatch.setenv("APP_ROOT", str(tmp_path))
+    monkeypatch.delenv("DEFAULT_DATA_PROVIDER", raising=False)
+    monkeypatch.delenv("ENABLE_ALPACA", raising=False)
+    importlib.reload(importlib.import_module("utils.secure_store"))
+    config = importlib.reload(importlib.import_module("utils.config"))
+    assert config.env_setting("DEFAULT_DATA_PROVIDER", "alpaca") == "alpaca"
+    assert config.env_setting("ENABLE_ALPACA", True) is True
+    (tmp_path / ".env").write_text("DEFAULT_DATA_PROVIDER=alphavantage\nENABLE_ALPACA=false\n")
+    assert config.env_setting("DEFAULT_DATA_PROVIDER", "alpaca") == "alphavantage"
+    assert config.env_setting("ENABLE_ALPACA", True) is False
+    monkeypatch.setenv("ENABLE_ALPACA", "1")
+    assert config.env_setting("ENABLE_ALPACA", True) is True
+
+
+def test_plain_credentials_skip_keyring(tmp_path, monkeypatch):
+    monkeypatch.setenv("APP_ROOT", str(tmp_path))
+    monkeypatch.delenv("APCA_API_KEY_ID", raising=False)
+    monkeypatch.delenv("APCA_API_SECRET_KEY", raising=False)
+    secure_store = importlib.reload(importlib.import_module("utils.secure_store"))
+    calls = []
+    monkeypatch.setattr(secure_store.keyring, "get_password", lambda s, u: calls.append(s) or "{}")
+    assert not secure_store.has_plain_credentials("alpaca")
+    (tmp_path / ".streamlit").mkdir()
+    (tmp_path / ".streamlit" / "secrets.toml").write_text('APCA_API_KEY_ID = "K1"\nAPCA_API_SECRET_KEY = "S1"\n')
+    assert secure_store.has_plain_credentials("alpaca")
+    (tmp_path / ".streamlit" / "secrets.toml").unlink()
+    (tmp_path / ".env").write_text("APCA_API_KEY_ID=K1\nAPCA_API_SECRET_KEY=S1\n")
+    assert secure_store.has_plain_credentials("alpaca")
+    assert calls == []
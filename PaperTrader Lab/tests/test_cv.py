@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+
+from ml.cv import PurgedKFold, CombinatorialPurgedKFold, cross_validate_parallel
+from ml import evaluate_direction_model
+
+
+def _t1(n=100, horizon=3):
+    idx = pd.date_range("2024-01-01", periods=n, freq="h")
+    end = idx[np.minimum(np.arange(n) + horizon, n - 1)]
+    return pd.Series(end, index=idx)
+
+
+def test_purged_kfold_removes_overlap_and_embargo():
+    t1 = _t1()
+    cv = PurgedKFold(n_splits=5, t1=t1, embargo_pct=0.05)
+    X = np.zeros((100, 1))
+    assert cv.get_n_splits() == 5
+    for train, test in cv.split(X):
+        assert not np.intersect1d(train, test).size
+        a, b = test.min(), test.max() + 1
+        # no training label ends inside/after the start of the test block while starting before it ends
+        t0, t1v = t1.index[train], t1.values[train]
+        overlap = (t0 <= t1.values[a:b].max()) & (t1v >= t1.index[a])
+        assert not overlap.any()
+        # 3-bar label horizon purges the 3 bars before the test block
+        assert not np.isin(np.arange(max(a - 3, 0), a), train).any()
+        # embargo of 5 bars after the block
+        assert not np.isin(np.arange(b, min(b + 5, 100)), train).any()
+
+
+def test_cpcv_paths_cover_every_sample():
+    t1 = _t1(n=120, horizon=1)
+    cv = CombinatorialPurgedKFold(n_groups=6, n_test_groups=2, t1=t1)
+    assert cv.get_n_splits() == 15
+    assert cv.n_paths == 5
+    splits = list(cv.split(np.zeros((120, 1))))
+    preds = [test.astype(float) for _, test in splits]
+    paths = cv.backtest_paths(preds)
+    assert paths.shape == (120, 5)
+    # each path is a full out-of-sample pass over the sample
+    assert np.array_equal(paths, np.repeat(np.arange(120.0)[:, None], 5, axis=1))
+
+
+def test_cross_validate_parallel_matches_serial():
+    rng = np.random.default_rng(1)
+    X = rng.normal(size=(300, 3))
+    y = (X[:, 0] + 0.1 * rng.normal(size=300) > 0).astype(int)
+    t1 = _t1(n=300, horizon=2)
+    cv = CombinatorialPurgedKFold(n_groups=4, n_test_groups=2, t1=t1, embargo_pct=0.01)
+    serial = cross_validate_parallel(LogisticRegression(), X, y, cv, n_jobs=1)
+    par = cross_validate_parallel(LogisticRegression(), X, y, cv, n_jobs=2)
+    assert np.allclose(serial["scores"], par["scores"])
+    assert par["paths"].shape == (300, cv.n_paths)
+    assert (par["path_scores"] > 0.8).all()
+
+
+def test_evaluate_direction_model():
+    dates = pd.date_range("2024-01-01", periods=120, freq="D")
+    prices = 100 + np.linspace(0, 5, len(dates)) + np.sin(np.linspace(0, 12, len(dates)))
+    df = pd.DataFrame({"close": prices}, index=dates)
+    res = evaluate_direction_model(df, n_splits=4, n_jobs=1)
+    assert len(res["scores"]) == 4
+    assert ((res["scores"] >= 0) & (res["scores"] <= 1)).all()
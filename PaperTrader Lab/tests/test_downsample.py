@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.downsample import SeriesPyramid, downsample, drawdown, lttb_indices, minmax_indices
+
+
+def _walk(n=100_000, seed=0):
+    idx = pd.date_range("2024-01-02 09:30", periods=n, freq="min", tz="America/New_York")
+    return pd.Series(np.cumsum(np.random.default_rng(seed).standard_normal(n)), index=idx)
+
+
+def test_minmax_keeps_extremes_and_ends():
+    s = _walk()
+    s.iloc[12_345] = 1e6
+    out = downsample(s, 1000)
+    assert len(out) <= 1002
+    assert out.max() == 1e6 and out.min() == s.min()
+    assert out.index[0] == s.index[0] and out.index[-1] == s.index[-1]
+    assert out.index.is_monotonic_increasing
+
+
+def test_lttb_picks_one_point_per_bucket():
+    y = np.sin(np.linspace(0, 20, 10_000))
+    idx = lttb_indices(np.arange(len(y)), y, 500)
+    assert len(idx) == 500 and idx[0] == 0 and idx[-1] == len(y) - 1
+    assert np.all(np.diff(idx) > 0)
+    # peaks of the sine survive
+    assert y[idx].max() > 0.999 and y[idx].min() < -0.999
+
+
+def test_short_series_pass_through():
+    y = np.arange(10.0)
+    np.testing.assert_array_equal(minmax_indices(y, 100), np.arange(10))
+    np.testing.assert_array_equal(lttb_indices(y, y, 100), np.arange(10))
+
+
+def test_pyramid_view_is_bounded_and_zooms():
+    s = _walk(200_000)
+    pyr = SeriesPyramid(s, min_points=1000)
+    assert len(pyr.levels) > 2 and len(pyr.levels[-1]) <= 1000
+    full = pyr.view(n_out=1000)
+    assert len(full) <= 1002 and full.max() == s.max() and full.min() == s.min()
+    start, end = s.index[50_000], s.index[51_000]
+    zoom = pyr.view(start, end, n_out=2000)
+    pd.testing.assert_series_equal(zoom, s.loc[start:end])
+    with pytest.raises(ValueError):
+        SeriesPyramid(s, factor=2)
+
+
+def test_drawdown():
+    eq = pd.Series([1.0, 1.2, 0.9, 1.3])
+    np.testing.assert_allclose(drawdown(eq), [0, 0, -0.25, 0])
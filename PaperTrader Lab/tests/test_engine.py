@@ -0,0 +1,38 @@
+import backtrader as bt
+import numpy as np
+
+from backtest.engine import TradeReturns, df_to_btfeed
+
+
+class _ScaleInOut(bt.Strategy):
+    """Buy 10, add 10, sell 5, sell the last 15 (market orders)."""
+    plan = {5: 10, 10: 10, 15: -5, 20: -15}
+
+    def __init__(self):
+        self.fills = []
+
+    def next(self):
+        size = self.plan.get(len(self))
+        if size:
+            self.buy(size=size) if size > 0 else self.sell(size=-size)
+
+    def notify_order(self, order):
+        if order.status == order.Completed:
+            self.fills.append((order.executed.size, order.executed.price))
+
+
+def test_trade_ledger_with_scale_in_and_partial_exit(ohlcv):
+    df = ohlcv(n=40, symbols=("AAA",))
+    cerebro = bt.Cerebro(stdstats=False)
+    cerebro.adddata(df_to_btfeed(df), name="AAA")
+    cerebro.addstrategy(_ScaleInOut)
+    cerebro.addanalyzer(TradeReturns, _name="trade_returns")
+    strat = cerebro.run()[0]
+    (trade,) = strat.analyzers.trade_returns.get_analysis()
+    buys = [(s, p) for s, p in strat.fills if s > 0]
+    sells = [(-s, p) for s, p in strat.fills if s < 0]
+    vwap = lambda fills: sum(s * p for s, p in fills) / sum(s for s, _ in fills)
+    assert trade["size"] == 20
+    assert np.isclose(trade["entry_price"], vwap(buys))
+    assert np.isclose(trade["exit_price"], vwap(sells))
+    assert np.isclose(trade["pnl"], 20 * (vwap(sells) - vwap(buys)))
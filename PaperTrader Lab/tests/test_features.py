@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+from ml import train_direction_model, predict_direction
+from ml.features import FeatureStore, compute_features
+
+
+INTRADAY = dict(freq="15min", start="2024-01-02 09:30", tz="America/New_York", drift=0.0, vol=2e-3)
+
+
+def test_compute_features_per_symbol(ohlcv):
+    df = ohlcv(n=400, **INTRADAY)
+    feats = compute_features(df)
+    assert len(feats) == len(df)
+    one = compute_features(df[df["symbol"] == "BBB"])
+    pd.testing.assert_frame_equal(feats[(df["symbol"] == "BBB").to_numpy()], one)
+
+
+def test_store_incremental_matches_full(ohlcv, tmp_path):
+    df = ohlcv(n=800, **INTRADAY)
+    store = FeatureStore(tmp_path, namespace="test/15m")
+    cut = df.index.unique()[600]
+    first = store.get(df[df.index < cut])
+    assert store.stats["miss"] == 2 and len(first) == 1200
+    incr = store.get(df)
+    assert store.stats["append"] == 2
+    full = compute_features(df)
+    np.testing.assert_allclose(incr.to_numpy(), full.to_numpy(), rtol=1e-7, equal_nan=True)
+    store.get(df)
+    assert store.stats["hit"] == 2
+
+
+def test_store_detects_revised_data(ohlcv, tmp_path):
+    df = ohlcv(n=300, symbols=("AAA",), **INTRADAY)
+    store = FeatureStore(tmp_path)
+    store.get(df)
+    revised = df.copy()
+    revised.iloc[10, revised.columns.get_loc("close")] *= 1.05
+    store.get(revised)
+    assert store.stats["miss"] == 2
+
+
+def test_store_symbols_with_separators(ohlcv, tmp_path):
+    df = ohlcv(n=200, symbols=("BTC/USD", "ETH/USD"), **INTRADAY)
+    store = FeatureStore(tmp_path)
+    store.get(df)
+    store.get(df)
+    assert store.stats == {"hit": 2, "append": 0, "miss": 2}
+    assert sorted(p.name for p in store.dir.iterdir()) == ["BTC%2FUSD.pkl", "ETH%2FUSD.pkl"]
+
+
+def test_train_predict_with_store(ohlcv, tmp_path):
+    df = ohlcv(n=400, **INTRADAY)
+    store = FeatureStore(tmp_path)
+    model = train_direction_model(df, feature_store=store)
+    preds = predict_direction(model, df, feature_store=store)
+    assert set(preds.unique()) <= {0, 1}
+    assert "rsi_14" in model.feature_names_in_
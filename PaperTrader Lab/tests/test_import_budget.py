@@ -0,0 +1,91 @@
+import ast
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+APP = ROOT / "ui" / "app_streamlit.py"
+
+# loaded only by the tab or action that needs them
+HEAVY = ("backtrader", "backtest", "plotly", "alpaca", "paper", "data.loader", "ml", "sklearn",
+         "keyring", "httpx", "pydantic_settings", "tenacity")
+BUDGET_S = 0.5  # measured ~0.06 s once pandas/numpy are loaded
+
+
+def _is_heavy(name):
+    return any(name == h or name.startswith(h + ".") for h in HEAVY)
+
+
+def _top_level_imports():
+    names = []
+    for node in ast.parse(APP.read_text(encoding="utf-8")).body:
+        if isinstance(node, ast.Import):
+            names += [a.name for a in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0:
+            names.append(node.module)
+    return names
+
+
+def test_app_defers_heavy_imports():
+    names = _top_level_imports()
+    assert "utils.config" in names
+    assert [n for n in names if _is_heavy(n)] == []
+
+
+def test_app_import_budget():
+    # streamlit is not a test dependency: import what the app loads at the top instead
+    local = [n for n in _top_level_imports() if n.split(".")[0] in ("utils", "strategies", "data")]
+    code = f"""
+import json, sys, time
+import numpy, pandas
+t0 = time.perf_counter()
+for name in {local!r}:
+    __import__(name)
+print(json.dumps(dict(seconds=time.perf_counter() - t0, modules=sorted(sys.modules))))
+"""
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    res = json.loads(out.stdout.strip().splitlines()[-1])
+    assert [m for m in res["modules"] if _is_heavy(m)] == []
+    assert res["seconds"] < BUDGET_S, f"UI imports took {res['seconds']:.3f}s (budget {BUDGET_S}s)"
+
+
+def test_vectorized_engine_skips_backtrader():
+    code = ("import json, sys, backtest.vectorized, strategies; "
+            "strategies.get_strategy('breakout').signal_fn(); print(json.dumps(sorted(sys.modules)))")
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    modules = json.loads(out.stdout.strip().splitlines()[-1])
+    assert "backtest.costs" in modules and "strategies.breakout_kernel" in modules
+    assert [m for m in modules if m == "backtrader" or m.startswith("backtrader.")] == []
+
+
+def test_first_render_skips_heavy_modules():
+    # runs the whole script like a first page load: every tab body executes
+    pytest.importorskip("streamlit.testing.v1")
+    code = f"""
+import json, sys
+from streamlit.testing.v1 import AppTest
+before = set(sys.modules)
+at = AppTest.from_file({str(APP)!r}, default_timeout=60).run()
+print(json.dumps(dict(errors=[str(e.value) for e in at.exception], modules=sorted(set(sys.modules) - before))))
+"""
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    res = json.loads(out.stdout.strip().splitlines()[-1])
+    assert res["errors"] == []
+    assert [m for m in res["modules"] if _is_heavy(m)] == []
+
+
+def test_lazy_providers_and_keyring(monkeypatch):
+    from utils import secure_store
+    from utils.config import PROVIDERS
+
+    assert list(PROVIDERS) == ["alpaca", "oanda", "binance"]
+    assert PROVIDERS["oanda"] is PROVIDERS["oanda"]
+    assert PROVIDERS["oanda"].name == "oanda"
+    with pytest.raises(KeyError):
+        PROVIDERS["nope"]
+    monkeypatch.setattr(secure_store.keyring, "get_password", lambda s, u: None)
+    assert secure_store.keyring.get_password("alpaca", "default") is None
+    assert secure_store.keyring.loaded
@@ -0,0 +1,89 @@
+import threading
+import time
+
+import pytest
+
+from benchmarks.synthetic import synthetic_ohlcv
+from utils.jobs import JobCancelled, JobManager, backtest_task, sweep_task
+from utils.telemetry import METRICS
+
+RUN = dict(cash=10_000, commission=0.0, slippage_bps=0.0, sizer_kwargs={}, strategy_params={})
+
+
+def _frame(n_symbols=3):
+    return synthetic_ohlcv(n_symbols, "D", 120, seed=2).tz_convert("America/New_York")
+
+
+def _blocking(gate, progress=None):
+    progress("waiting", 0, 2)
+    gate.wait(5)
+    progress("step", 1, 2)
+    return "finished"
+
+
+def test_backtest_reports_per_symbol_progress_in_threads():
+    jm = JobManager(max_workers=2, processes=False)
+    try:
+        job = jm.submit(backtest_task, _frame(), RUN, kind="backtest", owner="tab-1")
+        res = job.result(timeout=60)
+        assert job.status == "done" and job.progress["fraction"] == 1.0
+        assert {r["symbol"] for r in res["per_symbol"]} == {"S000", "S001", "S002"}
+        assert jm._progress[job.id]["label"] == "S002"
+        assert jm._progress[job.id]["done"] == jm._progress[job.id]["total"] == 360
+        assert [j.id for j in jm.jobs(owner="tab-1")] == [job.id]
+    finally:
+        jm.shutdown()
+
+
+def test_cancel_running_and_queued_jobs():
+    jm = JobManager(max_workers=1, processes=False)
+    gate = threading.Event()
+    try:
+        running = jm.submit(_blocking, gate)
+        queued = jm.submit(_blocking, gate)
+        assert queued.status == "queued"
+        assert jm.cancel(queued.id) and queued.status == "cancelled"
+        jm.cancel(running.id)
+        gate.set()
+        with pytest.raises(JobCancelled):
+            running.result(timeout=5)
+        assert running.status == "cancelled" and running.error is None
+    finally:
+        jm.shutdown()
+
+
+def test_cancel_stops_shared_broker_backtest_mid_run():
+    jm = JobManager(max_workers=1, processes=False)
+    try:
+        df = synthetic_ohlcv(6, "D", 1500, seed=2).tz_convert("America/New_York")
+        job = jm.submit(backtest_task, df, dict(RUN, max_portfolio_risk=0.2))
+        deadline = time.time() + 30
+        while job.progress.get("done", 0) == 0 and time.time() < deadline:
+            time.sleep(0.005)
+        assert job.progress["label"] == "portfolio"
+        jm.cancel(job.id)
+        with pytest.raises(JobCancelled):
+            job.result(timeout=30)
+        assert jm._progress[job.id]["done"] < 1500
+    finally:
+        jm.shutdown()
+
+
+def test_sweep_in_worker_processes():
+    jm = JobManager(max_workers=2)
+    runs = METRICS.counter("backtests_total", "Backtests run by broker mode", ("mode",))
+    before = runs.value(mode="per_symbol")
+    try:
+        grid = [dict(ema_fast=f, ema_slow=30) for f in (5, 10)]
+        job = jm.submit(sweep_task, _frame(2), RUN, grid, kind="sweep")
+        out = job.result(timeout=120)
+        assert [o["params"]["ema_fast"] for o in out] == [5, 10]
+        assert all("Sharpe" in o["metrics"] for o in out)
+        assert job.progress["done"] == 2 and job.status == "done"
+        # the worker's counters reach this process's registry
+        deadline = time.time() + 5
+        while runs.value(mode="per_symbol") < before + 2 and time.time() < deadline:
+            time.sleep(0.01)
+        assert runs.value(mode="per_symbol") == before + 2
+    finally:
+        jm.shutdown()
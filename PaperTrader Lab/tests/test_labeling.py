@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+from ml.labeling import triple_barrier_labels, meta_labels
+
+
+INTRADAY = dict(freq="min", start="2024-01-02 09:30", tz="America/New_York", drift=0.0, vol=2e-3)
+
+
+def _naive(close, vol, pt, sl, h):
+    out = []
+    for i in range(len(close)):
+        if not np.isfinite(vol[i]) or vol[i] <= 0 or i == len(close) - 1:
+            continue
+        horizon = min(h, len(close) - 1 - i)
+        hit, code = horizon, 0
+        for k in range(1, horizon + 1):
+            r = close[i + k] / close[i] - 1
+            if r <= -sl * vol[i]:
+                hit, code = k, -1
+                break
+            if r >= pt * vol[i]:
+                hit, code = k, 1
+                break
+        out.append((i, hit, code))
+    return out
+
+
+def test_matches_naive_loop_per_symbol(ohlcv):
+    df = ohlcv(**INTRADAY)
+    lab = triple_barrier_labels(df, pt=1.5, sl=1.0, max_holding=15, vol_span=20)
+    for sym, sdf in df.groupby("symbol"):
+        close = sdf["close"].to_numpy()
+        ret = pd.Series(close).pct_change()
+        vol = ret.ewm(span=20).std().to_numpy()
+        expected = _naive(close, vol, 1.5, 1.0, 15)
+        got = lab[lab["symbol"] == sym]
+        assert len(got) == len(expected)
+        assert got["holding"].tolist() == [e[1] for e in expected]
+        assert got["barrier"].tolist() == [e[2] for e in expected]
+        # touch time never crosses into another symbol's rows
+        assert (got["t1"] <= sdf.index[-1]).all()
+
+
+def test_meta_labels_only_on_primary_events(ohlcv):
+    df = ohlcv(n=500, **INTRADAY)
+    lab = meta_labels(df, fast=5, slow=20, max_holding=10, vol_span=20)
+    assert len(lab) > 0
+    assert set(lab["side"].unique()) <= {-1, 1}
+    assert set(lab["label"].unique()) <= {0, 1}
+    assert ((lab["ret"] > 0).astype(int) == lab["label"]).all()
@@ -0,0 +1,85 @@
+import json
+import threading
+
+from utils.latency import HdrHistogram, LatencyRecorder
+
+
+def test_hdr_quantiles_within_precision():
+    h = HdrHistogram(precision=7)
+    for v in range(1, 100_001):
+        h.record(v * 1_000)
+    assert h.count == 100_000
+    for q in (0.5, 0.9, 0.99):
+        exact = q * 100_000 * 1_000
+        assert abs(h.quantile(q) - exact) / exact < 2 / 128
+    assert h.max == 100_000_000
+
+
+def test_hdr_fixed_memory_and_clamp():
+    h = HdrHistogram(precision=5, max_value=2**20)
+    size = len(h._counts)
+    h.record(2**30)
+    h.record(-5)
+    assert len(h._counts) == size
+    assert h.max == 2**20 and h.min == 0
+
+
+def test_pipeline_marks_and_export():
+    rec = LatencyRecorder()
+    rec.bar_received("AAPL", ts_ns=0)
+    rec.signal_ready("AAPL", ts_ns=2_000)
+    rec.order_submitted("AAPL", ts_ns=5_000)
+    rec.order_acked("AAPL", ts_ns=105_000)
+    summary = rec.summary()
+    assert summary["bar_to_signal"]["count"] == 1
+    assert summary["bar_to_signal"]["max_us"] == 2.0
+    assert summary["submit_to_ack"]["max_us"] == 100.0
+    assert summary["bar_to_ack"]["max_us"] == 105.0
+    assert "latency" in json.loads(rec.export_json())
+
+
+def test_marks_cleared_after_ack():
+    rec = LatencyRecorder()
+    rec.bar_received("AAPL", ts_ns=0)
+    rec.signal_ready("AAPL", ts_ns=1_000)
+    rec.order_submitted("AAPL", ts_ns=2_000)
+    rec.order_acked("AAPL", ts_ns=3_000)
+    # manual order much later: no stale signal/bar marks to measure from
+    rec.order_submitted("AAPL", ts_ns=10**12)
+    rec.order_acked("AAPL", ts_ns=10**12 + 4_000)
+    summary = rec.summary()
+    assert summary["signal_to_submit"]["count"] == 1
+    assert summary["bar_to_ack"]["count"] == 1
+    assert summary["submit_to_ack"]["count"] == 2
+    # a signal left over from an earlier bar is not timed against the new one
+    rec.bar_received("MSFT", ts_ns=0)
+    rec.signal_ready("MSFT", ts_ns=1_000)
+    rec.bar_received("MSFT", ts_ns=60_000)
+    rec.order_submitted("MSFT", ts_ns=61_000)
+    assert rec.summary()["signal_to_submit"]["count"] == 1
+
+
+def test_marks_from_several_threads():
+    rec = LatencyRecorder()
+
+    def pipeline(symbol):
+        for t in range(0, 2_000_000, 1_000):
+            rec.bar_received(symbol, ts_ns=t)
+            rec.signal_ready(symbol, ts_ns=t + 1)
+            rec.order_acked(symbol, ts_ns=t + 2)
+
+    threads = [threading.Thread(target=pipeline, args=(f"S{i}",)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert rec._marks == {}
+    assert rec.summary()["bar_to_ack"]["max_us"] == 0.002
+
+
+def test_disabled_recorder_is_noop():
+    rec = LatencyRecorder(enabled=False)
+    with rec.stage("x"):
+        pass
+    rec.bar_received("AAPL")
+    assert rec.summary() == {}
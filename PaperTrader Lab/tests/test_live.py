@@ -0,0 +1,162 @@
+import asyncio
+import json
+import time
+
+import numpy as np
+import pytest
+
+from data.live import AlpacaStream, LineStream, LiveIngestor, RingBuffer, parse_time, replay_server
+
+T0 = parse_time("2024-01-02T14:30:00Z")
+MIN = 60_000_000_000
+
+
+def _trade(sym, t_ns, p, s=100):
+    return {"T": "t", "S": sym, "p": p, "s": s, "t": t_ns}
+
+
+def test_parse_time_fast_path_matches_pandas():
+    import pandas as pd
+    for t in ["2024-01-02T14:30:05.123456789Z", "2024-01-02T14:30:05Z", "2024-01-02T14:30:05.5Z",
+              "2024-01-02T09:30:05.5-05:00"]:
+        assert parse_time(t) == pd.Timestamp(t).value
+
+
+def test_ring_buffer_views_wrap_without_copy():
+    buf = RingBuffer(4)
+    assert len(buf.last()) == 0 and buf.latest is None
+    for i in range(10):
+        buf.append(i, i, i + 1, i - 1, i + 0.5, 10 * i)
+    view = buf.last()
+    assert len(buf) == 4 and buf.count == 10
+    assert view["time"].tolist() == [6, 7, 8, 9]
+    assert view["close"].tolist() == [6.5, 7.5, 8.5, 9.5]
+    assert np.shares_memory(view, buf._data)
+    assert buf.last(2)["time"].tolist() == [8, 9]
+    assert buf.latest["time"] == 9
+    df = buf.frame(symbol="AAPL", tz="UTC")
+    assert list(df.columns) == ["open", "high", "low", "close", "volume", "symbol"]
+    assert df.index[-1].value == 9
+
+
+def test_trades_aggregate_into_bars():
+    ing = LiveIngestor(timeframe="1m", capacity=10)
+    closed = []
+    ing.on_bar(lambda sym, buf: closed.append((sym, buf.latest["close"])))
+    ing.handle([_trade("AAPL", T0 + 1, 10.0), _trade("AAPL", T0 + 2, 12.0, 50),
+                _trade("AAPL", T0 + 3, 9.0), _trade("MSFT", T0 + 5, 100.0)])
+    assert len(ing.bars("AAPL")) == 0
+    assert ing.current("AAPL")["high"] == 12.0
+    ing.handle([_trade("AAPL", T0 + MIN + 1, 11.0)])
+    bar = ing.bars("AAPL")[-1]
+    assert (bar["time"], bar["open"], bar["high"], bar["low"], bar["close"], bar["volume"]) == (T0, 10, 12, 9, 9, 250)
+    assert closed == [("AAPL", 9.0)]
+    # a trade for the closed minute is late, not a new bar
+    ing.handle([_trade("AAPL", T0 + 10, 50.0), {"T": "q", "S": "AAPL"}, {"T": "t", "S": "AAPL"}])
+    assert ing.stats["late"] == 1 and ing.stats["errors"] == 1 and len(ing.bars("AAPL")) == 1
+    # quiet symbols are closed by flush once the bucket and the grace period are over
+    assert ing.flush(T0 + 2 * MIN) == 1
+    assert ing.bars("MSFT")["close"].tolist() == [100.0]
+    assert ing.flush(T0 + 3 * MIN + 3_000_000_000) == 1
+    assert ing.bars("AAPL")["close"].tolist() == [9.0, 11.0]
+
+
+def test_provider_bars_merge_into_larger_timeframe():
+    ing = LiveIngestor(timeframe="5m")
+    msgs = [{"T": "b", "S": "SPY", "o": 1 + i, "h": 2 + i, "l": 0.5 + i, "c": 1.5 + i, "v": 10,
+             "t": T0 + i * MIN} for i in range(6)]
+    ing.handle(msgs)
+    bar = ing.bars("SPY")[-1]
+    assert (bar["open"], bar["high"], bar["low"], bar["close"], bar["volume"]) == (1, 6, 0.5, 5.5, 50)
+    with pytest.raises(ValueError):
+        LiveIngestor(timeframe="D")
+
+
+def test_replay_over_tcp():
+    batches = [[_trade(f"S{s:03d}", T0 + m * MIN + s, 100.0 + m) for s in range(20)] for m in range(5)]
+
+    async def main():
+        server = await replay_server(batches)
+        port = server.sockets[0].getsockname()[1]
+        ing = LiveIngestor(LineStream(port=port), capacity=3, flush_interval=0.001)
+        async with server:
+            await ing.run()
+        return ing
+
+    ing = asyncio.run(main())
+    assert ing.stats["messages"] == 100
+    assert ing.bars("S007")["close"].tolist() == [101.0, 102.0, 103.0]
+    assert ing.current("S007")["close"] == 104.0
+    assert ing.stats["late"] == 0 and ing.flush() == 0
+
+
+def test_flush_follows_stream_time_or_clock():
+    ing = LiveIngestor()
+    assert ing.flush() == 0
+    ing.handle([_trade("AAPL", T0 + 1, 10.0)])
+    # historical timestamps: the wall clock is years ahead, the stream is not
+    assert ing.flush() == 0 and ing.current("AAPL") is not None
+    ing.handle([_trade("MSFT", T0 + 2 * MIN + 3_000_000_000, 1.0)])
+    assert ing.flush() == 1 and ing.bars("AAPL")["close"].tolist() == [10.0]
+    now = [T0]
+    ing = LiveIngestor(clock=lambda: now[0])
+    ing.handle([_trade("AAPL", T0 + 1, 10.0)])
+    assert ing.flush() == 0
+    now[0] = T0 + 2 * MIN + 3_000_000_000
+    assert ing.flush() == 1
+
+
+def test_start_stop_in_thread():
+    async def endless():
+        while True:
+            await asyncio.sleep(0.01)
+            yield [_trade("AAPL", time.time_ns(), 1.0)]
+
+    ing = LiveIngestor(endless())
+    ing.start()
+    time.sleep(0.1)
+    ing.stop()
+    assert not ing._thread.is_alive()
+    assert ing.stats["trades"] > 0
+
+
+def test_per_message_cost():
+    symbols = [f"S{i:03d}" for i in range(500)]
+    ing = LiveIngestor(symbols=symbols, capacity=100)
+    batches = [[{"T": "t", "S": s, "p": 100.0 + m, "s": 1, "t": f"2024-01-02T14:{30 + m // 6:02d}:{m % 6 * 10:02d}.5Z"}
+                for s in symbols] for m in range(60)]
+    t0 = time.perf_counter()
+    for b in batches:
+        ing.handle(b)
+    per_msg = (time.perf_counter() - t0) / (len(batches) * len(symbols))
+    assert len(ing.bars("S499")) == 9
+    assert per_msg < 1e-4, f"{per_msg * 1e6:.1f} us per message"
+
+
+def test_alpaca_stream_reconnects_after_clean_close():
+    websockets = pytest.importorskip("websockets")
+    conns = []
+
+    async def handler(ws, *_):
+        conns.append(ws)
+        await ws.send('[{"T": "success", "msg": "connected"}]')
+        await ws.recv()
+        await ws.send('[{"T": "success", "msg": "authenticated"}]')
+        await ws.recv()
+        await ws.send(json.dumps([_trade("AAPL", T0 + len(conns), 1.0)]))
+        # returning closes the connection normally
+
+    async def main():
+        async with websockets.serve(handler, "127.0.0.1", 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            stream = AlpacaStream(["AAPL"], url=f"ws://127.0.0.1:{port}", key="k", secret="s", max_backoff=0.01)
+            batches = []
+            async for batch in stream:
+                batches.append(batch)
+                if len(batches) == 3:
+                    stream.stop()
+            return batches
+
+    batches = asyncio.run(asyncio.wait_for(main(), 10))
+    assert [b[0]["t"] for b in batches] == [T0 + 1, T0 + 2, T0 + 3]
+    assert len(conns) == 3
@@ -0,0 +1,99 @@
+import io
+import json
+import logging
+import threading
+
+import numpy as np
+
+from utils.logging_json import configure_logging, flush_logging, get_logger
+
+
+class _Stream(io.StringIO):
+    def write(self, s):
+        self.threads = getattr(self, "threads", set()) | {threading.get_ident()}
+        return super().write(s)
+
+
+def _lines(text):
+    return [json.loads(line) for line in text.splitlines() if line]
+
+
+def test_extras_kept_and_written_off_thread(tmp_path):
+    stream = _Stream()
+    path = tmp_path / "app.log"
+    configure_logging(stream=stream, file=str(path))
+    try:
+        log = get_logger("test_logging")
+        log.info("credentials_loaded", extra={"provider": "alpaca", "backend": "env", "n": np.int64(3)})
+        try:
+            1 / 0
+        except ZeroDivisionError:
+            log.exception("failed %s", "here")
+        flush_logging()
+    finally:
+        configure_logging()
+    first, second = _lines(stream.getvalue())
+    assert first["msg"] == "credentials_loaded"
+    assert (first["provider"], first["backend"], first["n"]) == ("alpaca", "env", 3)
+    assert second["msg"] == "failed here" and "ZeroDivisionError" in second["exc"]
+    assert threading.get_ident() not in stream.threads
+    assert _lines(path.read_text()) == [first, second]
+
+
+def test_sampling_keeps_one_in_n():
+    stream = io.StringIO()
+    configure_logging(stream=stream, sample={"bar_received": 10})
+    try:
+        log = get_logger("test_logging")
+        for i in range(25):
+            log.info("bar_received", extra={"i": i})
+        log.info("order_submitted")
+        flush_logging()
+    finally:
+        configure_logging()
+    lines = _lines(stream.getvalue())
+    assert [r.get("i") for r in lines] == [0, 10, 20, None]
+    assert lines[0]["sampled"] == 10
+
+
+def test_level_applies_to_existing_loggers_and_sampling_resets():
+    log = get_logger("test_logging_level")
+    stream = io.StringIO()
+    configure_logging(level=logging.DEBUG, stream=stream, sample={"tick": 3})
+    try:
+        log.debug("debug_visible")
+        log.info("tick")
+        log.info("tick")
+        configure_logging(level=logging.DEBUG, stream=stream, sample={"tick": 3})
+        log.info("tick")
+        flush_logging()
+    finally:
+        configure_logging()
+    assert [r["msg"] for r in _lines(stream.getvalue())] == ["debug_visible", "tick", "tick"]
+    assert not log.isEnabledFor(logging.DEBUG)
+
+
+def test_other_handlers_get_the_original_record():
+    seen = []
+
+    class Keep(logging.Handler):
+        def emit(self, record):
+            seen.append((record.msg, record.args, record.exc_info))
+
+    root = logging.getLogger()
+    keep = Keep()
+    root.addHandler(keep)
+    configure_logging(stream=io.StringIO())
+    try:
+        log = get_logger("test_logging_propagate")
+        try:
+            1 / 0
+        except ZeroDivisionError:
+            log.exception("failed %s", "here")
+        flush_logging()
+    finally:
+        root.removeHandler(keep)
+        configure_logging()
+    ((msg, args, exc_info),) = seen
+    assert (msg, args) == ("failed %s", ("here",))
+    assert exc_info is not None and exc_info[0] is ZeroDivisionError
@@ -1,5 +1,8 @@
 import pandas as pd
-from backtest.metrics import equity_to_metrics
+import numpy as np
+import pytest
+from backtest.metrics import (StreamingMetrics, drawdown_periods, equity_to_metrics, infer_periods_per_year,
+                              rolling_metrics, underwater)
 
 def test_equity_metrics_basic():
     idx = pd.date_range("2024-01-01", periods=10, freq="D")
@@ -11,3 +14,93 @@ def test_equity_metrics_basic():
     )
     m = equity_to_metrics(equity)
     assert "CAGR" in m and m["CAGR"] is not None
+
+
+def test_streaming_metrics_match_batch():
+    rng = np.random.default_rng(0)
+    idx = pd.bdate_range("2023-01-02", periods=500)
+    equity = pd.Series(100_000 * np.cumprod(1 + rng.normal(3e-4, 1e-2, len(idx))), index=idx)
+    for n in (2, 3, 50, 500):
+        sm = StreamingMetrics(rf_daily=1e-5)
+        sm.update_many(equity.iloc[:n])
+        batch = equity_to_metrics(equity.iloc[:n], rf_daily=1e-5)
+        live = sm.metrics()
+        assert batch.keys() == live.keys()
+        for k in batch:
+            assert np.isclose(batch[k], live[k], rtol=1e-9, equal_nan=True), k
+
+
+def test_daily_risk_free_rate_follows_bar_frequency():
+    days = pd.bdate_range("2024-01-01", periods=40)
+    idx = pd.DatetimeIndex([d + pd.Timedelta(hours=9, minutes=30) + pd.Timedelta(minutes=15 * i)
+                            for d in days for i in range(26)])
+    r = np.random.default_rng(1).normal(2e-5, 1e-3, len(idx))
+    equity = pd.Series(100_000 * np.cumprod(1 + r), index=idx)
+    rf_daily = 2e-4
+    rf_bar = (1 + rf_daily) ** (1 / 26) - 1  # 26 bars compound to one trading day
+    x = equity.pct_change().dropna() - rf_bar
+    m = equity_to_metrics(equity, rf_daily=rf_daily)
+    assert np.isclose(m["Sharpe"], x.mean() / x.std() * np.sqrt(252 * 26))
+    roll = rolling_metrics(equity, len(x), rf_daily=rf_daily)
+    assert np.isclose(roll["sharpe"].iloc[-1], m["Sharpe"])
+    sm = StreamingMetrics(rf_daily=rf_daily, periods_per_year=252 * 26)
+    sm.update_many(equity)
+    assert np.isclose(sm.metrics()["Sharpe"], m["Sharpe"])
+
+
+def test_periods_per_year_inferred_from_bars():
+    daily = pd.bdate_range("2024-01-01", periods=100)
+    assert infer_periods_per_year(daily) == 252
+    # session-filtered 15m bars: 09:30..15:45 -> 26 bars per day
+    days = pd.bdate_range("2024-01-01", periods=5, tz="America/New_York")
+    intraday = pd.DatetimeIndex([d + pd.Timedelta(hours=9, minutes=30) + pd.Timedelta(minutes=15 * i)
+                                 for d in days for i in range(26)])
+    assert infer_periods_per_year(intraday) == 252 * 26
+    eq = pd.Series(1 + 0.0001 * np.arange(len(intraday)) + 0.001 * np.sin(np.arange(len(intraday))),
+                   index=intraday)
+    m = equity_to_metrics(eq)
+    m_daily_ann = equity_to_metrics(eq, periods_per_year=252)
+    assert np.isclose(m["Sharpe"], m_daily_ann["Sharpe"] * np.sqrt(26))
+
+
+def test_periods_per_year_crypto_calendar():
+    hourly = pd.date_range("2024-01-01", periods=24 * 60, freq="h", tz="UTC")
+    assert infer_periods_per_year(hourly) == 365 * 24
+    assert infer_periods_per_year(pd.date_range("2024-01-01", periods=100, freq="D")) == 365
+    # a short window spanning a weekend (Fri..Mon)
+    assert infer_periods_per_year(hourly[24 * 4:24 * 8]) == 365 * 24
+    assert infer_periods_per_year(hourly[:24 * 4]) == 252 * 24  # Mon..Thu: cannot tell
+    # equity bars with a holiday stay on 252
+    days = pd.bdate_range("2024-06-03", periods=40).drop(pd.Timestamp("2024-06-19"))
+    assert infer_periods_per_year(days) == 252
+    assert infer_periods_per_year(hourly, calendar="equity") == 252 * 24
+    with pytest.raises(ValueError):
+        infer_periods_per_year(hourly, calendar="lunar")
+
+
+def test_rolling_metrics_match_pandas():
+    rng = np.random.default_rng(1)
+    idx = pd.date_range("2023-01-01", periods=300, freq="D")
+    eq = pd.Series(np.cumprod(1 + rng.normal(5e-4, 1e-2, len(idx))), index=idx)
+    roll = rolling_metrics(eq, window=30, periods_per_year=252)
+    ret = eq.pct_change()
+    exp_vol = ret.rolling(30).std() * np.sqrt(252)
+    np.testing.assert_allclose(roll["vol"].to_numpy()[30:], exp_vol.to_numpy()[30:], rtol=1e-8)
+    # last window equals the batch metrics over the same 31 points
+    tail = equity_to_metrics(eq.iloc[-31:], periods_per_year=252)
+    assert np.isclose(roll["sharpe"].iloc[-1], tail["Sharpe"])
+    assert np.isclose(roll["sortino"].iloc[-1], tail["Sortino"])
+
+
+def test_drawdown_periods():
+    idx = pd.date_range("2024-01-01", periods=9, freq="D")
+    eq = pd.Series([100, 110, 99, 88, 110, 120, 108, 114, 119.0], index=idx)
+    uw = underwater(eq)
+    assert uw.iloc[3] == 88 / 110 - 1 and uw.iloc[4] == 0
+    dp = drawdown_periods(eq)
+    assert len(dp) == 2
+    first, second = dp.iloc[0], dp.iloc[1]
+    assert first["start"] == idx[1] and first["trough"] == idx[3] and first["end"] == idx[4]
+    assert first["duration_bars"] == 3 and first["recovery_bars"] == 1
+    assert second["start"] == idx[5] and pd.isna(second["end"]) and second["recovery_bars"] == -1
+    assert np.isclose(second["depth"], 108 / 120 - 1)
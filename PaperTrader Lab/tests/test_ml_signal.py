@@ -0,0 +1,33 @@
+from backtest.engine import run_backtest
+from ml.cv import purged_train_test_split
+from ml.signals import ml_signal_frame
+from strategies.ml_signal import MLSignalStrategy
+
+
+def test_purged_split_leaves_gap(ohlcv):
+    df = ohlcv(n=100, vol=1e-2)
+    train, test = purged_train_test_split(df, test_size=0.3, horizon=2, embargo_pct=0.05)
+    times = df.index.unique()
+    assert test.index.min() == times[70]
+    assert train.index.max() == times[70 - 2 - 5 - 1]
+    assert set(train["symbol"]) == set(test["symbol"]) == {"AAA", "BBB"}
+
+
+def test_ml_signal_backtest_uses_precomputed_signals(ohlcv):
+    df = ohlcv(n=400, vol=1e-2)
+    test_df, model = ml_signal_frame(df, test_size=0.5)
+    assert "signal" in test_df and len(test_df) == len(df[df.index >= test_df.index.min()])
+    assert test_df["signal"].between(0, 1).all()
+
+    def boom(*a, **k):
+        raise AssertionError("model called during backtest")
+    model.predict = model.predict_proba = boom
+
+    res = run_backtest(
+        test_df, cash=100_000, commission=0.0005, slippage_bps=0,
+        sizer_kwargs=dict(risk_per_trade=0.01, min_size=1),
+        strategy_params=dict(threshold=0.0, stop_mode="percent", sl_pct=0.02, tp_pct=0.04),
+        strategy=MLSignalStrategy,
+    )
+    assert len(res["per_symbol"]) == 2
+    assert res["equity"].iloc[-1] != 1.0
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.exceptions import NotFittedError
+
+from ml import predict_direction, train_online_direction_model
+from ml.direction import _build_features
+from ml.online import OnlineDirectionModel, StreamingScaler
+
+
+def _prices(n=400):
+    dates = pd.date_range("2024-01-01", periods=n, freq="h")
+    prices = 100 + np.linspace(0, 5, n) + np.sin(np.linspace(0, 40, n))
+    return pd.DataFrame({"close": prices}, index=dates)
+
+
+def test_streaming_scaler_matches_numpy():
+    rng = np.random.default_rng(0)
+    X = rng.normal(3, 2, size=(500, 2))
+    a, b = StreamingScaler(2), StreamingScaler(2)
+    for row in X:
+        a.update(row)
+    b.update_batch(X[:123])
+    b.update_batch(X[123:])
+    for sc in (a, b):
+        np.testing.assert_allclose(sc.mean, X.mean(axis=0))
+        np.testing.assert_allclose(sc.scale, X.std(axis=0))
+
+
+def test_streaming_scores_match_batch_predictions():
+    df = _prices()
+    model = train_online_direction_model(df.iloc[:300])
+    batch = predict_direction(model, df)
+    # freeze learning so streaming and batch use the same coefficients/scaler
+    model.batch_size = 10**9
+    feats = _build_features(df)
+    streamed = {}
+    for ts, close in df["close"].items():
+        x = model._features("AAA", close)
+        if x is not None:
+            np.testing.assert_allclose(x, feats.loc[ts].to_numpy())
+            streamed[ts] = int(model.predict_proba_one(x) > 0.5)
+    assert pd.Series(streamed).equals(batch.loc[list(streamed)].astype(int).rename(None))
+
+
+def test_update_learns_online():
+    df = _prices(2000)
+    model = OnlineDirectionModel(batch_size=8)
+    hits = []
+    prev = None
+    for close in df["close"]:
+        if prev is not None and pred is not None:
+            hits.append(int(close > prev) == pred)
+        pred = model.update("AAA", close)
+        prev = close
+    assert model._w is not None
+    assert np.mean(hits[-500:]) > 0.6
+
+
+def test_unfitted_model_raises_clearly():
+    model = OnlineDirectionModel()
+    width = len(model.feature_names_in_)
+    assert model.predict_proba_one([0.0] * width) is None
+    with pytest.raises(NotFittedError):
+        model.predict_proba(np.zeros((3, width)))
+
+
+def test_fit_labels_next_close_per_symbol():
+    a, b = _prices(300), _prices(300) * 2
+    both = pd.concat([a.assign(symbol="AAA"), b.assign(symbol="BBB")]).sort_index(kind="stable")
+    seen = []
+    model = OnlineDirectionModel()
+    model._learn = lambda X, y: seen.append((X, y))
+    model.fit(both)
+    X = np.concatenate([x for x, _ in seen])
+    y = np.concatenate([y for _, y in seen])
+    # 5 warm-up bars and the unlabeled last bar dropped per symbol
+    assert len(y) == 2 * (300 - 6)
+    up = (a["close"].shift(-1) > a["close"]).to_numpy()[5:-1].astype(int)
+    np.testing.assert_array_equal(y[0::2], up)
+    np.testing.assert_array_equal(y[1::2], up)
+    np.testing.assert_allclose(X[0::2], X[1::2])
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest.portfolio import DEFAULT_LOOKBACK, aggregate_portfolio, align_equity, compute_weights, risk_contributions
+
+
+def _curves(n=250, k=4, seed=0):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range("2024-01-01", periods=n, freq="D")
+    vols = np.linspace(0.005, 0.03, k)
+    r = rng.normal(3e-4, vols, size=(n, k))
+    return pd.DataFrame(np.cumprod(1 + r, axis=0), index=idx, columns=[f"S{i}" for i in range(k)])
+
+
+def test_align_misaligned_curves():
+    a = pd.Series([1.0, 1.1, 1.2], index=pd.to_datetime(["2024-01-01", "2024-01-02", "2024-01-04"]))
+    b = pd.Series([1.0, 0.9], index=pd.to_datetime(["2024-01-03", "2024-01-04"]))
+    eq = align_equity({"a": a, "b": b})
+    assert list(eq.index.day) == [1, 2, 3, 4]
+    assert eq["a"].tolist() == [1.0, 1.1, 1.1, 1.2]
+    assert eq["b"].tolist() == [1.0, 1.0, 1.0, 0.9]
+
+
+def test_equal_buy_and_hold_is_average_of_curves():
+    eq = _curves()
+    res = aggregate_portfolio(eq, "equal", rebalance=False)
+    expected = (eq / eq.iloc[0]).mean(axis=1)
+    np.testing.assert_allclose(res["equity"].to_numpy(), expected.to_numpy())
+    assert (res["turnover"] == 0).all()
+
+
+def test_inverse_vol_and_risk_parity():
+    eq = _curves()
+    rets = eq.pct_change().fillna(0.0)
+    iv = compute_weights(rets, "inverse_vol", lookback=None)
+    assert iv.is_monotonic_decreasing and np.isclose(iv.sum(), 1)
+    rp = compute_weights(rets, "risk_parity", lookback=None)
+    rc = risk_contributions(rp.to_numpy(), np.cov(rets.to_numpy()[1:], rowvar=False))
+    np.testing.assert_allclose(rc, 0.25, atol=1e-6)
+    rolling = compute_weights(rets, "inverse_vol", lookback=20)
+    assert rolling.shape == rets.shape
+    np.testing.assert_allclose(rolling.sum(axis=1), 1.0)
+
+
+def test_rebalanced_portfolio_turnover_and_stats():
+    eq = _curves()
+    res = aggregate_portfolio(eq, "equal", rebalance=True)
+    r = eq.pct_change().fillna(0.0)
+    np.testing.assert_allclose(res["returns"].to_numpy(), r.mean(axis=1).to_numpy())
+    assert res["turnover"].iloc[2:].gt(0).all()
+    assert res["correlation"].shape == (4, 4)
+    assert np.isclose(res["risk_contribution"].sum(), 1)
+
+
+def test_estimated_weights_are_causal_by_default():
+    eq = _curves()
+    rets = eq.pct_change().fillna(0.0)
+    shocked = rets.copy()
+    shocked.iloc[150:, 0] *= 10
+    for scheme in ("inverse_vol", "risk_parity"):
+        w = compute_weights(rets, scheme)
+        assert w.shape == rets.shape
+        np.testing.assert_allclose(w.sum(axis=1), 1.0)
+        np.testing.assert_allclose(w.iloc[:DEFAULT_LOOKBACK + 1], 1 / 4)
+        # bar 150 is weighted before its own return is known
+        ws = compute_weights(shocked, scheme)
+        np.testing.assert_allclose(ws.iloc[:151], w.iloc[:151])
+        assert not np.allclose(ws.iloc[152:], w.iloc[152:])
+    rp = compute_weights(rets, "risk_parity")
+    window = rets.to_numpy()[200 - DEFAULT_LOOKBACK:200]
+    rc = risk_contributions(rp.iloc[200].to_numpy(), np.cov(window, rowvar=False))
+    np.testing.assert_allclose(rc, 0.25, atol=1e-6)
+
+
+def test_buy_and_hold_needs_static_weights():
+    eq = _curves()
+    with pytest.raises(ValueError, match="rebalance=True"):
+        aggregate_portfolio(eq, "inverse_vol", rebalance=False)
+    held = aggregate_portfolio(eq, "inverse_vol", rebalance=False, lookback=None)
+    w = compute_weights(eq.pct_change().fillna(0.0), "inverse_vol", lookback=None)
+    # starting weights drift with prices and are never traded back
+    np.testing.assert_allclose(held["equity"].to_numpy(), (eq / eq.iloc[0]).to_numpy() @ w.to_numpy())
+    assert held["turnover"].eq(0).all()
+    rebalanced = aggregate_portfolio(eq, "inverse_vol", rebalance=True, lookback=None)
+    assert rebalanced["turnover"].iloc[2:].gt(0).all()
+    assert not np.allclose(held["equity"].to_numpy(), rebalanced["equity"].to_numpy())
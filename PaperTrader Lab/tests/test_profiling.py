@@ -0,0 +1,64 @@
+import threading
+
+from benchmarks.synthetic import synthetic_ohlcv
+from backtest.engine import run_backtest
+from data.loader import _postprocess
+from utils.profiling import Profiler, PROFILER
+
+
+def test_disabled_spans_record_nothing():
+    prof = Profiler()
+    with prof.span("a"):
+        pass
+    assert prof.records() == []
+
+
+def test_nested_spans_and_breakdown():
+    prof = Profiler(enabled=True)
+    with prof.span("outer"):
+        for _ in range(3):
+            with prof.span("inner", step=1):
+                pass
+    phases = {p["path"]: p for p in prof.summary()}
+    assert set(phases) == {"outer", "outer/inner"}
+    assert phases["outer/inner"]["count"] == 3 and phases["outer/inner"]["depth"] == 1
+    assert phases["outer"]["share"] == 1.0
+    assert phases["outer/inner"]["total_ms"] <= phases["outer"]["total_ms"]
+
+
+def test_run_reports_backtest_phases_with_cprofile():
+    raw = synthetic_ohlcv(2, "1h", 30, seed=3)
+    PROFILER.reset()
+    with PROFILER.run("backtest", capture="cprofile") as report:
+        df = _postprocess(raw, "America/New_York", session_filter_on=True)
+        run_backtest(df, cash=10_000, commission=0.0, slippage_bps=0.0,
+                     sizer_kwargs={}, strategy_params={})
+    assert not PROFILER.enabled
+    paths = {p["path"]: p for p in report["phases"]}
+    assert {"backtest/tz_convert", "backtest/session_filter", "backtest/run_backtest/prepare",
+            "backtest/run_backtest/cerebro_run", "backtest/run_backtest/aggregate"} <= set(paths)
+    assert paths["backtest/run_backtest/cerebro_run"]["count"] == 2
+    assert "cumulative" in report["profile"]
+    assert PROFILER.runs[-1] is report
+
+
+def test_run_ignores_other_threads():
+    prof = Profiler()
+    inside, done = threading.Event(), threading.Event()
+
+    def other_session():
+        inside.wait(5)
+        with prof.span("other_load"):
+            pass
+        done.set()
+
+    t = threading.Thread(target=other_session)
+    t.start()
+    with prof.run("mine") as report:
+        inside.set()
+        done.wait(5)
+        with prof.span("step"):
+            pass
+    t.join()
+    assert [p["path"] for p in report["phases"]] == ["mine", "mine/step"]
+    assert not prof.enabled and prof.records()[-1]["name"] == "mine"
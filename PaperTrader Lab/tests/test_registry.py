@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+from ml import train_direction_model, predict_direction
+from ml.registry import ModelRegistry, build_metadata, clear_model_cache
+from utils.telemetry import METRICS
+
+
+def _df(n=80):
+    dates = pd.date_range("2024-01-01", periods=n, freq="D")
+    prices = 100 + np.linspace(0, 5, n) + np.sin(np.linspace(0, 6, n))
+    return pd.DataFrame({"close": prices}, index=dates)
+
+
+def test_save_load_roundtrip_and_metadata(tmp_path):
+    df = _df()
+    reg = ModelRegistry(tmp_path)
+    model = train_direction_model(df)
+    v1 = reg.save(model, "AAPL", "D", build_metadata(df, model, cv_scores=[0.5, 0.6]))
+    v2 = reg.save(model, "AAPL", "D")
+    assert (v1, v2) == ("v1", "v2")
+    assert reg.versions("AAPL", "D") == ["v1", "v2"]
+    meta = reg.metadata("AAPL", "D", "v1")
+    assert meta["feature_set"] == ["return_1", "return_5"]
+    assert meta["cv_scores"] == [0.5, 0.6]
+    assert meta["n_rows"] == len(df)
+    loaded = reg.load("AAPL", "D", "v1")
+    pd.testing.assert_series_equal(predict_direction(loaded, df), predict_direction(model, df))
+
+
+def test_symbols_with_separators_stay_in_root(tmp_path):
+    df = _df()
+    reg = ModelRegistry(tmp_path / "models")
+    model = train_direction_model(df)
+    assert reg.save(model, "BTC/USD", "1h") == "v1"
+    assert reg.versions("BTC/USD", "1h") == ["v1"]
+    assert reg.metadata("BTC/USD", "1h")["symbol"] == "BTC/USD"
+    loaded = reg.load("BTC/USD", "1h", writable=True)
+    pd.testing.assert_series_equal(predict_direction(loaded, df), predict_direction(model, df))
+    assert [p.name for p in (tmp_path / "models").iterdir()] == ["BTC%2FUSD"]
+    reg.save(model, "..", "D")
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["models"]
+
+
+def test_load_is_cached_per_process(tmp_path):
+    clear_model_cache()
+    reg = ModelRegistry(tmp_path)
+    reg.save(train_direction_model(_df()), "AAPL", "D")
+    cache = METRICS.counter("cache_requests_total", "Cache lookups by cache and result", ("cache", "result"))
+    hits, misses = cache.value(cache="model", result="hit"), cache.value(cache="model", result="miss")
+    assert reg.load("AAPL", "D") is reg.load("AAPL", "D")
+    assert cache.value(cache="model", result="miss") == misses + 1
+    assert cache.value(cache="model", result="hit") == hits + 1
+
+
+def test_get_or_train_trains_once(tmp_path):
+    reg = ModelRegistry(tmp_path)
+    calls = []
+
+    def train(df):
+        calls.append(1)
+        return train_direction_model(df)
+
+    a = reg.get_or_train("MSFT", "15m", _df(), train)
+    b = reg.get_or_train("MSFT", "15m", _df(), train)
+    assert len(calls) == 1 and a is b
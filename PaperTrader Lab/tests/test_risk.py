@@ -0,0 +1,71 @@
+import numpy as np
+
+from backtest.costs import SpreadCost
+from backtest.engine import run_backtest
+from backtest.risk import RiskEngine
+
+
+def test_size_from_stop_distance():
+    eng = RiskEngine(["AAA"], risk_per_trade=0.01, max_portfolio_risk=1.0, max_leverage=10)
+    # 1% of 100k = 1000 at risk, 2 per share to the stop -> 500 shares
+    assert eng.size("AAA", 100_000, 100.0, 98.0) == 500
+    # without a stop the whole price is at risk
+    assert eng.size("AAA", 100_000, 100.0) == 10
+
+
+def test_portfolio_risk_and_leverage_caps():
+    eng = RiskEngine(["A", "B", "C"], risk_per_trade=0.02, max_portfolio_risk=0.03, max_leverage=1.0)
+    a = eng.size("A", 100_000, 100.0, 95.0)
+    assert a == 400
+    eng.open("A", a, 100.0, 95.0)
+    # only 1% of risk budget left
+    assert eng.size("B", 100_000, 50.0, 45.0) == 200
+    eng.open("B", 200, 50.0, 45.0)
+    assert eng.size("C", 100_000, 10.0, 9.0) == 0
+    assert eng.rejected == 1
+    eng.close("A")
+    # leverage cap: 90k of exposure left, risk would allow 2000 shares
+    eng.max_portfolio_risk = 1.0
+    assert eng.size("C", 100_000, 100.0, 99.0) == 900
+    snap = eng.snapshot(100_000)
+    assert snap["positions"] == 1 and np.isclose(snap["open_risk"], 1000)
+
+
+def test_mark_reduces_open_risk():
+    eng = RiskEngine(risk_per_trade=0.01)
+    eng.open("X", 100, 100.0, 90.0)
+    eng.mark_many({"X": 95.0, "unknown": 1.0})
+    assert eng.total_risk() == 500
+    eng.mark("X", 85.0)  # through the stop: nothing more at risk
+    assert eng.total_risk() == 0 and eng.gross_exposure() == 8500
+
+
+def test_shared_broker_respects_portfolio_risk(ohlcv):
+    df = ohlcv(symbols=("AAA", "BBB", "CCC"), seed=1)
+    kwargs = dict(cash=100_000, commission=0.0, slippage_bps=0,
+                  sizer_kwargs=dict(risk_per_trade=0.02, min_size=1),
+                  strategy_params=dict(ema_fast=5, ema_slow=20, stop_mode="percent", sl_pct=0.05, tp_pct=0.1))
+    res = run_backtest(df, max_portfolio_risk=0.03, leverage=2.0, **kwargs)
+    assert {r["symbol"] for r in res["per_symbol"]} == {"AAA", "BBB", "CCC"}
+    assert sum(r["trades"] for r in res["per_symbol"]) > 0
+    assert res["risk"]["open_risk_pct"] <= 0.03 + 1e-9
+    assert res["risk"]["rejected"] > 0
+    assert res["equity"].index.is_monotonic_increasing
+
+
+def test_shared_and_per_symbol_results_have_one_schema(ohlcv):
+    df = ohlcv(symbols=("AAA", "BBB", "CCC"), seed=1)
+    kwargs = dict(cash=100_000, commission=0.0005, slippage_bps=2, sizer_kwargs={}, strategy_params={},
+                  costs=SpreadCost(5))
+    shared = run_backtest(df, max_portfolio_risk=0.05, **kwargs)
+    split = run_backtest(df, **kwargs)
+    assert shared.keys() == split.keys()
+    assert split["risk"] is None and shared["risk"] is not None
+    for res in (shared, split):
+        assert [sorted(r) for r in res["per_symbol"]] == [["maxdd", "pnl", "sharpe", "symbol", "trades"]] * 3
+        assert list(res["portfolio"]["weights"].index) == ["AAA", "BBB", "CCC"]
+    # equal buy-and-hold of the sleeves is the shared broker's own equity
+    eq = shared["portfolio"]["equity"].reindex(shared["equity"].index)
+    np.testing.assert_allclose(eq.to_numpy(), shared["equity"].to_numpy(), rtol=1e-9)
+    pnl = sum(r["pnl"] for r in shared["per_symbol"])
+    assert np.isclose(pnl, shared["trades"]["pnl"].sum())
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest.engine import run_backtest
+from backtest.robustness import _block_paths, bootstrap_metrics
+
+
+def _returns(n=500, seed=0):
+    idx = pd.date_range("2022-01-03", periods=n, freq="B")
+    return pd.Series(np.random.default_rng(seed).normal(4e-4, 1e-2, n), index=idx)
+
+
+def test_block_scan_matches_materialized_paths():
+    r = _returns(n=103).to_numpy()
+    log_r = np.log1p(r)
+    block, n_paths = 10, 50
+    stats = _block_paths(log_r, r, n_paths, block, np.random.default_rng(5))
+
+    starts = np.random.default_rng(5).integers(0, len(r), size=(n_paths, 11))
+    offsets = np.arange(block)
+    idx = ((starts[:, :, None] + offsets) % len(r)).reshape(n_paths, -1)[:, :len(r)]
+    level = np.cumsum(log_r[idx], axis=1)
+    peak = np.maximum.accumulate(np.maximum(level, 0), axis=1)
+    np.testing.assert_allclose(stats["total"], level[:, -1])
+    np.testing.assert_allclose(stats["dd"], (peak - level).max(axis=1))
+    np.testing.assert_allclose(stats["low"], np.minimum(level.min(axis=1), 0))
+    np.testing.assert_allclose(stats["s2"], (r[idx] ** 2).sum(axis=1))
+
+
+def test_intervals_cover_observed_and_shuffle_keeps_sums():
+    r = _returns()
+    res = bootstrap_metrics(r, n_paths=2000, seed=1)
+    q = res["quantiles"]
+    assert list(q.index) == ["CAGR", "Sharpe", "MaxDrawdown"]
+    for metric in q.index:
+        assert q.loc[metric, 0.05] <= res["observed"][metric] <= q.loc[metric, 0.95]
+    assert (res["samples"]["MaxDrawdown"] <= 0).all()
+    assert 0.0 <= res["prob_ruin"] <= 1.0
+
+    sh = bootstrap_metrics(r, n_paths=500, method="shuffle", seed=1)
+    assert np.allclose(sh["samples"]["CAGR"], sh["observed"]["CAGR"])
+    assert sh["samples"]["MaxDrawdown"].std() > 0
+    with pytest.raises(ValueError):
+        bootstrap_metrics(r, method="jackknife")
+
+
+def test_intraday_annualization_matches_metrics():
+    days = pd.bdate_range("2024-01-02", periods=60)
+    idx = pd.DatetimeIndex([d + pd.Timedelta(hours=9, minutes=30) + k * pd.Timedelta(minutes=15)
+                            for d in days for k in range(26)])
+    r = pd.Series(np.random.default_rng(3).normal(1e-4, 2e-3, len(idx)), index=idx)
+    inferred = bootstrap_metrics(r, n_paths=10, seed=0)["observed"]
+    explicit = bootstrap_metrics(r, n_paths=10, seed=0, periods_per_year=252 * 26)["observed"]
+    assert inferred == pytest.approx(explicit)
+
+
+def test_ruin_probability():
+    bad = pd.Series(np.full(300, -0.01))
+    assert bootstrap_metrics(bad, n_paths=100, seed=0)["prob_ruin"] == 1.0
+    good = pd.Series(np.full(300, 0.001))
+    assert bootstrap_metrics(good, n_paths=100, seed=0)["prob_ruin"] == 0.0
+
+
+def test_backtest_exposes_trade_returns():
+    rng = np.random.default_rng(2)
+    idx = pd.date_range("2023-01-02", periods=300, freq="D")
+    close = 100 * np.exp(np.cumsum(rng.normal(5e-4, 1.5e-2, 300)))
+    df = pd.DataFrame({"open": close, "high": close * 1.01, "low": close * 0.99, "close": close,
+                       "volume": 1_000.0, "symbol": "AAA"}, index=idx)
+    res = run_backtest(df, cash=100_000, commission=0.0, slippage_bps=0,
+                       sizer_kwargs=dict(risk_per_trade=0.01),
+                       strategy_params=dict(ema_fast=5, ema_slow=20, stop_mode="percent", sl_pct=0.03, tp_pct=0.06))
+    trades = res["trades"]
+    assert len(trades) > 0 and list(trades.columns)[:4] == ["symbol", "datetime", "pnl", "ret"]
+    out = bootstrap_metrics(trades.set_index("datetime")["ret"], n_paths=200, method="shuffle", seed=0)
+    assert out["samples"].shape == (200, 3)
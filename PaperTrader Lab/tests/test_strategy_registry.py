@@ -0,0 +1,53 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from backtest.engine import run_backtest
+from backtest.vectorized import run_vectorized
+from strategies import STRATEGIES, get_strategy
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_registry_import_is_lazy():
+    code = "import sys, strategies; print('backtrader' in sys.modules, 'strategies.breakout' in sys.modules)"
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert out.stdout.split() == ["False", "False"]
+
+
+def test_schema_validation_grid_and_warmup():
+    spec = get_strategy("ema_atr")
+    assert spec.validate({"ema_fast": "8"})["ema_fast"] == 8
+    with pytest.raises(ValueError):
+        spec.validate({"ema_fast": 1})
+    with pytest.raises(ValueError):
+        spec.validate({"stop_mode": "trailing"})
+    with pytest.raises(ValueError):
+        spec.validate({"nope": 1})
+    with pytest.raises(ValueError):
+        get_strategy("missing")
+    grid = spec.grid({"stop_mode": "percent"}, ema_fast=[5, 10], ema_slow=[20, 30, 40])
+    assert len(grid) == 6 and all(g["stop_mode"] == "percent" for g in grid)
+    assert spec.warmup_bars({"ema_slow": 50}) == 51
+    assert STRATEGIES["breakout"].warmup_bars() == 101
+    assert spec.load().__name__ == "EmaAtrStrategy"
+
+
+def test_run_by_name_on_both_engines(ohlcv):
+    df = ohlcv(seed=11)
+    spec = get_strategy("breakout")
+    framed, params = spec.prepare(df, {"channel": 15, "sl_pct": 0.2, "stop_mode": "percent"})
+    assert "signal" in framed and "channel" not in params and params["sl_pct"] == 0.2
+    filtered, _ = spec.prepare(df, {"channel": 15, "vol_min": 1.0})
+    assert 0 < filtered["signal"].sum() < framed["signal"].sum()
+    common = dict(cash=100_000, commission=0.0, slippage_bps=0, sizer_kwargs=dict(risk_per_trade=0.01))
+    res = run_backtest(df, strategy="breakout", strategy_params={"channel": 15}, **common)
+    assert len(res["per_symbol"]) == 2
+    vec = run_vectorized(df, strategy="breakout", strategy_params={"channel": 15})
+    assert sum(r["trades"] for r in vec["per_symbol"]) > 0
+    with pytest.raises(ValueError):
+        run_vectorized(df, strategy="ema_atr")
+    with pytest.raises(ValueError):
+        run_backtest(df, strategy="ml_signal", strategy_params={}, **common)
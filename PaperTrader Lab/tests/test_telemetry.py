@@ -0,0 +1,85 @@
+import json
+import threading
+import urllib.request
+
+import pytest
+
+from utils.telemetry import MetricsRegistry, serve
+
+
+def test_counters_are_exact_across_threads():
+    reg = MetricsRegistry()
+    c = reg.counter("jobs_total", "jobs", ("kind",))
+
+    def work():
+        for _ in range(10_000):
+            c.inc(kind="a")
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert c.value(kind="a") == 80_000
+    assert reg.counter("jobs_total", "jobs", ("kind",)) is c
+    with pytest.raises(ValueError):
+        c.inc(other="x")
+    with pytest.raises(ValueError):
+        reg.gauge("jobs_total")
+
+
+def test_histogram_buckets_and_prometheus_text():
+    reg = MetricsRegistry()
+    h = reg.histogram("req_seconds", "latency", ("provider",), buckets=(0.1, 1.0))
+    for v in (0.05, 0.1, 0.5, 3.0):
+        h.observe(v, provider="alpaca")
+    s = h.summary(provider="alpaca")
+    assert s["buckets"] == {"0.1": 2, "1.0": 3, "+Inf": 4}
+    assert s["count"] == 4 and s["sum"] == pytest.approx(3.65)
+    errors = reg.counter("errors_total", "errors", ("component",))
+    with pytest.raises(RuntimeError):
+        with errors.count_exceptions(component="loader"):
+            raise RuntimeError
+    text = reg.prometheus_text()
+    assert 'req_seconds_bucket{provider="alpaca",le="+Inf"} 4' in text
+    assert 'req_seconds_count{provider="alpaca"} 4' in text
+    assert 'errors_total{component="loader"} 1' in text
+    assert "# TYPE req_seconds histogram" in text
+
+
+def test_http_endpoint_serves_text_and_json():
+    reg = MetricsRegistry()
+    reg.counter("backtests_total", "runs", ("mode",)).inc(mode="shared")
+    server = serve(0, registry=reg)
+    try:
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        text = urllib.request.urlopen(base + "/metrics", timeout=5).read().decode()
+        snap = json.loads(urllib.request.urlopen(base + "/metrics.json", timeout=5).read())
+    finally:
+        server.shutdown()
+    assert 'backtests_total{mode="shared"} 1' in text
+    assert snap["backtests_total"]["values"] == {"shared": 1.0}
+
+
+def test_delta_merges_into_another_registry():
+    worker, parent = MetricsRegistry(), MetricsRegistry()
+    c = worker.counter("runs_total", "runs", ("mode",))
+    h = worker.histogram("run_seconds", "time", buckets=(1.0, 10.0))
+    g = worker.gauge("open_jobs")
+    c.inc(mode="a")
+    before = worker.state()
+    c.inc(2, mode="a")
+    c.inc(mode="b")
+    h.observe(0.5)
+    h.observe(20.0)
+    g.set(3)
+    delta = worker.delta(before)
+    assert worker.delta(worker.state()) == []
+    parent.counter("runs_total", "runs", ("mode",)).inc(mode="a")
+    parent.merge(delta)
+    parent.merge(delta)
+    assert parent.counter("runs_total", "runs", ("mode",)).value(mode="a") == 5
+    assert parent.counter("runs_total", "runs", ("mode",)).value(mode="b") == 2
+    s = parent.histogram("run_seconds", buckets=(1.0, 10.0)).summary()
+    assert s["count"] == 4 and s["sum"] == 41.0 and s["buckets"]["1.0"] == 2
+    assert parent.gauge("open_jobs").value() == 3
@@ -1,5 +1,5 @@
 # --- add project root to sys.path ---
-import os, sys
+import os, sys, uuid
 ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
@@ -8,9 +8,8 @@ if ROOT not in sys.path:
 
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 from utils.config import (
-    SETTINGS,
+    env_setting,
     load_credentials,
     save_credentials,
     test_credentials,
@@ -19,32 +18,54 @@ from utils.config import (
     clear_credentials,
     PROVIDERS,
 )
-from utils.logging_json import get_logger
+from utils.logging_json import dump_json, get_logger
+from utils.latency import LATENCY
+from utils.profiling import PROFILER
+from utils.telemetry import METRICS, serve as serve_metrics
 from utils import secure_store
-from data.loader import load_ohlcv
-from backtest.engine import run_backtest
-from paper.router import connect_info
-from paper import alpaca
+from utils.jobs import JobManager, backtest_task
+from utils.downsample import SeriesPyramid, drawdown
+from utils.lazy import lazy_import
+from strategies import STRATEGIES
+
+# Heavy or tab-specific modules are imported on first use, so the first
+# render does not wait for backtrader, plotly or the broker SDK.
+px = lazy_import("plotly.express")
 
 log = get_logger("ui")
 
 st.set_page_config(page_title="PaperTrader Lab — (Simulazione, non consulenza)", layout="wide")
 
-# Bootstrap credenziali per provider predefinito (alpaca)
-creds_boot = load_credentials("alpaca")
-if not creds_boot.get("key"):
-    st.session_state.setdefault("show_wizard", True)
-else:
-    st.session_state.setdefault("show_wizard", False)
+# first run: open the wizard when no Alpaca key is in env/secrets/.env; the
+# keyring is read only when the Settings tab asks for credentials
+if "show_wizard" not in st.session_state:
+    st.session_state["show_wizard"] = not secure_store.has_plain_credentials("alpaca")
 
 # Disclaimer banner
 st.info("**Solo simulazione / paper trading. Questa applicazione non costituisce consulenza finanziaria.** "
         "Usa esclusivamente ambienti demo/paper e rispetta i ToS dei provider.", icon="⚠️")
 
+def param_controls(spec, key_prefix=""):
+    """Sidebar widgets generated from the strategy param schema."""
+    values = {}
+    for p in spec.params:
+        label, key = p.label or p.name, f"{key_prefix}{spec.name}_{p.name}"
+        if p.kind == "choice":
+            values[p.name] = st.selectbox(label, list(p.choices), index=list(p.choices).index(p.default), key=key)
+        elif p.kind == "bool":
+            values[p.name] = st.checkbox(label, p.default, key=key)
+        elif p.kind == "int":
+            values[p.name] = int(st.number_input(label, int(p.min), int(p.max), int(p.default), key=key))
+        else:
+            shown = st.number_input(label, p.min * p.scale, p.max * p.scale, p.default * p.scale,
+                                    (p.step or 0.1) * p.scale, key=key)
+            values[p.name] = shown / p.scale
+    return values
+
 # ---- Sidebar Controls ----
 with st.sidebar:
     st.header("Mercato & Dati")
-    provider = st.selectbox("Data Source", ["alpaca","alphavantage"], index=["alpaca","alphavantage"].index(SETTINGS.default_data_provider))
+    provider = st.selectbox("Data Source", ["alpaca","alphavantage"], index=["alpaca","alphavantage"].index(env_setting("DEFAULT_DATA_PROVIDER", "alpaca")))
     symbols = st.multiselect("Strumenti", ["AAPL","TSLA","MSFT","NVDA","AMZN"], default=["AAPL","TSLA"])
     timeframe = st.selectbox("Timeframe", ["1m","5m","15m","1h","D"], index=2)
     start_date = st.date_input("Start", pd.to_datetime("2024-01-01"))
@@ -63,58 +84,172 @@ with st.sidebar:
     risk_per_trade = st.slider("Rischio per trade (% equity)", 0.1, 5.0, 1.0, 0.1) / 100.0
     max_portfolio_risk = st.slider("Rischio portafoglio max (%)", 1.0, 50.0, 20.0, 1.0)
     leverage = st.slider("Leverage (x)", 1.0, 5.0, 1.0, 0.5)
+    weighting = st.selectbox("Pesi per simbolo", ["equal", "inverse_vol", "risk_parity"])
+    # pesi stimati su finestra mobile: servono ribilanciamenti a ogni barra
+    rebalance = st.checkbox("Ribilancia ogni barra", weighting != "equal", disabled=weighting != "equal") or weighting != "equal"
     commission_bps = st.slider("Commissioni (bps sul valore)", 0, 50, 5, 1)
     slippage_bps = st.slider("Slippage simulato (bps)", 0, 50, 5, 1)
 
     st.divider()
     st.header("Strategia")
-    strategy_name = st.selectbox("Strategia", ["EMA crossover + ATR stop", "Breakout + filtro vol (soon)"], index=0)
-    ema_fast = st.number_input("ema_fast", 5, 200, 12)
-    ema_slow = st.number_input("ema_slow", 10, 400, 26)
-    atr_window = st.number_input("ATR window", 5, 100, 14)
-    stop_mode = st.selectbox("Stop/TP mode", ["atr","percent"], index=0)
-    atr_mult_sl = st.number_input("ATR SL x", 0.5, 10.0, 2.0, 0.1)
-    atr_mult_tp = st.number_input("ATR TP x", 0.5, 10.0, 3.0, 0.1)
-    sl_pct = st.number_input("SL % (se percent)", 0.1, 50.0, 1.0, 0.1)/100.0
-    tp_pct = st.number_input("TP % (se percent)", 0.1, 50.0, 2.0, 0.1)/100.0
-    time_in_market_max = st.number_input("Max bars in trade (0=illimitato)", 0, 10000, 0)
+    ui_strategies = {spec.label: name for name, spec in STRATEGIES.items() if not spec.inputs}
+    strategy_key = ui_strategies[st.selectbox("Strategia", list(ui_strategies), index=0)]
+    strategy_params = param_controls(STRATEGIES[strategy_key])
+
+_DATA_CACHE = METRICS.counter("cache_requests_total", "Cache lookups by cache and result", ("cache", "result"))
 
 @st.cache_data(show_spinner=True)
 def cached_load(symbols, provider, timeframe, start_date, end_date, tz, session_filter, session_start, session_end, adjusted):
+    from data.loader import load_ohlcv
     df = load_ohlcv(
         symbols=symbols, provider=provider, timeframe=timeframe,
         start_date=str(start_date), end_date=str(end_date), tz=tz,
         session_filter_on=session_filter, session_start=session_start, session_end=session_end,
         adjusted=adjusted
     )
+    _DATA_CACHE.inc(cache="data", result="miss")
     return df
 
+def load_data():
+    """``cached_load`` with the sidebar settings, counting data cache hits/misses."""
+    misses = _DATA_CACHE.value(cache="data", result="miss")
+    df = cached_load(symbols, provider, timeframe, start_date, end_date, tz, session_filter, session_start, session_end, adjusted)
+    if _DATA_CACHE.value(cache="data", result="miss") == misses:
+        _DATA_CACHE.inc(cache="data", result="hit")
+    return df
+
+@st.cache_resource
+def metrics_endpoint(port):
+    return serve_metrics(port)
+
+if os.getenv("METRICS_PORT"):
+    metrics_endpoint(int(os.getenv("METRICS_PORT")))
+
+@st.cache_resource
+def _jobs_holder():
+    return {}
+
+def job_manager():
+    """One pool shared by every session (jobs and results are visible to all tabs),
+    started by the first submission rather than on page load."""
+    holder = _jobs_holder()
+    if "manager" not in holder:
+        holder["manager"] = JobManager(max_workers=min(4, os.cpu_count() or 1))
+    return holder["manager"]
+
+SESSION_ID = st.session_state.setdefault("session_id", uuid.uuid4().hex[:8])
+
+def show_result(res):
+    """Keep ``res`` for display with its drawdown computed once (not on every rerun).
+
+    Copied, so the job result shared with other sessions is not modified."""
+    st.session_state["bt_result"] = dict(res, drawdown=drawdown(res["equity"]))
+
+def _job_panel():
+    manager = _jobs_holder().get("manager")
+    jobs = manager.jobs(kind="backtest")[::-1][:10] if manager else []
+    if not jobs:
+        return
+    st.markdown("### Job in background")
+    for job in jobs:
+        info = job.info()
+        c1, c2, c3 = st.columns([3, 4, 2])
+        with c1:
+            mine = " (tu)" if job.owner == SESSION_ID else ""
+            st.write(f"**{job.label}**{mine} — {info['status']}")
+        with c2:
+            st.progress(info["progress"], text=info["step"] or "")
+            if info["error"]:
+                st.caption(info["error"])
+        with c3:
+            if info["status"] in ("queued", "running"):
+                if st.button("Annulla", key=f"cancel_{job.id}"):
+                    manager.cancel(job.id)
+            elif info["status"] == "done" and st.button("Mostra", key=f"show_{job.id}"):
+                show_result(job.result())
+                st.rerun()
+
+# refresh the panel every 2 s without rerunning the whole script (when supported)
+_fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
+job_panel = _fragment(run_every=2)(_job_panel) if _fragment else _job_panel
+
+def zoom_chart(series, key, y_label, n_out=2000):
+    """Line chart of at most ~``n_out`` points; a slider zooms into long series."""
+    cached = st.session_state.get(f"pyr_{key}")
+    if cached is None or cached[0] is not series:
+        cached = (series, SeriesPyramid(series, min_points=n_out))
+        st.session_state[f"pyr_{key}"] = cached
+    start = end = None
+    if len(series) > 2 * n_out and isinstance(series.index, pd.DatetimeIndex):
+        tz = series.index.tz
+        first, last = (t.tz_localize(None).to_pydatetime() for t in (series.index[0], series.index[-1]))
+        lo, hi = st.slider("Zoom", first, last, (first, last), key=f"zoom_{key}")
+        start, end = pd.Timestamp(lo), pd.Timestamp(hi)
+        if tz is not None:
+            start, end = start.tz_localize(tz), end.tz_localize(tz)
+    view = cached[1].view(start, end, n_out)
+    st.plotly_chart(px.line(view, labels={"value": y_label, "index": "Data"}), use_container_width=True)
+    st.caption(f"{len(view)} / {len(series)} punti")
+
+@st.cache_data(ttl=300, show_spinner=False)
+def verify_credentials(name, key, secret, base_url):
+    # the status list would otherwise call every provider's API on each rerun
+    return test_credentials(name, key, secret, base_url)
+
+def portfolio_panel(pf):
+    """Weights, correlation, risk contributions and turnover of ``aggregate_portfolio``."""
+    with st.expander("Portafoglio (pesi, correlazioni, contributi di rischio)"):
+        w = pf["weights"]
+        st.write(w.iloc[-1] if isinstance(w, pd.DataFrame) else w)
+        st.dataframe(pf["correlation"])
+        st.write(pf["risk_contribution"].rename("risk_contribution"))
+        st.caption(f"Turnover medio per barra: {pf['turnover'].mean():.4f}")
+
 tabs = st.tabs(["Backtest", "Paper", "ML", "Log/Report", "Impostazioni"])
 
 with tabs[0]:
     st.subheader("Backtest — Motore: Backtrader")
+    p1, p2 = st.columns(2)
+    with p1:
+        profile_on = st.checkbox("Profila fasi (vedi Log/Report)", False)
+    with p2:
+        profile_capture = st.selectbox("Profiler", ["nessuno", "cprofile", "pyinstrument"], disabled=not profile_on)
+    run_kwargs = dict(
+        cash=100_000,
+        commission=commission_bps/1e4,
+        slippage_bps=slippage_bps,
+        sizer_kwargs=dict(risk_per_trade=risk_per_trade, min_size=1),
+        max_portfolio_risk=max_portfolio_risk/100.0,
+        leverage=leverage,
+        weighting=weighting,
+        rebalance=rebalance,
+        strategy_params=strategy_params,
+        strategy=strategy_key,
+    )
     if st.button("Carica dati & backtest", type="primary"):
-        try:
-            df = cached_load(symbols, provider, timeframe, start_date, end_date, tz, session_filter, session_start, session_end, adjusted)
-            st.success(f"Dati caricati: {df['symbol'].nunique()} simboli, {len(df)} barre.")
-            st.dataframe(df.tail(10))
-            # Run backtest
-            strategy_params = dict(
-                ema_fast=ema_fast, ema_slow=ema_slow, atr_period=atr_window,
-                stop_mode=stop_mode, atr_mult_sl=atr_mult_sl, atr_mult_tp=atr_mult_tp,
-                sl_pct=sl_pct, tp_pct=tp_pct, time_in_market_max=(time_in_market_max or None)
-            )
-            result = run_backtest(
-                df=df,
-                cash=100_000 * leverage,
-                commission=commission_bps/1e4,
-                slippage_bps=slippage_bps,
-                sizer_kwargs=dict(risk_per_trade=risk_per_trade, min_size=1),
-                strategy_params=strategy_params
-            )
-            st.session_state["bt_result"] = result
-        except Exception as e:
-            st.error(f"Errore: {e}")
+        if profile_on:
+            # in this process, so that the spans land in the Log/Report tab
+            try:
+                with PROFILER.run("backtest", capture=None if profile_capture == "nessuno" else profile_capture):
+                    df = load_data()
+                    st.success(f"Dati caricati: {df['symbol'].nunique()} simboli, {len(df)} barre.")
+                    st.dataframe(df.tail(10))
+                    from backtest.engine import run_backtest
+                    show_result(run_backtest(df=df, **run_kwargs))
+            except Exception as e:
+                st.error(f"Errore: {e}")
+        else:
+            # loaded here so the data cache (and its metrics) serve every run;
+            # the worker only gets the frame
+            try:
+                df = load_data()
+            except Exception as e:
+                st.error(f"Errore: {e}")
+            else:
+                job_manager().submit(backtest_task, df, run_kwargs, kind="backtest",
+                            label=f"{strategy_key} {timeframe} {','.join(symbols)}", owner=SESSION_ID)
+
+    job_panel()
 
     if "bt_result" in st.session_state:
         res = st.session_state["bt_result"]
@@ -122,17 +257,53 @@ with tabs[0]:
         st.markdown("### Metriche")
         st.write(pd.DataFrame([m]).T.rename(columns={0:"value"}))
         st.markdown("### Equity Curve")
-        eq = res["equity"]
-        fig = px.line(eq, labels={"value":"Equity (rel.)","index":"Data"})
-        st.plotly_chart(fig, use_container_width=True)
+        zoom_chart(res["equity"], "bt_equity", "Equity (rel.)")
+        st.markdown("### Drawdown")
+        zoom_chart(res["drawdown"], "bt_dd", "Drawdown")
+        with st.expander("Prezzi"):
+            price_sym = st.selectbox("Simbolo", [r["symbol"] for r in res["per_symbol"]], key="price_sym")
+            if st.button("Mostra prezzo"):
+                st.session_state["price_series"] = load_data().query("symbol == @price_sym")["close"]
+            if "price_series" in st.session_state:
+                zoom_chart(st.session_state["price_series"], "bt_price", "Close")
         st.markdown("### Per-symbol summary")
         st.dataframe(pd.DataFrame(res["per_symbol"]))
+        portfolio_panel(res["portfolio"])
+        if res.get("risk"):
+            st.markdown("### Rischio portafoglio (fine test)")
+            st.write(pd.DataFrame([res["risk"]]).T.rename(columns={0:"value"}))
+        with st.expander("Robustezza (bootstrap / Monte Carlo)"):
+            r1, r2, r3 = st.columns(3)
+            with r1:
+                rb_source = st.selectbox("Rendimenti", ["per barra", "per trade"])
+            with r2:
+                rb_method = st.selectbox("Metodo", ["block", "shuffle"])
+            with r3:
+                rb_paths = st.number_input("Percorsi", 100, 100_000, 10_000, 1000)
+            if st.button("Esegui bootstrap"):
+                from backtest.robustness import bootstrap_metrics
+                if rb_source == "per trade":
+                    rets = res["trades"].set_index("datetime")["ret"]
+                else:
+                    rets = res["equity"].pct_change().dropna()
+                try:
+                    rb = bootstrap_metrics(rets, n_paths=int(rb_paths), method=rb_method)
+                    st.write(rb["quantiles"].assign(osservato=pd.Series(rb["observed"])))
+                    st.metric("Probabilità di rovina (-50%)", f"{rb['prob_ruin']:.2%}")
+                except ValueError as e:
+                    st.error(str(e))
 
 with tabs[1]:
     st.subheader("Paper Trading — Alpaca (Paper)")
-    if SETTINGS.enable_alpaca:
+    if env_setting("ENABLE_ALPACA", True):
         if st.button("Connetti/refresh"):
-            st.session_state["conn"] = connect_info()
+            from paper import alpaca
+            from paper.router import connect_info
+            try:
+                st.session_state["conn"] = connect_info()
+                st.session_state["positions"] = alpaca.positions()
+            except Exception as e:
+                st.error(f"Errore connessione: {e}")
         if "conn" in st.session_state:
             st.json(st.session_state["conn"])
         st.markdown("**Ordine rapido**")
@@ -149,36 +320,108 @@ with tabs[1]:
         if otype == "limit":
             limit_price = st.number_input("Limit price", 0.0, 1_000_000.0, 100.0)
         if st.button("Invia ordine"):
+            from paper import alpaca
             try:
                 resp = alpaca.place_order(psym, int(qty), side, type_=otype, limit_price=limit_price)
                 st.success(f"Ordine inviato: {resp}")
             except Exception as e:
                 st.error(f"Errore ordine: {e}")
         if st.button("Cancella TUTTI gli ordini"):
+            from paper import alpaca
             try:
                 alpaca.cancel_all()
                 st.success("Ordini cancellati.")
             except Exception as e:
                 st.error(str(e))
         st.markdown("**Posizioni**")
-        try:
-            st.dataframe(pd.DataFrame(alpaca.positions()))
-        except Exception as e:
-            st.error(f"Errore posizioni: {e}")
+        # fetched with "Connetti/refresh": querying the broker on every rerun stalls the page
+        if "positions" in st.session_state:
+            st.dataframe(pd.DataFrame(st.session_state["positions"]))
+        else:
+            st.caption("Premi \"Connetti/refresh\" per caricare le posizioni.")
     else:
         st.warning("Alpaca disabilitato. Abilita ENABLE_ALPACA=true nel .env")
 
 with tabs[2]:
-    st.subheader("ML (opzionale) — Triple-Barrier & Purged/CPCV (stub)")
+    st.subheader("ML (opzionale) — Triple-Barrier & Purged/CPCV")
     st.caption("Labeling con Triple-Barrier (PT/SL/holding), meta-labeling on/off; CV anti-leakage: Purged K-Fold / CPCV con embargo. Riferimenti: López de Prado, AFML.")
-    st.markdown("- Triple-Barrier: etichettatura con barriera verticale e 2 orizzontali (SL/TP).")
-    st.markdown("- Purged K-Fold & CPCV: split time-series senza leakage con **embargo**.")
-    st.info("Implementazioni complete saranno aggiunte nei moduli ml/*. Riferimenti in README.")
+    st.markdown("**Backtest del segnale ML** — training sulla parte in-sample (con purge/embargo), "
+                "predizioni calcolate in un unico batch sulla parte out-of-sample.")
+    m1, m2, m3, m4 = st.columns(4)
+    with m1:
+        ml_test_size = st.slider("Quota test", 0.1, 0.7, 0.3, 0.05)
+    with m2:
+        ml_embargo = st.slider("Embargo (%)", 0.0, 5.0, 1.0, 0.5) / 100.0
+    with m3:
+        ml_threshold = st.slider("Soglia probabilità", 0.5, 0.9, 0.55, 0.01)
+    with m4:
+        ml_gate = st.checkbox("Meta-label su EMA crossover", False)
+    if st.button("Backtest segnale ML"):
+        try:
+            from ml.signals import ml_signal_frame
+            from backtest.engine import run_backtest
+            df = load_data()
+            test_df, _ = ml_signal_frame(df, test_size=ml_test_size, embargo_pct=ml_embargo)
+            ml_spec = STRATEGIES["ml_signal"]
+            ml_params = {k: v for k, v in strategy_params.items() if k in ml_spec.param_names}
+            st.session_state["ml_result"] = run_backtest(
+                df=test_df,
+                cash=100_000,
+                commission=commission_bps/1e4,
+                slippage_bps=slippage_bps,
+                sizer_kwargs=dict(risk_per_trade=risk_per_trade, min_size=1),
+                max_portfolio_risk=max_portfolio_risk/100.0,
+                leverage=leverage,
+                weighting=weighting,
+                rebalance=rebalance,
+                strategy_params=dict(ml_params, threshold=ml_threshold, use_ema_gate=ml_gate),
+                strategy="ml_signal",
+            )
+        except Exception as e:
+            st.error(f"Errore: {e}")
+    if "ml_result" in st.session_state:
+        res = st.session_state["ml_result"]
+        st.write(pd.DataFrame([res["metrics"]]).T.rename(columns={0:"value"}))
+        zoom_chart(res["equity"], "ml_equity", "Equity (rel.)")
+        st.dataframe(pd.DataFrame(res["per_symbol"]))
+        portfolio_panel(res["portfolio"])
 
 with tabs[3]:
     st.subheader("Log / Report")
-    st.write("Eventi principali (JSON)")
-    st.code('{"ts":"...","level":"INFO","name":"ui","msg":"example"}', language="json")
+    st.markdown("### Latenze paper trading (µs)")
+    lat = LATENCY.summary()
+    if lat:
+        st.dataframe(pd.DataFrame(lat).T)
+    else:
+        st.caption("Nessuna misura ancora: invia un ordine o connetti il paper account.")
+    c1, c2 = st.columns(2)
+    with c1:
+        st.download_button("Esporta JSON", LATENCY.export_json(), file_name="latency.json", mime="application/json")
+    with c2:
+        if st.button("Azzera latenze"):
+            LATENCY.reset()
+            st.rerun()
+
+    st.markdown("### Telemetria")
+    if os.getenv("METRICS_PORT"):
+        st.caption(f"Endpoint: http://127.0.0.1:{os.getenv('METRICS_PORT')}/metrics (Prometheus) e /metrics.json")
+    st.code(METRICS.prometheus_text(), language="text")
+    st.download_button("Esporta metriche JSON", dump_json(METRICS.snapshot()),
+                       file_name="metrics.json", mime="application/json")
+
+    st.markdown("### Profilo per fase (ultimo backtest profilato)")
+    if PROFILER.runs:
+        run = PROFILER.runs[-1]
+        st.caption(f"{run['name']}: {run['wall_ms']:.0f} ms totali")
+        phases = pd.DataFrame(run["phases"])
+        phases["fase"] = ["  " * d + n for d, n in zip(phases["depth"], phases["name"])]
+        st.dataframe(phases.set_index("fase")[["count", "total_ms", "mean_ms", "share"]])
+        if run["profile"]:
+            with st.expander(f"Output {run['capture']}"):
+                st.code(run["profile"])
+        st.download_button("Esporta profilo JSON", PROFILER.export_json(), file_name="profile.json", mime="application/json")
+    else:
+        st.caption("Nessun profilo: attiva \"Profila fasi\" nella tab Backtest.")
 
 with tabs[4]:
     st.subheader("Impostazioni")
@@ -227,45 +470,54 @@ with tabs[4]:
                         st.error(f"Salvataggio fallito: {e}. Prova un altro metodo.")
         st.caption("Le chiavi sono memorizzate localmente nel backend scelto.")
 
-    for name in PROVIDERS:
-        st.markdown(f"### {name.title()}")
-        creds = load_credentials(name)
-        backend = current_storage_backend(name)
-        status = "missing"
-        detail = ""
-        if creds.get("key"):
-            ok, err = test_credentials(name, creds["key"], creds["secret"], creds["base_url"])
-            if ok:
-                status = "ok"
+    c1, c2 = st.columns(2)
+    with c1:
+        if st.button("Configura credenziali"):
+            st.session_state.update({"show_wizard": True, "wizard_step": 1})
+            st.rerun()
+    with c2:
+        # reads the keychain and credential files: only on request
+        show_creds = st.checkbox("Mostra stato credenziali", False, key="show_creds")
+    if show_creds:
+        for name in PROVIDERS:
+            st.markdown(f"### {name.title()}")
+            creds = load_credentials(name)
+            backend = current_storage_backend(name)
+            status = "missing"
+            detail = ""
+            if creds.get("key"):
+                ok, err = verify_credentials(name, creds["key"], creds["secret"], creds["base_url"])
+                if ok:
+                    status = "ok"
+                else:
+                    status = "error"
+                    detail = err
+            if status == "ok":
+                st.success("Credenziali verificate", icon="✅")
+            elif status == "error":
+                st.error("Errore credenziali", icon="❌")
+                if detail:
+                    st.caption(detail)
             else:
-                status = "error"
-                detail = err
-        if status == "ok":
-            st.success("Credenziali verificate", icon="✅")
-        elif status == "error":
-            st.error("Errore credenziali", icon="❌")
-            if detail:
-                st.caption(detail)
-        else:
-            st.warning("Credenziali mancanti", icon="⚠️")
-
-        show = st.checkbox("Mostra secret", value=False, key=f"show_{name}")
-        st.text_input("API Key", creds.get("key"), disabled=True, key=f"key_{name}")
-        st.text_input(
-            "Secret",
-            creds.get("secret") if show else "*" * len(creds.get("secret", "")),
-            disabled=True,
-            key=f"secret_{name}",
-        )
-        st.write(f"Storage attuale: {backend or 'N/D'}")
-        col1, col2 = st.columns(2)
-        with col1:
-            if st.button("Ruota chiavi", key=f"rotate_{name}"):
-                st.session_state.update({"show_wizard": True, "wizard_step": 1, "wizard_provider": name})
-        with col2:
-            if st.button("Logout", key=f"logout_{name}"):
-                if backend:
-                    clear_credentials(name, backend)
-                reload_settings()
-                st.session_state.update({"show_wizard": True, "wizard_step": 1, "wizard_provider": name})
-                st.warning("Credenziali rimosse")
+                st.warning("Credenziali mancanti", icon="⚠️")
+
+            show = st.checkbox("Mostra secret", value=False, key=f"show_{name}")
+            st.text_input("API Key", creds.get("key"), disabled=True, key=f"key_{name}")
+            st.text_input(
+                "Secret",
+                creds.get("secret") if show else "*" * len(creds.get("secret", "")),
+                disabled=True,
+                key=f"secret_{name}",
+            )
+            st.write(f"Storage attuale: {backend or 'N/D'}")
+            col1, col2 = st.columns(2)
+            with col1:
+                if st.button("Ruota chiavi", key=f"rotate_{name}"):
+                    st.session_state.update({"show_wizard": True, "wizard_step": 1, "wizard_provider": name})
+            with col2:
+                if st.button("Logout", key=f"logout_{name}"):
+                    if backend:
+                        clear_credentials(name, backend)
+                    reload_settings()
+                    st.session_state.update({"show_wizard": True, "wizard_step": 1, "wizard_provider": name})
+                    st.warning("Credenziali rimosse")
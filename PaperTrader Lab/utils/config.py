@@ -1,12 +1,19 @@
-"""Central configuration and credential management for multiple providers."""
+"""Central configuration and credential management for multiple providers.
+
+Credentials are resolved lazily, per provider, on first use and cached in
+memory. A cached entry stays valid while the provider's environment
+variables, the mtimes of ``secrets.toml``/``.env`` and the
+``secure_store.GENERATION`` counter (bumped by every save/delete) are
+unchanged, so reruns neither re-parse files nor query the keyring. Keyring
+entries changed outside this app need ``invalidate_credentials()``.
+"""
 
 from __future__ import annotations
 
 import os
+from functools import lru_cache
 from typing import Dict, Optional, Tuple
 
-from pydantic_settings import BaseSettings
-
 from .logging_json import get_logger
 from . import secure_store
 from .providers import PROVIDERS
@@ -17,12 +24,38 @@ log = get_logger("config")
 CURRENT_BACKEND: Dict[str, Optional[str]] = {}
 
 
+_CACHE: Dict[str, Tuple[tuple, Dict[str, str]]] = {}
+
+
+def _stamp(provider: str) -> tuple:
+    names = secure_store.PROVIDER_VARS.get(provider, {})
+    return (
+        secure_store.GENERATION,
+        tuple(os.getenv(names[k]) for k in ("key", "secret", "base_url") if k in names),
+        secure_store.file_stamp(secure_store.SECRETS_FILE),
+        secure_store.file_stamp(secure_store.ENV_FILE),
+    )
+
+
 def load_credentials(provider: str) -> Dict[str, str]:
-    """Load credentials for the given provider following precedence."""
+    """Load credentials for the given provider following precedence (cached)."""
+    stamp = _stamp(provider)
+    hit = _CACHE.get(provider)
+    if hit is not None and hit[0] == stamp:
+        return dict(hit[1])
     creds = secure_store.load(provider)
     CURRENT_BACKEND[provider] = secure_store.current_storage_backend(provider)
+    _CACHE[provider] = (stamp, creds)
     log.info("credentials_loaded", extra={"provider": provider, "backend": CURRENT_BACKEND[provider]})
-    return creds
+    return dict(creds)
+
+
+def invalidate_credentials(provider: Optional[str] = None) -> None:
+    """Drop cached credentials (all providers by default)."""
+    if provider is None:
+        _CACHE.clear()
+    else:
+        _CACHE.pop(provider, None)
 
 
 def current_storage_backend(provider: str) -> Optional[str]:
@@ -58,55 +91,92 @@ def _as_bool(x: str, default: bool = False) -> bool:
     return str(x).strip().lower() in {"1", "true", "yes", "on"}
 
 
-class Settings(BaseSettings):
-    """Application settings resolved from environment/.env."""
+def env_setting(name: str, default):
+    """``name`` from the environment, else ``.env``, else ``default`` (cast to
+    bool when ``default`` is one).
 
-    default_engine: str = os.getenv("DEFAULT_ENGINE", "backtrader")
-    default_data_provider: str = os.getenv("DEFAULT_DATA_PROVIDER", "alpaca")
+    The lookup ``Settings`` does for its fields, without importing
+    pydantic-settings: for code that runs on every page render.
+    """
+    value = os.getenv(name)
+    if value is None:
+        value = secure_store.env_file_values().get(name)
+    if isinstance(default, bool):
+        return _as_bool(value, default)
+    return default if value is None else value
 
-    enable_alpaca: bool = _as_bool(os.getenv("ENABLE_ALPACA", "true"))
-    enable_oanda: bool = _as_bool(os.getenv("ENABLE_OANDA", "false"))
-    enable_binance: bool = _as_bool(os.getenv("ENABLE_BINANCE", "false"))
 
-    alpaca_api_key: str = ""
-    alpaca_secret_key: str = ""
-    alpaca_base_url: str = secure_store.PROVIDER_VARS["alpaca"]["default_base_url"]
+@lru_cache(maxsize=None)
+def _settings_class():
+    # pydantic-settings is slow to import; only needed once a setting is read
+    from pydantic_settings import BaseSettings
 
-    oanda_api_key: str = ""
-    oanda_secret_key: str = ""
-    oanda_base_url: str = secure_store.PROVIDER_VARS["oanda"]["default_base_url"]
+    class Settings(BaseSettings):
+        """Application settings resolved from environment/.env."""
 
-    binance_api_key: str = ""
-    binance_secret_key: str = ""
-    binance_base_url: str = secure_store.PROVIDER_VARS["binance"]["default_base_url"]
+        default_engine: str = os.getenv("DEFAULT_ENGINE", "backtrader")
+        default_data_provider: str = os.getenv("DEFAULT_DATA_PROVIDER", "alpaca")
 
-    class Config:
-        env_file = secure_store.ENV_FILE
+        enable_alpaca: bool = _as_bool(os.getenv("ENABLE_ALPACA", "true"))
+        enable_oanda: bool = _as_bool(os.getenv("ENABLE_OANDA", "false"))
+        enable_binance: bool = _as_bool(os.getenv("ENABLE_BINANCE", "false"))
 
+        class Config:
+            env_file = secure_store.ENV_FILE
 
-SETTINGS = Settings()
+    return Settings
 
 
-def reload_settings() -> None:
-    for name in PROVIDERS:
-        creds = load_credentials(name)
-        setattr(SETTINGS, f"{name}_api_key", creds.get("key", ""))
-        setattr(SETTINGS, f"{name}_secret_key", creds.get("secret", ""))
-        setattr(SETTINGS, f"{name}_base_url", creds.get("base_url", ""))
+def __getattr__(name: str):
+    if name == "Settings":
+        return _settings_class()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
+_CRED_FIELDS = {"api_key": "key", "secret_key": "secret", "base_url": "base_url"}
 
-# Load at import time
-reload_settings()
+
+class _LazySettings:
+    """``Settings`` built on first access; ``<provider>_api_key``,
+    ``<provider>_secret_key`` and ``<provider>_base_url`` come from
+    ``load_credentials`` at each access (cached there)."""
+
+    def __init__(self):
+        object.__setattr__(self, "_settings", None)
+
+    def _get(self):
+        if self._settings is None:
+            object.__setattr__(self, "_settings", _settings_class()())
+        return self._settings
+
+    def __getattr__(self, name: str):
+        provider, _, field = name.partition("_")
+        if provider in secure_store.PROVIDER_VARS and field in _CRED_FIELDS:
+            return load_credentials(provider).get(_CRED_FIELDS[field], "")
+        return getattr(self._get(), name)
+
+    def __setattr__(self, name: str, value) -> None:
+        setattr(self._get(), name, value)
+
+
+SETTINGS = _LazySettings()
+
+
+def reload_settings() -> None:
+    """Forget cached credentials; they are resolved again on next access."""
+    invalidate_credentials()
 
 
 __all__ = [
     "SETTINGS",
+    "env_setting",
     "load_credentials",
     "save_credentials",
     "clear_credentials",
     "test_credentials",
     "current_storage_backend",
     "reload_settings",
+    "invalidate_credentials",
     "PROVIDERS",
 ]
 
@@ -0,0 +1,122 @@
+"""Server-side downsampling of long series for charts.
+
+``minmax`` keeps the lowest and highest point of each bucket (spikes and
+drawdowns survive), ``lttb`` the visually most significant point per bucket
+(Largest-Triangle-Three-Buckets). Both keep the first and last points and
+return a subset of the original rows.
+
+``SeriesPyramid`` precomputes min-max levels, each ``factor / 2`` times
+smaller than the previous one. ``view(start, end)`` starts from the finest
+level that covers the window with at most a few times ``n_out`` points and
+reduces that slice, so zooming costs the same whatever the full length is.
+"""
+
+from __future__ import annotations
+
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+
+def _bucket_edges(n: int, n_buckets: int) -> np.ndarray:
+    return np.linspace(0, n, n_buckets + 1).astype(np.int64)
+
+
+def minmax_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    """Sorted positions of the min and max of ``n_out // 2`` equal buckets (plus both ends)."""
+    n = len(y)
+    if n <= n_out or n_out < 4:
+        return np.arange(n)
+    y = np.asarray(y, dtype=float)
+    filled = np.where(np.isnan(y), np.nanmean(y) if np.isfinite(y).any() else 0.0, y)
+    edges = _bucket_edges(n, n_out // 2)
+    starts, sizes = edges[:-1], np.diff(edges)
+    group = np.repeat(np.arange(len(starts)), sizes)
+    picks = []
+    for reduce in (np.minimum, np.maximum):
+        ext = reduce.reduceat(filled, starts)
+        hit = np.flatnonzero(filled == ext[group])
+        _, first = np.unique(group[hit], return_index=True)
+        picks.append(hit[first])
+    return np.unique(np.concatenate(([0, n - 1], *picks)))
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Positions chosen by Largest-Triangle-Three-Buckets (``x`` numeric, increasing)."""
+    n = len(y)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    y = np.where(np.isnan(y), np.nanmean(y) if np.isfinite(y).any() else 0.0, y)
+    edges = 1 + _bucket_edges(n - 2, n_out - 2)
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nlo, nhi = edges[i + 1], edges[i + 2] if i + 2 < len(edges) else n
+        cx, cy = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+
+def _x(index: pd.Index) -> np.ndarray:
+    if isinstance(index, pd.DatetimeIndex):
+        return index.asi8.astype(float)
+    return np.asarray(index, dtype=float) if np.issubdtype(index.dtype, np.number) else np.arange(len(index), dtype=float)
+
+
+def downsample(series: pd.Series, n_out: int = 2000, method: str = "minmax") -> pd.Series:
+    """At most about ``n_out`` rows of ``series`` chosen by ``"minmax"`` or ``"lttb"``."""
+    if method == "minmax":
+        idx = minmax_indices(series.to_numpy(), n_out)
+    elif method == "lttb":
+        idx = lttb_indices(_x(series.index), series.to_numpy(), n_out)
+    else:
+        raise ValueError(f"Unknown method: {method}")
+    return series.iloc[idx]
+
+
+def drawdown(equity: pd.Series) -> pd.Series:
+    """Drawdown from the running peak (``<= 0``)."""
+    return (equity / equity.cummax() - 1).rename("drawdown")
+
+
+class SeriesPyramid:
+    """Multi-resolution min-max levels of a series for zoomable charts.
+
+    Parameters
+    ----------
+    series : pandas.Series
+        Sorted by index.
+    factor : int
+        Bucket size of each level: level ``k + 1`` keeps 2 points out of
+        every ``factor`` of level ``k``.
+    min_points : int
+        Levels stop once shorter than this.
+    """
+
+    def __init__(self, series: pd.Series, factor: int = 8, min_points: int = 2000):
+        if factor < 4:
+            raise ValueError("factor must be >= 4")
+        self.levels: List[pd.Series] = [series]
+        while len(self.levels[-1]) > max(min_points, factor):
+            last = self.levels[-1]
+            self.levels.append(last.iloc[minmax_indices(last.to_numpy(), 2 * len(last) // factor)])
+
+    def view(self, start=None, end=None, n_out: int = 2000, method: str = "minmax") -> pd.Series:
+        """About ``n_out`` points of the ``[start, end]`` window."""
+        for level in self.levels:
+            idx = level.index
+            lo = 0 if start is None else idx.searchsorted(start, "left")
+            hi = len(idx) if end is None else idx.searchsorted(end, "right")
+            if hi - lo <= 4 * n_out:
+                break
+        return downsample(level.iloc[lo:hi], n_out, method)
+
+
+__all__ = ["downsample", "drawdown", "lttb_indices", "minmax_indices", "SeriesPyramid"]
@@ -0,0 +1,58 @@
+"""Vectorized helpers for multi-symbol frames sorted by symbol, then time.
+
+Callers sort once with ``symbol_order``, compute over the whole array and
+mask windows that reach back into the previous symbol with ``first`` (the
+position of the first row of each row's group).
+"""
+
+from __future__ import annotations
+
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def symbol_order(df: pd.DataFrame) -> np.ndarray:
+    """Positions that sort ``df`` by symbol, then time (stable)."""
+    if "symbol" not in df.columns:
+        return np.arange(len(df))
+    return np.lexsort((df.index.values, pd.factorize(df["symbol"])[0]))
+
+
+def group_first(keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Start of each group in sorted ``keys`` and, per row, the start of its group."""
+    n = len(keys)
+    if not n:
+        return np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+    starts = np.concatenate(([0], np.flatnonzero(keys[1:] != keys[:-1]) + 1))
+    return starts, np.repeat(starts, np.diff(np.append(starts, n)))
+
+
+def _window_sums(x: np.ndarray, window: int):
+    c = np.concatenate(([0.0], np.cumsum(x)))
+    pos = np.arange(window - 1, len(x))
+    return pos, c[pos + 1] - c[pos + 1 - window]
+
+
+def rolling_mean(x: np.ndarray, window: int, first: np.ndarray) -> np.ndarray:
+    """Trailing mean over ``window`` rows, NaN where the window leaves the group."""
+    out = np.full(len(x), np.nan)
+    pos, s1 = _window_sums(np.nan_to_num(x), window)
+    out[pos] = s1 / window
+    out[np.arange(len(x)) - first < window - 1] = np.nan
+    return out
+
+
+def rolling_std(x: np.ndarray, window: int, first: np.ndarray, ddof: int = 1) -> np.ndarray:
+    """Trailing standard deviation over ``window`` rows, NaN where the window leaves the group."""
+    x = np.nan_to_num(x)
+    out = np.full(len(x), np.nan)
+    pos, s1 = _window_sums(x, window)
+    _, s2 = _window_sums(x * x, window)
+    out[pos] = np.sqrt(np.maximum(s2 - s1 * s1 / window, 0) / (window - ddof))
+    out[np.arange(len(x)) - first < window - 1] = np.nan
+    return out
+
+
+__all__ = ["group_first", "rolling_mean", "rolling_std", "symbol_order"]
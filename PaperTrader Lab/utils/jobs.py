@@ -0,0 +1,262 @@
+"""Background jobs (data loads, backtests, sweeps) with progress and cancellation.
+
+``JobManager`` submits task functions to a worker process pool and keeps a
+``Job`` record per submission. One manager is meant to be shared by every
+session of the app (``st.cache_resource``), so jobs started from different
+tabs or users run concurrently and their results stay available to all.
+
+Tasks receive a ``progress(label, done, total)`` callback. Workers publish
+progress through a ``multiprocessing.Manager`` dict, and the same call
+raises ``JobCancelled`` once ``JobManager.cancel`` has been requested, so
+cancellation is cooperative at progress points (about every 1% of the bars
+in ``run_backtest``, per configuration in sweeps). Jobs still queued are
+cancelled immediately.
+
+Metrics recorded by a worker process (``utils.telemetry.METRICS``) are sent
+back with its result or exception and merged into the parent's registry,
+so ``/metrics`` covers background jobs too.
+"""
+
+from __future__ import annotations
+
+import itertools
+import multiprocessing as mp
+import threading
+import time
+import traceback
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from .logging_json import get_logger
+
+log = get_logger("jobs")
+
+STATES = ("queued", "running", "done", "failed", "cancelled")
+
+
+class JobCancelled(Exception):
+    """Raised inside a task by its progress callback after ``JobManager.cancel``."""
+
+
+class _Reporter:
+    """Picklable progress callback bound to one job (manager-proxied dicts)."""
+
+    def __init__(self, job_id: str, progress, cancelled):
+        self.job_id = job_id
+        self._progress = progress
+        self._cancelled = cancelled
+
+    def __call__(self, label: Optional[str] = None, done: int = 0, total: int = 0) -> None:
+        if self._cancelled.get(self.job_id):
+            raise JobCancelled(self.job_id)
+        self._progress[self.job_id] = dict(label=label, done=done, total=total, ts=time.time())
+
+
+def _run_task(fn: Callable[..., Any], reporter: _Reporter, args, kwargs, remote: bool = False):
+    """``(result, metrics delta)``; the delta (``None`` in-process) rides on exceptions too."""
+    reporter("start", 0, 0)
+    if not remote:
+        return fn(*args, progress=reporter, **kwargs), None
+    from .telemetry import METRICS
+    before = METRICS.state()
+    try:
+        out = fn(*args, progress=reporter, **kwargs)
+    except BaseException as e:
+        e.metrics_delta = METRICS.delta(before)
+        raise
+    return out, METRICS.delta(before)
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    label: str
+    owner: Optional[str]
+    submitted: float
+    future: Future = field(repr=False)
+    manager: "JobManager" = field(repr=False)
+    finished: Optional[float] = None
+
+    @property
+    def status(self) -> str:
+        f = self.future
+        if f.cancelled():
+            return "cancelled"
+        if f.done():
+            exc = f.exception()
+            if isinstance(exc, JobCancelled):
+                return "cancelled"
+            return "failed" if exc is not None else "done"
+        return "running" if self.id in self.manager._progress else "queued"
+
+    @property
+    def progress(self) -> Dict[str, Any]:
+        p = dict(self.manager._progress.get(self.id) or {})
+        total = p.get("total") or 0
+        if self.status == "done":
+            p["fraction"] = 1.0
+        else:
+            p["fraction"] = p.get("done", 0) / total if total else 0.0
+        return p
+
+    def result(self, timeout: Optional[float] = None) -> Any:
+        return self.future.result(timeout)[0]
+
+    @property
+    def error(self) -> Optional[str]:
+        if not self.future.done() or self.future.cancelled():
+            return None
+        exc = self.future.exception()
+        if exc is None or isinstance(exc, JobCancelled):
+            return None
+        return "".join(traceback.format_exception_only(type(exc), exc)).strip()
+
+    def info(self) -> Dict[str, Any]:
+        p = self.progress
+        return dict(id=self.id, kind=self.kind, label=self.label, owner=self.owner, status=self.status,
+                    progress=p["fraction"], step=p.get("label"),
+                    submitted=self.submitted, finished=self.finished, error=self.error)
+
+
+class JobManager:
+    """Run tasks in a worker pool and keep their records.
+
+    Parameters
+    ----------
+    max_workers : int, optional
+        Pool size (default: CPU count).
+    processes : bool
+        Worker processes (default) or threads (no pickling, for tests and
+        light tasks).
+    max_jobs : int
+        Finished jobs kept in the store; the oldest are dropped first.
+    mp_context : str
+        Start method of the worker processes.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, processes: bool = True,
+                 max_jobs: int = 200, mp_context: str = "spawn"):
+        self.max_jobs = max_jobs
+        self._remote = processes
+        self._jobs: Dict[str, Job] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        if processes:
+            ctx = mp.get_context(mp_context)
+            self._mp_manager = ctx.Manager()
+            self._progress = self._mp_manager.dict()
+            self._cancelled = self._mp_manager.dict()
+            self._pool = ProcessPoolExecutor(max_workers, mp_context=ctx)
+        else:
+            self._mp_manager = None
+            self._progress, self._cancelled = {}, {}
+            self._pool = ThreadPoolExecutor(max_workers, thread_name_prefix="job")
+
+    def submit(self, fn: Callable[..., Any], *args: Any, kind: str = "task", label: str = "",
+               owner: Optional[str] = None, **kwargs: Any) -> Job:
+        """Run ``fn(*args, progress=..., **kwargs)`` in the pool.
+
+        ``fn`` must be importable (module-level) when using processes.
+        """
+        job_id = f"{kind}-{next(self._ids)}"
+        reporter = _Reporter(job_id, self._progress, self._cancelled)
+        future = self._pool.submit(_run_task, fn, reporter, args, kwargs, self._remote)
+        job = Job(job_id, kind, label or kind, owner, time.time(), future, self)
+        future.add_done_callback(lambda f, j=job: self._finished(j))
+        with self._lock:
+            self._jobs[job_id] = job
+        log.info("job_submitted", extra={"job": job_id, "kind": kind, "owner": owner})
+        return job
+
+    def _finished(self, job: Job) -> None:
+        job.finished = time.time()
+        f = job.future
+        if self._remote and not f.cancelled():
+            from .telemetry import METRICS
+            exc = f.exception()
+            delta = getattr(exc, "metrics_delta", None) if exc is not None else f.result()[1]
+            if delta:
+                METRICS.merge(delta)
+        log.info("job_finished", extra={"job": job.id, "status": job.status,
+                                        "seconds": round(job.finished - job.submitted, 3)})
+        self._prune()
+
+    def _prune(self) -> None:
+        with self._lock:
+            done = [j for j in self._jobs.values() if j.future.done()]
+            for j in sorted(done, key=lambda j: j.finished or 0)[:max(0, len(done) - self.max_jobs)]:
+                self._forget(j.id)
+
+    def _forget(self, job_id: str) -> None:
+        self._jobs.pop(job_id, None)
+        self._progress.pop(job_id, None)
+        self._cancelled.pop(job_id, None)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def jobs(self, owner: Optional[str] = None, kind: Optional[str] = None) -> List[Job]:
+        """Jobs in submission order, optionally filtered by owner and kind."""
+        return [j for j in list(self._jobs.values())
+                if (owner is None or j.owner == owner) and (kind is None or j.kind == kind)]
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued job or ask a running one to stop at its next progress point."""
+        job = self._jobs.get(job_id)
+        if job is None or job.future.done():
+            return False
+        if not job.future.cancel():
+            self._cancelled[job_id] = True
+        log.info("job_cancel", extra={"job": job_id})
+        return True
+
+    def forget(self, job_id: str) -> None:
+        with self._lock:
+            self._forget(job_id)
+
+    def shutdown(self, wait: bool = True) -> None:
+        for j in self.jobs():
+            self.cancel(j.id)
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+        if self._mp_manager is not None:
+            self._mp_manager.shutdown()
+
+
+# ---------------------------------------------------------------------------
+# Tasks (module-level so worker processes can import them)
+# ---------------------------------------------------------------------------
+
+
+def load_task(load_kwargs: Dict[str, Any], progress: Callable = None):
+    """``load_ohlcv(**load_kwargs)``."""
+    from data.loader import load_ohlcv
+    progress("load", 0, 1)
+    df = load_ohlcv(**load_kwargs)
+    progress("load", 1, 1)
+    return df
+
+
+def backtest_task(data: Any, run_kwargs: Dict[str, Any], progress: Callable = None) -> Dict[str, Any]:
+    """``run_backtest`` on ``data``: a frame, or ``load_ohlcv`` kwargs to load it first."""
+    from backtest.engine import run_backtest
+    df = load_task(data, progress) if isinstance(data, dict) else data
+    return run_backtest(df, progress=progress, **run_kwargs)
+
+
+def sweep_task(data: Any, run_kwargs: Dict[str, Any], grid: List[Dict[str, Any]],
+               progress: Callable = None) -> List[Dict[str, Any]]:
+    """Backtest every parameter set of ``grid``; returns ``[{params, metrics}]``."""
+    from backtest.engine import run_backtest
+    df = load_task(data, progress) if isinstance(data, dict) else data
+    out = []
+    for i, params in enumerate(grid):
+        progress(f"config {i + 1}/{len(grid)}", i, len(grid))
+        res = run_backtest(df, **{**run_kwargs, "strategy_params": params})
+        out.append(dict(params=params, metrics=res["metrics"]))
+    progress("done", len(grid), len(grid))
+    return out
+
+
+__all__ = ["Job", "JobManager", "JobCancelled", "STATES", "load_task", "backtest_task", "sweep_task"]
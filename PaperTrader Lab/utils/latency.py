@@ -0,0 +1,202 @@
+"""Per-stage latency instrumentation with fixed-memory HDR-style histograms.
+
+The paper trading path is split into stages (bar arrival -> signal ->
+order submit -> broker ack). Each stage records nanosecond durations into a
+log-linear histogram whose memory footprint is fixed at construction, so the
+recorder can stay enabled in long running sessions.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+from .logging_json import dump_json, get_logger
+
+log = get_logger("latency")
+
+
+class HdrHistogram:
+    """Log-linear histogram of non-negative integer values (nanoseconds).
+
+    Values below ``2**precision`` are stored exactly; above that every power
+    of two is split in ``2**(precision-1)`` linear sub-buckets, which bounds
+    the relative error of reported quantiles to ``2 / 2**precision``.
+    Values above ``max_value`` are clamped into the last bucket.
+    """
+
+    def __init__(self, precision: int = 7, max_value: int = 2**44):
+        self.precision = precision
+        self._sub = 1 << precision
+        self._half = self._sub >> 1
+        self.max_value = max_value
+        self._counts: List[int] = [0] * (self._index(max_value) + 1)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0
+        self.min: Optional[int] = None
+        self.max: Optional[int] = None
+
+    def _index(self, value: int) -> int:
+        if value < self._sub:
+            return value
+        e = value.bit_length() - self.precision
+        return self._sub + (e - 1) * self._half + ((value >> e) - self._half)
+
+    def _bucket_value(self, idx: int) -> int:
+        """Midpoint of the value range covered by bucket ``idx``."""
+        if idx < self._sub:
+            return idx
+        e, off = divmod(idx - self._sub, self._half)
+        e += 1
+        low = (off + self._half) << e
+        return low + ((1 << e) >> 1)
+
+    def record(self, value: int) -> None:
+        value = min(max(int(value), 0), self.max_value)
+        idx = self._index(value)
+        with self._lock:
+            self._counts[idx] += 1
+            self.count += 1
+            self.total += value
+            if self.min is None or value < self.min:
+                self.min = value
+            if self.max is None or value > self.max:
+                self.max = value
+
+    def quantile(self, q: float) -> Optional[int]:
+        if not self.count:
+            return None
+        target = max(1, int(round(q * self.count)))
+        seen = 0
+        for idx, c in enumerate(self._counts):
+            if not c:
+                continue
+            seen += c
+            if seen >= target:
+                return min(self._bucket_value(idx), self.max)
+        return self.max
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts = [0] * len(self._counts)
+            self.count = 0
+            self.total = 0
+            self.min = None
+            self.max = None
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        """Return count/mean/min/max and p50/p90/p99/p99.9 in microseconds."""
+        def us(v):
+            return None if v is None else v / 1e3
+        return dict(
+            count=self.count,
+            mean_us=us(self.total / self.count) if self.count else None,
+            min_us=us(self.min),
+            p50_us=us(self.quantile(0.50)),
+            p90_us=us(self.quantile(0.90)),
+            p99_us=us(self.quantile(0.99)),
+            p999_us=us(self.quantile(0.999)),
+            max_us=us(self.max),
+        )
+
+
+class LatencyRecorder:
+    """Collect per-stage latencies of the bar -> signal -> order -> ack path.
+
+    Stage histograms are created on first use. ``bar_received`` and
+    ``signal_ready`` stamp the per-symbol pipeline so that the elapsed time
+    between consecutive stages is recorded without the caller carrying
+    timestamps around.
+    """
+
+    def __init__(self, enabled: bool = True, precision: int = 7):
+        self.enabled = enabled
+        self.precision = precision
+        self._hists: Dict[str, HdrHistogram] = {}
+        self._marks: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+        # marks are stamped from the stream thread and the order/ack callbacks
+        self._marks_lock = threading.Lock()
+
+    def histogram(self, stage: str) -> HdrHistogram:
+        h = self._hists.get(stage)
+        if h is None:
+            with self._lock:
+                h = self._hists.setdefault(stage, HdrHistogram(self.precision))
+        return h
+
+    def record(self, stage: str, elapsed_ns: int) -> None:
+        if self.enabled:
+            self.histogram(stage).record(elapsed_ns)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time the enclosed block into the ``name`` histogram."""
+        if not self.enabled:
+            yield
+            return
+        t0 = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter_ns() - t0)
+
+    # -- pipeline marks --------------------------------------------------
+
+    def _mark(self, symbol: str, name: str, prev: Optional[str], stage: str,
+              ts_ns: Optional[int] = None) -> None:
+        if not self.enabled:
+            return
+        now = time.perf_counter_ns() if ts_ns is None else ts_ns
+        with self._marks_lock:
+            marks = self._marks.setdefault(symbol, {})
+            start = marks.get(prev) if prev is not None else None
+            marks[name] = now
+        if start is not None:
+            self.record(stage, now - start)
+
+    def bar_received(self, symbol: str, ts_ns: Optional[int] = None) -> None:
+        # a new bar starts a new pipeline: marks of the previous one are stale
+        if self.enabled:
+            with self._marks_lock:
+                self._marks.pop(symbol, None)
+        self._mark(symbol, "bar", None, "", ts_ns)
+
+    def signal_ready(self, symbol: str, ts_ns: Optional[int] = None) -> None:
+        self._mark(symbol, "signal", "bar", "bar_to_signal", ts_ns)
+
+    def order_submitted(self, symbol: str, ts_ns: Optional[int] = None) -> None:
+        self._mark(symbol, "submit", "signal", "signal_to_submit", ts_ns)
+
+    def order_acked(self, symbol: str, ts_ns: Optional[int] = None) -> None:
+        """Close the pipeline: later orders without a new bar/signal record only their own stages."""
+        self._mark(symbol, "ack", "submit", "submit_to_ack", ts_ns)
+        with self._marks_lock:
+            marks = self._marks.pop(symbol, {})
+        if self.enabled and "bar" in marks and "ack" in marks:
+            self.record("bar_to_ack", marks["ack"] - marks["bar"])
+
+    # -- reporting -------------------------------------------------------
+
+    def summary(self) -> Dict[str, Dict[str, Optional[float]]]:
+        return {name: h.summary() for name, h in sorted(self._hists.items())}
+
+    def export_json(self) -> str:
+        return dump_json({"latency": self.summary()})
+
+    def log_summary(self) -> None:
+        log.info("latency_summary", extra={"latency": self.summary()})
+
+    def reset(self) -> None:
+        with self._lock, self._marks_lock:
+            self._hists.clear()
+            self._marks.clear()
+
+
+LATENCY = LatencyRecorder()
+
+
+__all__ = ["HdrHistogram", "LatencyRecorder", "LATENCY"]
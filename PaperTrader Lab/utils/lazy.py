@@ -0,0 +1,50 @@
+"""Deferred imports for modules that are slow to load or rarely needed.
+
+``lazy_import("plotly.express")`` returns a stand-in that imports the real
+module on first attribute access, so module-level names keep working
+(``px.line(...)``, ``keyring.get_password(...)``) while the import cost is
+paid only by the code path that uses them. Attributes assigned on the
+stand-in (e.g. by ``monkeypatch.setattr`` in tests) take precedence over the
+module's own.
+"""
+
+from __future__ import annotations
+
+import importlib
+import sys
+from types import ModuleType
+
+
+class LazyModule:
+    """Proxy importing ``name`` on first attribute access."""
+
+    def __init__(self, name: str):
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_module", None)
+
+    def _load(self) -> ModuleType:
+        if self._module is None:
+            object.__setattr__(self, "_module", importlib.import_module(self._name))
+        return self._module
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the module has been imported (by this proxy or elsewhere)."""
+        return self._module is not None or self._name in sys.modules
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    return LazyModule(name)
+
+
+__all__ = ["LazyModule", "lazy_import"]
@@ -1,4 +1,46 @@
-import json, logging, sys, time
+"""Structured JSON logging that never blocks the caller on I/O.
+
+Loggers from ``get_logger`` share one ``QueueHandler``: the calling thread
+only renders the message and enqueues the record, while a ``QueueListener``
+thread serializes it (``orjson`` when installed) and writes to stdout and,
+optionally, a rotating file. ``extra=`` fields are kept in the payload.
+
+``configure_logging`` sets the outputs, the level and per-message sampling
+(e.g. ``sample={"bar_received": 100}`` keeps one record in 100). Extras are
+serialized in the listener thread, so do not mutate them after logging.
+"""
+
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+from typing import Dict, Optional
+
+try:
+    import orjson
+except ImportError:  # optional, stdlib json otherwise
+    orjson = None
+
+
+# attributes every LogRecord has: anything else came from ``extra=``
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+
+def dump_json(obj) -> str:
+    """Serialize ``obj`` the same way log payloads are serialized."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=str,
+                                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY).decode()
+        except TypeError:  # e.g. ints beyond 64 bit
+            pass
+    return json.dumps(obj, ensure_ascii=False, default=str)
+
 
 class JSONFormatter(logging.Formatter):
     def format(self, record):
@@ -8,15 +50,107 @@ class JSONFormatter(logging.Formatter):
             "name": record.name,
             "msg": record.getMessage(),
         }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and key not in payload:
+                payload[key] = value
         if record.exc_info:
             payload["exc"] = self.formatException(record.exc_info)
-        return json.dumps(payload, ensure_ascii=False)
+        elif record.exc_text:
+            payload["exc"] = record.exc_text
+        return dump_json(payload)
+
+
+class SamplingFilter(logging.Filter):
+    """Keep one record every ``n`` per message (``{"msg": n}``); kept records carry ``sampled=n``."""
+
+    def __init__(self, every: Optional[Dict[str, int]] = None):
+        super().__init__()
+        self.every = dict(every or {})
+        self._seen: Dict[str, int] = {}
+
+    def filter(self, record):
+        n = self.every.get(record.msg) if isinstance(record.msg, str) else None
+        if not n or n <= 1:
+            return True
+        seen = self._seen.get(record.msg, 0)
+        self._seen[record.msg] = seen + 1
+        if seen % n:
+            return False
+        record.sampled = n
+        return True
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record):
+        # only what must happen in the caller: render args and the traceback;
+        # the JSON payload is built in the listener thread. Work on a copy:
+        # the original keeps propagating to other handlers (root, caplog...)
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _FORMATTER.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_FORMATTER = JSONFormatter()
+_QUEUE: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_HANDLER = _QueueHandler(_QUEUE)
+_SAMPLER = SamplingFilter()
+_HANDLER.addFilter(_SAMPLER)
+_LISTENER: Optional[logging.handlers.QueueListener] = None
+_LOCK = threading.Lock()
+_LEVEL = logging.INFO
+_LOGGERS: Dict[str, logging.Logger] = {}
+
+
+def configure_logging(level=logging.INFO, file: Optional[str] = None, max_bytes: int = 10 * 2**20,
+                      backup_count: int = 5, sample: Optional[Dict[str, int]] = None, stream=None):
+    """(Re)start the listener with stdout (``stream``) and an optional rotating ``file`` output.
+
+    ``level`` applies to every logger from ``get_logger``, including those created earlier.
+    """
+    global _LISTENER, _LEVEL
+    with _LOCK:
+        if _LISTENER is not None:
+            _LISTENER.stop()
+        outputs = [logging.StreamHandler(stream or sys.stdout)]
+        if file:
+            outputs.append(logging.handlers.RotatingFileHandler(
+                file, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"))
+        for h in outputs:
+            h.setFormatter(_FORMATTER)
+        _LEVEL = level
+        _HANDLER.setLevel(level)
+        for logger in _LOGGERS.values():
+            logger.setLevel(level)
+        _SAMPLER.every = dict(sample or {})
+        _SAMPLER._seen.clear()
+        _LISTENER = logging.handlers.QueueListener(_QUEUE, *outputs, respect_handler_level=True)
+        _LISTENER.start()
+
+
+def flush_logging():
+    """Write every queued record (the listener is restarted with the same outputs)."""
+    with _LOCK:
+        if _LISTENER is not None:
+            _LISTENER.stop()
+            _LISTENER.start()
+
+
+@atexit.register
+def _stop_listener():
+    if _LISTENER is not None:
+        _LISTENER.stop()
+
 
 def get_logger(name="app"):
     logger = logging.getLogger(name)
     if not logger.handlers:
-        handler = logging.StreamHandler(sys.stdout)
-        handler.setFormatter(JSONFormatter())
-        logger.addHandler(handler)
-        logger.setLevel(logging.INFO)
+        if _LISTENER is None:
+            configure_logging()
+        logger.addHandler(_HANDLER)
+        logger.setLevel(_LEVEL)
+        _LOGGERS[name] = logger
     return logger
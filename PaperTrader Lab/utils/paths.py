@@ -0,0 +1,25 @@
+"""File names derived from symbols.
+
+Symbols such as ``BTC/USD`` or ``EUR/USD`` contain path separators, so
+caches percent-encode them (``BTC%2FUSD``); plain tickers are unchanged.
+``.`` and ``..`` are encoded too, so a name never points outside its
+directory.
+"""
+
+from __future__ import annotations
+
+from urllib.parse import quote, unquote
+
+
+def symbol_filename(symbol) -> str:
+    """``symbol`` as a single path component."""
+    name = quote(str(symbol), safe="")
+    return name.replace(".", "%2E") if name in (".", "..") else name
+
+
+def filename_symbol(name: str) -> str:
+    """Inverse of ``symbol_filename`` (for a file stem)."""
+    return unquote(name)
+
+
+__all__ = ["symbol_filename", "filename_symbol"]
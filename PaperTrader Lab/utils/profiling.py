@@ -0,0 +1,169 @@
+"""Opt-in per-phase profiling of data loading and backtests.
+
+``PROFILER.span(name)`` times a block (or, used as a decorator, a function)
+into an in-process collector. Spans nest per thread, so the breakdown shows
+``run_backtest/cerebro_run`` separately from ``load_ohlcv/fetch``. When the
+profiler is disabled a span costs two attribute checks.
+
+``PROFILER.run(name, capture=...)`` enables spans for the enclosed block in
+the calling thread only, optionally under cProfile or pyinstrument, and
+produces a report (phase breakdown of that thread's spans plus profiler
+output) that is logged as JSON and kept in ``PROFILER.runs`` for the UI.
+Work done concurrently by other threads (e.g. other Streamlit sessions)
+stays out of the report.
+"""
+
+from __future__ import annotations
+
+import io
+import itertools
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+from .logging_json import dump_json, get_logger
+
+log = get_logger("profiling")
+
+CAPTURES = ("cprofile", "pyinstrument")
+
+
+def breakdown(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Aggregate span records by path: count, total/mean ms and share of the root time."""
+    phases: Dict[str, Dict[str, Any]] = {}
+    for r in records:
+        p = phases.setdefault(r["path"], dict(path=r["path"], name=r["name"], depth=r["depth"],
+                                              count=0, total_ms=0.0))
+        p["count"] += 1
+        p["total_ms"] += r["duration_ns"] / 1e6
+    root = sum(p["total_ms"] for p in phases.values() if p["depth"] == 0) or 1.0
+    for p in phases.values():
+        p["mean_ms"] = p["total_ms"] / p["count"]
+        p["share"] = p["total_ms"] / root
+    return sorted(phases.values(), key=lambda p: p["path"])
+
+
+class Profiler:
+    """Collector of nested timing spans with optional per-run profiler capture.
+
+    Records are kept in a bounded deque (``max_records``) and the last
+    ``max_runs`` run reports in ``runs``.
+    """
+
+    def __init__(self, enabled: bool = False, max_records: int = 100_000, max_runs: int = 20):
+        self.enabled = enabled
+        self._records: Deque[Dict[str, Any]] = deque(maxlen=max_records)
+        self.runs: Deque[Dict[str, Any]] = deque(maxlen=max_runs)
+        self._seq = itertools.count(1)
+        self._last_seq = 0
+        self._local = threading.local()
+
+    def _stack(self) -> List[str]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextmanager
+    def span(self, name: str, **attrs: Any) -> Iterator[None]:
+        """Time the enclosed block as ``name`` (nested under the open spans of this thread)."""
+        if not (self.enabled or getattr(self._local, "active", 0)):
+            yield
+            return
+        stack = self._stack()
+        stack.append(name)
+        path = "/".join(stack)
+        t0 = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter_ns() - t0
+            stack.pop()
+            seq = self._last_seq = next(self._seq)
+            self._records.append(dict(seq=seq, name=name, path=path, depth=len(stack), thread=threading.get_ident(),
+                                      start_ns=t0, duration_ns=elapsed, **attrs))
+
+    @contextmanager
+    def run(self, name: str, capture: Optional[str] = None, top: int = 30) -> Iterator[Dict[str, Any]]:
+        """Profile the enclosed block; yields the report, filled in on exit.
+
+        Parameters
+        ----------
+        name : str
+            Root span of the run.
+        capture : str, optional
+            ``"cprofile"`` or ``"pyinstrument"`` (must be installed) to also
+            keep the profiler output (``top`` cumulative entries for cProfile).
+        """
+        if capture is not None and capture not in CAPTURES:
+            raise ValueError(f"Unknown capture: {capture} (available: {', '.join(CAPTURES)})")
+        report: Dict[str, Any] = dict(name=name, capture=capture)
+        prof = _start_capture(capture)
+        local = self._local
+        local.active = getattr(local, "active", 0) + 1
+        seq0 = self._last_seq
+        thread = threading.get_ident()
+        t0 = time.perf_counter_ns()
+        try:
+            with self.span(name):
+                yield report
+        finally:
+            local.active -= 1
+            report["wall_ms"] = (time.perf_counter_ns() - t0) / 1e6
+            report["profile"] = _stop_capture(capture, prof, top)
+            report["phases"] = breakdown([r for r in list(self._records) if r["seq"] > seq0 and r["thread"] == thread])
+            self.runs.append(report)
+            log.info("profile_run", extra={"profile": {k: v for k, v in report.items() if k != "profile"}})
+
+    def records(self) -> List[Dict[str, Any]]:
+        return list(self._records)
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Breakdown of every span recorded so far."""
+        return breakdown(self.records())
+
+    def export_json(self) -> str:
+        return dump_json({"phases": self.summary(), "runs": list(self.runs)})
+
+    def reset(self) -> None:
+        self._records.clear()
+        self.runs.clear()
+
+
+def _start_capture(capture: Optional[str]):
+    if capture == "cprofile":
+        import cProfile
+        prof = cProfile.Profile()
+        prof.enable()
+        return prof
+    if capture == "pyinstrument":
+        try:
+            from pyinstrument import Profiler as _Pyinstrument
+        except ImportError as e:
+            raise ImportError("capture='pyinstrument' requires `pip install pyinstrument`") from e
+        prof = _Pyinstrument()
+        prof.start()
+        return prof
+    return None
+
+
+def _stop_capture(capture: Optional[str], prof, top: int) -> Optional[str]:
+    if prof is None:
+        return None
+    if capture == "cprofile":
+        import pstats
+        prof.disable()
+        out = io.StringIO()
+        pstats.Stats(prof, stream=out).sort_stats("cumulative").print_stats(top)
+        return out.getvalue()
+    prof.stop()
+    return prof.output_text()
+
+
+PROFILER = Profiler(enabled=os.getenv("PROFILE_SPANS", "").lower() in {"1", "true", "yes"})
+
+
+__all__ = ["Profiler", "PROFILER", "breakdown"]
@@ -1,14 +1,43 @@
-"""Provider registry."""
+"""Provider registry.
 
-from .alpaca import AlpacaProvider
-from .oanda import OandaProvider
-from .binance import BinanceProvider
+Plugins are imported and instantiated on first lookup, so listing the
+provider names does not load their HTTP clients.
+"""
 
-PROVIDERS = {
-    "alpaca": AlpacaProvider(),
-    "oanda": OandaProvider(),
-    "binance": BinanceProvider(),
+from __future__ import annotations
+
+import importlib
+from collections.abc import Mapping
+
+from .base import Provider
+
+_PLUGINS = {
+    "alpaca": "alpaca:AlpacaProvider",
+    "oanda": "oanda:OandaProvider",
+    "binance": "binance:BinanceProvider",
 }
 
-__all__ = ["PROVIDERS"]
 
+class _Registry(Mapping):
+    def __init__(self, plugins):
+        self._plugins = dict(plugins)
+        self._instances = {}
+
+    def __getitem__(self, name: str) -> Provider:
+        inst = self._instances.get(name)
+        if inst is None:
+            module, _, cls = self._plugins[name].partition(":")
+            inst = getattr(importlib.import_module(f".{module}", __name__), cls)()
+            self._instances[name] = inst
+        return inst
+
+    def __iter__(self):
+        return iter(self._plugins)
+
+    def __len__(self) -> int:
+        return len(self._plugins)
+
+
+PROVIDERS = _Registry(_PLUGINS)
+
+__all__ = ["PROVIDERS"]
@@ -5,9 +5,8 @@ from __future__ import annotations
 import json
 import os
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
 
-import keyring
 from dotenv import dotenv_values
 
 try:  # tomllib is builtin on Python >=3.11
@@ -15,6 +14,11 @@ try:  # tomllib is builtin on Python >=3.11
 except ModuleNotFoundError:  # pragma: no cover
     tomllib = None  # type: ignore
 
+from .lazy import lazy_import
+
+# imported on first use: loading the keyring backends is slow
+keyring = lazy_import("keyring")
+
 
 PROJECT_ROOT = Path(os.getenv("APP_ROOT", Path(__file__).resolve().parents[2]))
 STREAMLIT_DIR = PROJECT_ROOT / ".streamlit"
@@ -48,6 +52,54 @@ PROVIDER_VARS: Dict[str, Dict[str, str]] = {
 
 _CURRENT_BACKEND: Dict[str, Optional[str]] = {}
 
+# bumped by every save/delete (and ``invalidate``): cached credentials
+# resolved before a write are stale, the keyring included
+GENERATION = 0
+
+# parsed secrets.toml / .env keyed by (path, mtime_ns, size)
+_FILE_CACHE: Dict[Path, Tuple[Tuple[int, int], Dict]] = {}
+
+
+def invalidate() -> None:
+    """Mark every cached credential and parsed file as stale."""
+    global GENERATION
+    GENERATION += 1
+    _FILE_CACHE.clear()
+
+
+def file_stamp(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _read_cached(path: Path, parse) -> Optional[Dict]:
+    """``parse(path)`` re-run only when the file's mtime or size changed."""
+    stamp = file_stamp(path)
+    if stamp is None:
+        return None
+    hit = _FILE_CACHE.get(path)
+    if hit is not None and hit[0] == stamp:
+        return hit[1]
+    data = parse(path)
+    _FILE_CACHE[path] = (stamp, data)
+    return data
+
+
+def env_file_values() -> Dict[str, Optional[str]]:
+    """Parsed ``.env`` (cached until it changes), empty when there is none."""
+    return _read_cached(ENV_FILE, dotenv_values) or {}
+
+
+def _parse_toml(path: Path) -> Dict:
+    try:
+        with open(path, "rb") as fh:
+            return tomllib.load(fh)
+    except Exception:
+        return {}
+
 
 def _vars(provider: str) -> Dict[str, str]:
     if provider not in PROVIDER_VARS:
@@ -74,12 +126,10 @@ def _load_from_env(provider: str) -> Optional[Dict[str, str]]:
 
 
 def _load_from_secrets(provider: str) -> Optional[Dict[str, str]]:
-    if not SECRETS_FILE.exists() or tomllib is None:
+    if tomllib is None:
         return None
-    try:
-        with open(SECRETS_FILE, "rb") as fh:
-            data = tomllib.load(fh)
-    except Exception:
+    data = _read_cached(SECRETS_FILE, _parse_toml)
+    if not data:
         return None
     names = _vars(provider)
     key = data.get(names["key"])
@@ -109,9 +159,9 @@ def _load_from_keyring(provider: str) -> Optional[Dict[str, str]]:
 
 
 def _load_from_env_file(provider: str) -> Optional[Dict[str, str]]:
-    if not ENV_FILE.exists():
+    data = _read_cached(ENV_FILE, dotenv_values)
+    if data is None:
         return None
-    data = dotenv_values(ENV_FILE)
     names = _vars(provider)
     key = data.get(names["key"])
     secret = data.get(names["secret"])
@@ -136,6 +186,15 @@ def load(provider: str) -> Dict[str, str]:
     return {"key": "", "secret": "", "base_url": names["default_base_url"]}
 
 
+def has_plain_credentials(provider: str) -> bool:
+    """Whether env vars, secrets.toml or ``.env`` hold a key and secret.
+
+    Same sources as :func:`load` minus the keyring, whose backend can be
+    slow or prompt for a password: cheap enough for the first render.
+    """
+    return any(loader(provider) for loader in (_load_from_env, _load_from_secrets, _load_from_env_file))
+
+
 def current_storage_backend(provider: str) -> Optional[str]:
     return _CURRENT_BACKEND.get(provider)
 
@@ -159,6 +218,13 @@ def _write_env_file(data: Dict[str, str]) -> None:
 
 
 def save(provider: str, target: str, key: str, secret: str, base_url: str) -> None:
+    try:
+        _save(provider, target, key, secret, base_url)
+    finally:
+        invalidate()
+
+
+def _save(provider: str, target: str, key: str, secret: str, base_url: str) -> None:
     names = _vars(provider)
     if target == "secrets":
         STREAMLIT_DIR.mkdir(parents=True, exist_ok=True)
@@ -196,6 +262,13 @@ def save(provider: str, target: str, key: str, secret: str, base_url: str) -> No
 
 
 def delete(provider: str, target: str) -> None:
+    try:
+        _delete(provider, target)
+    finally:
+        invalidate()
+
+
+def _delete(provider: str, target: str) -> None:
     names = _vars(provider)
     if target == "secrets":
         if not SECRETS_FILE.exists() or tomllib is None:
@@ -240,6 +313,9 @@ __all__ = [
     "save",
     "delete",
     "current_storage_backend",
+    "invalidate",
+    "file_stamp",
+    "env_file_values",
     "PROVIDER_VARS",
 ]
 
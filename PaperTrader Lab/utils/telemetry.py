@@ -0,0 +1,327 @@
+"""In-process counters, gauges and histograms with a local export endpoint.
+
+Metrics are registered once at import time (``METRICS.counter(...)``) and
+updated from hot paths without locks: every thread writes its own cell and
+readers sum the cells, so an increment is a dict lookup plus an addition.
+Histograms use fixed bucket bounds, so their memory does not grow with the
+number of observations.
+
+``METRICS.prometheus_text()`` renders the Prometheus text format and
+``METRICS.snapshot()`` a JSON-ready dict; ``serve()`` exposes both on
+``/metrics`` and ``/metrics.json`` from a local background HTTP server.
+Work done in other processes is brought back with ``state()`` /
+``delta()`` in the worker and ``merge()`` in the parent (see ``utils.jobs``).
+"""
+
+from __future__ import annotations
+
+import bisect
+from abc import ABC, abstractmethod
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .logging_json import dump_json, get_logger
+
+log = get_logger("telemetry")
+
+# seconds, from sub-millisecond calls to multi-minute backtests
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+
+class _Cells:
+    """Per-thread accumulators: only the owning thread writes its cell."""
+
+    def __init__(self, width: int):
+        self.width = width
+        self._cells: Dict[int, List[float]] = {}
+
+    def cell(self) -> List[float]:
+        tid = threading.get_ident()
+        c = self._cells.get(tid)
+        if c is None:
+            c = self._cells.setdefault(tid, [0.0] * self.width)
+        return c
+
+    def total(self) -> List[float]:
+        out = [0.0] * self.width
+        for c in list(self._cells.values()):
+            for i, v in enumerate(c):
+                out[i] += v
+        return out
+
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, help: str = "", labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: expected labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def _child(self, labels: Dict[str, Any]):
+        key = self._key(labels) if labels or self.labelnames else ()
+        c = self._children.get(key)
+        if c is None:
+            c = self._children.setdefault(key, self._new_child())
+        return c
+
+    @abstractmethod
+    def _new_child(self):
+        """Storage of one label combination."""
+
+    def _total(self, child) -> List[float]:
+        return child.total()
+
+    def _add(self, child, values: Sequence[float]) -> None:
+        cell = child.cell()
+        for i, v in enumerate(values):
+            cell[i] += v
+
+    def _label_str(self, key: Tuple[str, ...], extra: str = "") -> str:
+        parts = [f'{n}="{_escape(v)}"' for n, v in zip(self.labelnames, key)]
+        if extra:
+            parts.append(extra)
+        return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _Cells(1)
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        self._child(labels).cell()[0] += amount
+
+    def value(self, **labels: Any) -> float:
+        return self._child(labels).total()[0]
+
+    @contextmanager
+    def count_exceptions(self, **labels: Any) -> Iterator[None]:
+        """Increment on every exception leaving the block (the exception propagates)."""
+        try:
+            yield
+        except BaseException:
+            self.inc(**labels)
+            raise
+
+    def _samples(self):
+        for key, c in list(self._children.items()):
+            yield self.name, self._label_str(key), c.total()[0]
+
+    def _snapshot(self):
+        return {",".join(k) or "": c.total()[0] for k, c in list(self._children.items())}
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self):
+        return [0.0]
+
+    def set(self, value: float, **labels: Any) -> None:
+        self._child(labels)[0] = float(value)
+
+    def _total(self, child) -> List[float]:
+        return list(child)
+
+    def _add(self, child, values: Sequence[float]) -> None:
+        child[0] = values[0]  # a gauge takes the latest value
+
+    def value(self, **labels: Any) -> float:
+        return self._child(labels)[0]
+
+    def _samples(self):
+        for key, c in list(self._children.items()):
+            yield self.name, self._label_str(key), c[0]
+
+    def _snapshot(self):
+        return {",".join(k) or "": c[0] for k, c in list(self._children.items())}
+
+
+class Histogram(_Metric):
+    """Fixed-bucket histogram; per-label cells hold ``[bucket counts..., +Inf, sum]``."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str = "", labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _Cells(len(self.buckets) + 2)
+
+    def observe(self, value: float, **labels: Any) -> None:
+        c = self._child(labels).cell()
+        c[bisect.bisect_left(self.buckets, value)] += 1
+        c[-1] += value
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        """Observe the duration of the block in seconds (also when it raises)."""
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0, **labels)
+
+    def summary(self, **labels: Any) -> Dict[str, Any]:
+        t = self._child(labels).total()
+        counts, total = t[:-1], t[-1]
+        n = sum(counts)
+        cum, acc = {}, 0.0
+        for le, c in zip(self.buckets + (float("inf"),), counts):
+            acc += c
+            cum["+Inf" if le == float("inf") else repr(le)] = acc
+        return dict(count=n, sum=total, mean=total / n if n else None, buckets=cum)
+
+    def _samples(self):
+        for key in list(self._children):
+            s = self.summary(**dict(zip(self.labelnames, key)))
+            for le, c in s["buckets"].items():
+                yield f"{self.name}_bucket", self._label_str(key, f'le="{le}"'), c
+            yield f"{self.name}_sum", self._label_str(key), s["sum"]
+            yield f"{self.name}_count", self._label_str(key), s["count"]
+
+    def _snapshot(self):
+        return {",".join(k) or "": self.summary(**dict(zip(self.labelnames, k)))
+                for k in list(self._children)}
+
+
+def _escape(v: str) -> str:
+    return v.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt(v: float) -> str:
+    return str(int(v)) if float(v).is_integer() else repr(float(v))
+
+
+class MetricsRegistry:
+    """Get-or-create registry: modules declaring the same metric share it."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name: str, help: str, labelnames: Sequence[str], **kw):
+        with self._lock:
+            m = self._metrics.get(name)
+            if m is None:
+                m = self._metrics[name] = cls(name, help, labelnames, **kw)
+            elif not isinstance(m, cls) or m.labelnames != tuple(labelnames):
+                raise ValueError(f"metric {name} already registered as {m.kind} {m.labelnames}")
+            return m
+
+    def counter(self, name: str, help: str = "", labelnames: Sequence[str] = ()) -> Counter:
+        return self._get(Counter, name, help, labelnames)
+
+    def gauge(self, name: str, help: str = "", labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get(Gauge, name, help, labelnames)
+
+    def histogram(self, name: str, help: str = "", labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, help, labelnames, buckets=buckets)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """``{name: {"type", "help", "values": {"label,values": value}}}``."""
+        return {name: dict(type=m.kind, help=m.help, labels=list(m.labelnames), values=m._snapshot())
+                for name, m in sorted(self._metrics.items())}
+
+    def prometheus_text(self) -> str:
+        lines = []
+        for name, m in sorted(self._metrics.items()):
+            lines.append(f"# HELP {name} {m.help}")
+            lines.append(f"# TYPE {name} {m.kind}")
+            lines.extend(f"{sample}{labels} {_fmt(v)}" for sample, labels, v in m._samples())
+        return "\n".join(lines) + "\n"
+
+    def state(self) -> Dict[str, Dict[Tuple[str, ...], List[float]]]:
+        """Raw totals per metric and label values, the baseline of :meth:`delta`."""
+        return {name: {key: m._total(c) for key, c in list(m._children.items())}
+                for name, m in list(self._metrics.items())}
+
+    def delta(self, since: Dict[str, Dict[Tuple[str, ...], List[float]]]) -> List[Dict[str, Any]]:
+        """Changes since ``since`` (a :meth:`state`), as picklable records for :meth:`merge`."""
+        out = []
+        for name, m in list(self._metrics.items()):
+            old = since.get(name, {})
+            values = []
+            for key, c in list(m._children.items()):
+                now, prev = m._total(c), old.get(key)
+                if m.kind == "gauge":
+                    if now != prev:
+                        values.append((key, now))
+                else:
+                    d = now if prev is None else [a - b for a, b in zip(now, prev)]
+                    if any(d):
+                        values.append((key, d))
+            if values:
+                out.append(dict(name=name, kind=m.kind, help=m.help, labels=m.labelnames,
+                                buckets=getattr(m, "buckets", None), values=values))
+        return out
+
+    def merge(self, delta: List[Dict[str, Any]]) -> None:
+        """Add a :meth:`delta` (e.g. from a worker process); metrics are registered if needed."""
+        for rec in delta:
+            kw = dict(buckets=rec["buckets"]) if rec["kind"] == "histogram" else {}
+            m = self._get(_KINDS[rec["kind"]], rec["name"], rec["help"], rec["labels"], **kw)
+            for key, values in rec["values"]:
+                m._add(m._child(dict(zip(m.labelnames, key))), values)
+
+    def reset(self) -> None:
+        """Zero every metric (registrations are kept)."""
+        for m in self._metrics.values():
+            m._children.clear()
+
+
+_KINDS = {cls.kind: cls for cls in (Counter, Gauge, Histogram)}
+
+METRICS = MetricsRegistry()
+
+
+def serve(port: int = 9108, host: str = "127.0.0.1", registry: Optional[MetricsRegistry] = None) -> ThreadingHTTPServer:
+    """Serve ``/metrics`` (Prometheus text) and ``/metrics.json`` from a daemon thread.
+
+    Returns the server; call ``shutdown()`` to stop it. ``port=0`` picks a free port
+    (see ``server.server_address``).
+    """
+    registry = registry or METRICS
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = self.path.split("?")[0]
+            if path == "/metrics":
+                body, ctype = registry.prometheus_text(), "text/plain; version=0.0.4; charset=utf-8"
+            elif path == "/metrics.json":
+                body, ctype = dump_json(registry.snapshot()), "application/json"
+            else:
+                self.send_error(404)
+                return
+            data = body.encode()
+            self.send_response(200)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    log.info("metrics_endpoint", extra={"host": host, "port": server.server_address[1]})
+    return server
+
+
+__all__ = ["Counter", "Gauge", "Histogram", "MetricsRegistry", "METRICS", "DEFAULT_BUCKETS", "serve"]
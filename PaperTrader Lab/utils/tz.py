@@ -9,10 +9,9 @@ def ensure_tz_index(df: pd.DataFrame, tz: str):
     return df.tz_convert(tz)
 
 def filter_session(df, session_start: str, session_end: str):
-    # session_* as "HH:MM", in df.index tz
+    # session_* as "HH:MM", in df.index tz; one vectorized mask for all symbols
     s_h, s_m = map(int, session_start.split(":"))
     e_h, e_m = map(int, session_end.split(":"))
     t = df.index
-    mask = (t.hour > s_h) | ((t.hour == s_h) & (t.minute >= s_m))
-    mask &= (t.hour < e_h) | ((t.hour == e_h) & (t.minute <= e_m))
-    return df[mask]
+    minute = t.hour * 60 + t.minute
+    return df[(minute >= s_h * 60 + s_m) & (minute <= e_h * 60 + e_m)]